@@ -0,0 +1,1368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Компактное хранилище палитры цветов для ColorManager (task_2, task_3).
+Цвета хранятся как 24-битные целые в array('I'), названия интернируются,
+а поиск в обе стороны (название -> код, код -> название) выполняется по хеш-индексам.
+Поиск ближайшего именованного цвета выполняется в пространствах RGB и CIE Lab,
+а поиск по названию - без учёта регистра и различия "е"/"ё", по префиксу и с опечатками.
+Палитры загружаются потоково из CSS, X11 rgb.txt, JSON и CSV или открываются через mmap
+из скомпилированного двоичного формата. Цвета переводятся между hex, RGB, HSV, HSL и Lab
+целыми массивами (NumPy или чистый Python).
+"""
+
+import colorsys
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy является необязательной зависимостью
+    np = None  # type: ignore
+
+# Пространства, в которых выполняется поиск ближайшего цвета
+COLOR_SPACES = ("rgb", "lab")
+
+# Представления цветов для преобразований: целое 0xRRGGBB, строка "#rrggbb" и цветовые пространства
+CONVERSION_SPACES = ("int", "hex", "rgb", "hsv", "hsl", "lab")
+
+# Опорный белый D65 для перехода XYZ -> Lab
+_WHITE_D65 = (0.95047, 1.0, 1.08883)
+
+# Максимальное количество элементов матрицы расстояний при пакетном поиске
+_NEAREST_BLOCK_ELEMENTS = 1 << 22
+
+# Заголовок скомпилированной палитры: сигнатура, версия, количество цветов, размер блока названий
+_PALETTE_HEADER = struct.Struct("<4sIIQ")
+_PALETTE_MAGIC = b"CPAL"
+_PALETTE_VERSION = 1
+
+# Шесть шестнадцатеричных цифр кода цвета без "#"
+_HEX_DIGITS_RE = re.compile(r"[0-9a-fA-F]{6}")
+
+# Объявление цвета в CSS: "--red: #ff0000" или "red: #f00"
+_CSS_DECLARATION_RE = re.compile(r"(?:--)?([\w-]+)\s*:\s*(#[0-9a-fA-F]{6}|#[0-9a-fA-F]{3})(?![0-9a-fA-F])")
+
+
+def parse_hex(code: str) -> int:
+    """
+    Преобразует шестнадцатеричный код цвета ("#ff7d00", "ff7d00" или "#f70") в 24-битное целое.
+
+    :param code: Шестнадцатеричный код цвета.
+    :return: Целое вида 0xRRGGBB.
+    :raises ValueError: Если строка не является кодом цвета.
+    """
+
+    digits = code[1:] if code.startswith("#") else code
+    if len(digits) == 3:
+        digits = "".join(ch * 2 for ch in digits)
+    # int() допускает знак, пробелы, "_" и префикс "0x", поэтому цифры проверяются заранее
+    if not _HEX_DIGITS_RE.fullmatch(digits):
+        raise ValueError(f"Некорректный код цвета: {code!r}")
+    return int(digits, 16)
+
+
+def _color_code(code: Union[str, int]) -> int:
+    """
+    Преобразует код цвета палитры (hex-строку или целое) в 0xRRGGBB с проверкой диапазона.
+    """
+
+    value = parse_hex(code) if isinstance(code, str) else code
+    if not 0 <= value <= 0xFFFFFF:
+        raise ValueError(f"Некорректный код цвета: {code!r}")
+    return value
+
+
+def format_hex(value: int) -> str:
+    """
+    Преобразует 24-битное целое в шестнадцатеричный код цвета вида "#rrggbb".
+
+    :param value: Целое вида 0xRRGGBB.
+    :return: Строка с кодом цвета.
+    """
+
+    return f"#{value:06x}"
+
+
+def _srgb_to_linear(channel: float) -> float:
+    """
+    Переводит канал sRGB из диапазона [0, 1] в линейную интенсивность.
+    """
+
+    return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+
+def _lab_f(t: float) -> float:
+    """
+    Нелинейная функция перехода XYZ -> Lab.
+    """
+
+    return t ** (1 / 3) if t > 216 / 24389 else t * 841 / 108 + 4 / 29
+
+
+def rgb_to_lab(value: int) -> Tuple[float, float, float]:
+    """
+    Переводит цвет 0xRRGGBB (sRGB, D65) в координаты CIE Lab.
+
+    :param value: Цвет в виде целого 0xRRGGBB.
+    :return: Кортеж (L, a, b).
+    """
+
+    r, g, b = (_srgb_to_linear(((value >> shift) & 0xFF) / 255) for shift in (16, 8, 0))
+    x = (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / _WHITE_D65[0]
+    y = (0.2126729 * r + 0.7151522 * g + 0.0721750 * b) / _WHITE_D65[1]
+    z = (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / _WHITE_D65[2]
+    fx, fy, fz = _lab_f(x), _lab_f(y), _lab_f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _rgb_to_lab_array(values: Any) -> Any:
+    """
+    Векторный вариант rgb_to_lab: массив целых 0xRRGGBB -> массив (n, 3) координат Lab.
+    """
+
+    values = np.asarray(values, dtype=np.uint32)
+    rgb = np.stack([(values >> shift) & 0xFF for shift in (16, 8, 0)], axis=-1) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    matrix = np.array(
+        [[0.4124564, 0.3575761, 0.1804375], [0.2126729, 0.7151522, 0.0721750], [0.0193339, 0.1191920, 0.9503041]]
+    )
+    xyz = linear @ matrix.T / np.array(_WHITE_D65)
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), xyz * 841 / 108 + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def _to_point(value: int, space: str) -> Tuple[float, float, float]:
+    """
+    Переводит цвет 0xRRGGBB в точку выбранного пространства.
+    """
+
+    if space == "lab":
+        return rgb_to_lab(value)
+    return float((value >> 16) & 0xFF), float((value >> 8) & 0xFF), float(value & 0xFF)
+
+
+def _linear_to_srgb(channel: float) -> float:
+    """
+    Переводит линейную интенсивность в канал sRGB из диапазона [0, 1].
+    """
+
+    return channel * 12.92 if channel <= 0.0031308 else 1.055 * channel ** (1 / 2.4) - 0.055
+
+
+def _lab_f_inv(t: float) -> float:
+    """
+    Обратная функция к _lab_f.
+    """
+
+    return t**3 if t > 6 / 29 else (t - 4 / 29) * 108 / 841
+
+
+def lab_to_rgb(lab: Tuple[float, float, float]) -> int:
+    """
+    Переводит координаты CIE Lab в ближайший цвет sRGB 0xRRGGBB (с отсечением за пределами гаммы).
+
+    :param lab: Кортеж (L, a, b).
+    :return: Цвет в виде целого 0xRRGGBB.
+    """
+
+    fy = (lab[0] + 16) / 116
+    x = _WHITE_D65[0] * _lab_f_inv(fy + lab[1] / 500)
+    y = _WHITE_D65[1] * _lab_f_inv(fy)
+    z = _WHITE_D65[2] * _lab_f_inv(fy - lab[2] / 200)
+    linear = (
+        3.2404542 * x - 1.5371385 * y - 0.4985314 * z,
+        -0.9692660 * x + 1.8760108 * y + 0.0415560 * z,
+        0.0556434 * x - 0.2040259 * y + 1.0572252 * z,
+    )
+    r, g, b = (round(min(max(_linear_to_srgb(max(c, 0.0)), 0.0), 1.0) * 255) for c in linear)
+    return (r << 16) | (g << 8) | b
+
+
+def _encode_python(values: Iterable[int], space: str) -> Any:
+    """
+    Резервная реализация encode_colors без NumPy.
+    """
+
+    if space == "int":
+        return array("I", values)
+    if space == "hex":
+        return [format_hex(value) for value in values]
+    if space == "lab":
+        return [rgb_to_lab(value) for value in values]
+
+    result: List[Tuple[float, ...]] = []
+    for value in values:
+        r, g, b = (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+        if space == "rgb":
+            result.append((r, g, b))
+        elif space == "hsv":
+            h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+            result.append((h * 360, s, v))
+        else:
+            h, lightness, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+            result.append((h * 360, s, lightness))
+    return result
+
+
+def _decode_python(data: Iterable[Any], space: str) -> array:
+    """
+    Резервная реализация decode_colors без NumPy.
+    """
+
+    if space == "int":
+        return array("I", data)
+    if space == "hex":
+        return array("I", (parse_hex(code) for code in data))
+    if space == "lab":
+        return array("I", (lab_to_rgb(tuple(item)) for item in data))  # type: ignore[arg-type]
+
+    result = array("I")
+    for first, second, third in data:
+        if space == "rgb":
+            r, g, b = first / 255, second / 255, third / 255
+        elif space == "hsv":
+            r, g, b = colorsys.hsv_to_rgb(first % 360 / 360, second, third)
+        else:
+            r, g, b = colorsys.hls_to_rgb(first % 360 / 360, third, second)
+        result.append((round(r * 255) << 16) | (round(g * 255) << 8) | round(b * 255))
+    return result
+
+
+def _hue_array(rgb: Any, maxc: Any, delta: Any) -> Any:
+    """
+    Векторное вычисление тона (в градусах) для HSV и HSL.
+    """
+
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hue = np.where(maxc == r, ((g - b) / delta) % 6, np.where(maxc == g, (b - r) / delta + 2, (r - g) / delta + 4))
+    return np.where(delta == 0, 0.0, hue * 60)
+
+
+def _encode_numpy(values: Any, space: str) -> Any:
+    """
+    Векторная реализация encode_colors на NumPy.
+    """
+
+    values = np.asarray(values, dtype=np.uint32)
+    if space == "int":
+        return values.copy()
+    if space == "hex":
+        return [f"#{value:06x}" for value in values.tolist()]
+    if space == "lab":
+        return _rgb_to_lab_array(values)
+
+    channels = np.stack([(values >> shift) & 0xFF for shift in (16, 8, 0)], axis=-1)
+    if space == "rgb":
+        return channels.astype(np.uint8)
+
+    rgb = channels / 255.0
+    maxc, minc = rgb.max(axis=-1), rgb.min(axis=-1)
+    delta = maxc - minc
+    hue = _hue_array(rgb, maxc, delta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if space == "hsv":
+            saturation = np.where(maxc > 0, delta / maxc, 0.0)
+            return np.stack([hue, saturation, maxc], axis=-1)
+        lightness = (maxc + minc) / 2
+        saturation = np.where(delta == 0, 0.0, delta / (1 - np.abs(2 * lightness - 1)))
+        return np.stack([hue, saturation, lightness], axis=-1)
+
+
+def _decode_numpy(data: Any, space: str) -> Any:
+    """
+    Векторная реализация decode_colors на NumPy.
+    """
+
+    if space == "int":
+        return np.asarray(data, dtype=np.uint32).copy()
+    if space == "hex":
+        return np.fromiter((parse_hex(code) for code in data), dtype=np.uint32)
+
+    data = np.asarray(data, dtype=np.float64).reshape(-1, 3)
+    if space == "rgb":
+        rgb = data / 255.0
+    elif space == "lab":
+        fy = (data[:, 0] + 16) / 116
+        f = np.stack([fy + data[:, 1] / 500, fy, fy - data[:, 2] / 200], axis=-1)
+        xyz = np.where(f > 6 / 29, f**3, (f - 4 / 29) * 108 / 841) * np.array(_WHITE_D65)
+        inverse = np.array(
+            [
+                [3.2404542, -1.5371385, -0.4985314],
+                [-0.9692660, 1.8760108, 0.0415560],
+                [0.0556434, -0.2040259, 1.0572252],
+            ]
+        )
+        linear = np.clip(xyz @ inverse.T, 0.0, None)
+        rgb = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+    else:
+        hue = (data[:, 0] % 360) / 60
+        if space == "hsv":
+            chroma = data[:, 2] * data[:, 1]
+            m = data[:, 2] - chroma
+        else:
+            chroma = (1 - np.abs(2 * data[:, 2] - 1)) * data[:, 1]
+            m = data[:, 2] - chroma / 2
+        x = chroma * (1 - np.abs(hue % 2 - 1))
+        zero = np.zeros_like(chroma)
+        sector = np.floor(hue).astype(np.intp) % 6
+        table = np.stack(
+            [
+                np.stack([chroma, x, zero], axis=-1),
+                np.stack([x, chroma, zero], axis=-1),
+                np.stack([zero, chroma, x], axis=-1),
+                np.stack([zero, x, chroma], axis=-1),
+                np.stack([x, zero, chroma], axis=-1),
+                np.stack([chroma, zero, x], axis=-1),
+            ]
+        )
+        rgb = table[sector, np.arange(len(sector))] + m[:, None]
+
+    channels = np.rint(np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint32)
+    return (channels[:, 0] << 16) | (channels[:, 1] << 8) | channels[:, 2]
+
+
+def encode_colors(values: Iterable[int], space: str) -> Any:
+    """
+    Переводит цвета 0xRRGGBB в представление выбранного пространства.
+    С NumPy результатом является массив: "int" - uint32 (n,), "rgb" - uint8 (n, 3),
+    "hsv"/"hsl"/"lab" - float64 (n, 3); без NumPy - array('I') или список кортежей.
+    Для "hex" всегда возвращается список строк "#rrggbb".
+    Тон (H) задаётся в градусах [0, 360), насыщенность, яркость и светлота - в [0, 1].
+
+    :param values: Цвета в виде целых 0xRRGGBB.
+    :param space: Пространство: "int", "hex", "rgb", "hsv", "hsl" или "lab".
+    :return: Цвета в выбранном пространстве.
+    """
+
+    if space not in CONVERSION_SPACES:
+        raise ValueError(f"Неизвестное цветовое пространство: {space!r}")
+    if np is not None:
+        return _encode_numpy(values if isinstance(values, (array, memoryview)) else list(values), space)
+    return _encode_python(values, space)
+
+
+def decode_colors(data: Iterable[Any], space: str) -> Any:
+    """
+    Обратное преобразование к encode_colors: цвета выбранного пространства -> 0xRRGGBB.
+    Значения вне гаммы sRGB отсекаются.
+
+    :param data: Цвета в выбранном пространстве (массив (n, 3), последовательность кортежей или строк).
+    :param space: Пространство: "int", "hex", "rgb", "hsv", "hsl" или "lab".
+    :return: Массив uint32 (с NumPy) или array('I').
+    """
+
+    if space not in CONVERSION_SPACES:
+        raise ValueError(f"Неизвестное цветовое пространство: {space!r}")
+    if np is not None:
+        return _decode_numpy(data if space in ("int", "hex") else np.asarray(data), space)
+    return _decode_python(data, space)
+
+
+def convert_colors(data: Iterable[Any], source: str, target: str) -> Any:
+    """
+    Переводит массив цветов из одного пространства в другое (через 0xRRGGBB).
+
+    :param data: Цвета в пространстве source.
+    :param source: Исходное пространство.
+    :param target: Целевое пространство.
+    :return: Цвета в пространстве target (формат как у encode_colors).
+    """
+
+    return encode_colors(decode_colors(data, source), target)
+
+
+class NearestColorIndex:
+    """
+    Индекс для поиска ближайшего цвета палитры по евклидову расстоянию в пространстве RGB или Lab.
+    При наличии NumPy используется векторный перебор, иначе - k-d дерево на чистом Python.
+    """
+
+    __slots__ = ("space", "_points", "_norms", "_tree", "_flat")
+
+    def __init__(self, values: Sequence[int], space: str = "rgb") -> None:
+        """
+        Строит индекс по кодам цветов.
+
+        :param values: Коды цветов в виде целых 0xRRGGBB.
+        :param space: Пространство поиска: "rgb" или "lab".
+        """
+
+        if space not in COLOR_SPACES:
+            raise ValueError(f"Неизвестное цветовое пространство: {space!r}")
+
+        self.space = space
+        self._points: Any = None
+        self._norms: Any = None
+        self._tree: Any = None
+        self._flat: List[Tuple[float, float, float]] = []
+
+        if np is not None:
+            self._points = self._to_points_array(values)
+            self._norms = np.einsum("ij,ij->i", self._points, self._points)
+        else:
+            self._flat = [_to_point(value, space) for value in values]
+            self._tree = self._build(list(range(len(self._flat))), 0)
+
+    def __len__(self) -> int:
+        return len(self._points) if self._points is not None else len(self._flat)
+
+    def _to_points_array(self, values: Any) -> Any:
+        """
+        Переводит массив кодов в массив точек (n, 3) выбранного пространства.
+        """
+
+        values = np.asarray(values, dtype=np.uint32)
+        if self.space == "lab":
+            return _rgb_to_lab_array(values)
+        return np.stack([(values >> shift) & 0xFF for shift in (16, 8, 0)], axis=-1).astype(np.float64)
+
+    def query(self, value: int) -> int:
+        """
+        Возвращает позицию ближайшего цвета палитры (при равенстве расстояний - меньшую позицию).
+
+        :param value: Цвет в виде целого 0xRRGGBB.
+        :return: Позиция ближайшего цвета.
+        """
+
+        if len(self) == 0:
+            raise ValueError("Палитра пуста")
+
+        if self._points is not None:
+            point = self._to_points_array([value])[0]
+            return int(np.argmin(self._norms - 2 * (self._points @ point)))
+
+        best: List[Any] = [float("inf"), -1]
+        self._search(self._tree, _to_point(value, self.space), best)
+        return best[1]
+
+    def query_many(self, values: Sequence[int]) -> List[int]:
+        """
+        Пакетный вариант query: ищет ближайшие цвета для многих запросов за один вызов.
+        Матрица расстояний обрабатывается блоками, чтобы память оставалась ограниченной.
+
+        :param values: Цвета в виде целых 0xRRGGBB.
+        :return: Позиции ближайших цветов палитры.
+        """
+
+        if len(self) == 0:
+            raise ValueError("Палитра пуста")
+
+        if self._points is None:
+            return [self.query(value) for value in values]
+
+        queries = self._to_points_array(values)
+        block = max(1, _NEAREST_BLOCK_ELEMENTS // len(self))
+        result = np.empty(len(queries), dtype=np.intp)
+        for start in range(0, len(queries), block):
+            chunk = queries[start : start + block]
+            result[start : start + block] = np.argmin(self._norms - 2 * (chunk @ self._points.T), axis=1)
+        return result.tolist()
+
+    def _build(self, indices: List[int], depth: int) -> Any:
+        """
+        Рекурсивно строит k-d дерево. Узел - кортеж (позиция, ось, левое поддерево, правое поддерево).
+        """
+
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: (self._flat[i][axis], i))
+        mid = len(indices) // 2
+        return (
+            indices[mid],
+            axis,
+            self._build(indices[:mid], depth + 1),
+            self._build(indices[mid + 1 :], depth + 1),
+        )
+
+    def _search(self, node: Any, point: Tuple[float, float, float], best: List[Any]) -> None:
+        """
+        Рекурсивный поиск ближайшей точки с отсечением поддеревьев.
+        """
+
+        if node is None:
+            return
+        idx, axis, left, right = node
+        candidate = self._flat[idx]
+        dist = sum((candidate[k] - point[k]) ** 2 for k in range(3))
+        if dist < best[0] or (dist == best[0] and idx < best[1]):
+            best[0], best[1] = dist, idx
+
+        diff = point[axis] - candidate[axis]
+        near, far = (left, right) if diff < 0 else (right, left)
+        self._search(near, point, best)
+        if diff * diff <= best[0]:
+            self._search(far, point, best)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Нормализует название цвета для поиска: приводит регистр (casefold), заменяет "ё" на "е"
+    и схлопывает пробелы. Так "Красный" и "красный", "Жёлтый" и "желтый" совпадают.
+
+    :param name: Название цвета.
+    :return: Нормализованное название.
+    """
+
+    return " ".join(name.casefold().replace("ё", "е").split())
+
+
+class NameIndex:
+    """
+    Индекс нормализованных названий цветов: префиксное дерево (trie) для автодополнения
+    и поиска с ограниченным расстоянием редактирования (Левенштейна).
+    Узел дерева - словарь "символ -> дочерний узел"; ключ None хранит позиции цветов,
+    название которых заканчивается в этом узле.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        """
+        Строит индекс по названиям цветов.
+
+        :param names: Названия цветов в порядке их позиций в палитре.
+        """
+
+        self._root: Dict[Optional[str], Any] = {}
+        for position, name in enumerate(names):
+            self.add(name, position)
+
+    def add(self, name: str, position: int) -> None:
+        """
+        Добавляет название цвета в индекс.
+
+        :param name: Название цвета.
+        :param position: Позиция цвета в палитре.
+        """
+
+        node = self._root
+        for ch in normalize_name(name):
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(position)
+
+    def _find(self, prefix: str) -> Optional[Dict[Optional[str], Any]]:
+        """
+        Возвращает узел дерева, соответствующий нормализованному префиксу, или None.
+        """
+
+        node: Optional[Dict[Optional[str], Any]] = self._root
+        for ch in normalize_name(prefix):
+            if node is None:
+                break
+            node = node.get(ch)
+        return node
+
+    def lookup(self, name: str) -> List[int]:
+        """
+        Возвращает позиции цветов, нормализованное название которых совпадает с заданным.
+        """
+
+        node = self._find(name)
+        return list(node.get(None, ())) if node is not None else []
+
+    def complete(self, prefix: str, limit: int = 10) -> List[int]:
+        """
+        Возвращает позиции цветов, названия которых начинаются с prefix, в алфавитном порядке.
+        Обход прекращается, как только набрано limit результатов.
+
+        :param prefix: Начало названия.
+        :param limit: Максимальное количество результатов.
+        :return: Позиции цветов.
+        """
+
+        start = self._find(prefix)
+        if start is None:
+            return []
+
+        result: List[int] = []
+        stack = [start]
+        while stack and len(result) < limit:
+            node = stack.pop()
+            result.extend(node.get(None, ()))
+            # Дочерние узлы кладутся в обратном порядке, чтобы обходить их по алфавиту
+            stack.extend(node[ch] for ch in sorted((ch for ch in node if ch is not None), reverse=True))
+        return result[:limit]
+
+    def fuzzy(self, name: str, max_distance: int = 2, limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        Ищет названия на расстоянии Левенштейна не больше max_distance. Строки таблицы
+        динамического программирования вычисляются при обходе дерева и переиспользуются
+        для общих префиксов; ветви, где минимум строки превышает порог, отсекаются.
+
+        :param name: Искомое название (возможно, с опечаткой).
+        :param max_distance: Максимальное расстояние редактирования.
+        :param limit: Максимальное количество результатов.
+        :return: Пары (позиция, расстояние), упорядоченные по расстоянию.
+        """
+
+        word = normalize_name(name)
+        found: List[Tuple[int, int]] = []
+        first_row = list(range(len(word) + 1))
+        stack = [(child, ch, first_row) for ch, child in self._root.items() if ch is not None]
+        if first_row[-1] <= max_distance:
+            found.extend((position, first_row[-1]) for position in self._root.get(None, ()))
+
+        while stack:
+            node, ch, prev = stack.pop()
+            row = [prev[0] + 1]
+            for i in range(1, len(word) + 1):
+                cost = 0 if word[i - 1] == ch else 1
+                row.append(min(row[i - 1] + 1, prev[i] + 1, prev[i - 1] + cost))
+
+            if row[-1] <= max_distance:
+                found.extend((position, row[-1]) for position in node.get(None, ()))
+            if min(row) <= max_distance:
+                stack.extend((child, key, row) for key, child in node.items() if key is not None)
+
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found[:limit]
+
+
+class BasePalette(ABC, Mapping[str, str]):
+    """
+    Общая часть палитр: отображение название цвета -> шестнадцатеричный код, совместимое
+    со словарём, и запросы поверх него (обратный поиск, ближайший цвет, поиск по названию).
+    Наследники обязаны реализовать names, codes, index_of() и position_of_value().
+    """
+
+    __slots__ = ("_nearest", "_name_index", "_views")
+
+    def __init__(self) -> None:
+        """
+        Инициализирует кэши производных индексов палитры.
+        """
+
+        # Индексы ближайшего цвета по пространствам; сбрасываются при изменении палитры
+        self._nearest: Dict[str, NearestColorIndex] = {}
+        # Индекс нормализованных названий строится при первом обращении
+        self._name_index: Optional[NameIndex] = None
+        # Представления палитры в других цветовых пространствах
+        self._views: Dict[str, Any] = {}
+
+    @property
+    @abstractmethod
+    def names(self) -> Sequence[str]:
+        """
+        Названия цветов в порядке позиций.
+        """
+
+    @property
+    @abstractmethod
+    def codes(self) -> Sequence[int]:
+        """
+        Коды цветов в виде целых 0xRRGGBB в порядке позиций.
+        """
+
+    @abstractmethod
+    def index_of(self, name: str) -> Optional[int]:
+        """
+        Возвращает позицию цвета в палитре или None.
+        """
+
+    @abstractmethod
+    def position_of_value(self, value: int) -> Optional[int]:
+        """
+        Возвращает позицию первого цвета с кодом value или None.
+        """
+
+    def __getitem__(self, name: str) -> str:
+        idx = self.index_of(name)
+        if idx is None:
+            raise KeyError(name)
+        return format_hex(self.codes[idx])
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.index_of(name) is not None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def value_of(self, name: str) -> Optional[int]:
+        """
+        Возвращает код цвета в виде целого 0xRRGGBB или None.
+        """
+
+        idx = self.index_of(name)
+        return None if idx is None else self.codes[idx]
+
+    def name_of(self, code: Union[str, int]) -> Optional[str]:
+        """
+        Возвращает название цвета по коду или None.
+
+        :param code: Шестнадцатеричный код цвета или целое 0xRRGGBB.
+        """
+
+        try:
+            value = parse_hex(code) if isinstance(code, str) else code
+        except ValueError:
+            return None
+        idx = self.position_of_value(value)
+        return None if idx is None else self.names[idx]
+
+    def converted(self, space: str) -> Any:
+        """
+        Возвращает все цвета палитры в выбранном пространстве (формат как у encode_colors).
+        Преобразование выполняется один раз, результат кэшируется до изменения палитры;
+        массивы NumPy возвращаются только для чтения.
+
+        :param space: Пространство: "int", "hex", "rgb", "hsv", "hsl" или "lab".
+        """
+
+        view = self._views.get(space)
+        if view is None:
+            view = encode_colors(self.codes, space)
+            if np is not None and isinstance(view, np.ndarray):
+                view.flags.writeable = False
+            self._views[space] = view
+        return view
+
+    def nearest_index(self, space: str = "rgb") -> NearestColorIndex:
+        """
+        Возвращает индекс поиска ближайшего цвета для пространства, строя его при первом обращении.
+
+        :param space: Пространство поиска: "rgb" или "lab".
+        """
+
+        index = self._nearest.get(space)
+        if index is None:
+            index = self._nearest[space] = NearestColorIndex(self.codes, space)
+        return index
+
+    def nearest(self, code: Union[str, int], space: str = "rgb") -> Optional[str]:
+        """
+        Возвращает название цвета палитры, ближайшего к заданному коду.
+
+        :param code: Шестнадцатеричный код цвета или целое 0xRRGGBB.
+        :param space: Пространство поиска: "rgb" или "lab".
+        :return: Название ближайшего цвета или None, если палитра пуста.
+        """
+
+        if not len(self):
+            return None
+        value = parse_hex(code) if isinstance(code, str) else code
+        return self.names[self.nearest_index(space).query(value)]
+
+    def nearest_many(self, codes: Iterable[Union[str, int]], space: str = "rgb") -> List[str]:
+        """
+        Пакетный вариант nearest: возвращает названия ближайших цветов для всех кодов.
+
+        :param codes: Шестнадцатеричные коды цветов или целые 0xRRGGBB.
+        :param space: Пространство поиска: "rgb" или "lab".
+        :return: Названия ближайших цветов (пустой список, если палитра пуста).
+        """
+
+        values = [parse_hex(code) if isinstance(code, str) else code for code in codes]
+        if not len(self) or not values:
+            return []
+        names = self.names
+        return [names[idx] for idx in self.nearest_index(space).query_many(values)]
+
+    @property
+    def name_index(self) -> NameIndex:
+        """
+        Индекс нормализованных названий; строится при первом обращении.
+        """
+
+        if self._name_index is None:
+            self._name_index = NameIndex(self.names)
+        return self._name_index
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        Находит название цвета палитры: сначала точно, затем без учёта регистра и "е"/"ё".
+
+        :param name: Название цвета.
+        :return: Название цвета в том виде, в котором оно хранится в палитре, или None.
+        """
+
+        if self.index_of(name) is not None:
+            return name
+        positions = self.name_index.lookup(name)
+        return self.names[positions[0]] if positions else None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, начинающиеся с prefix (без учёта регистра и "е"/"ё").
+
+        :param prefix: Начало названия.
+        :param limit: Максимальное количество результатов.
+        """
+
+        names = self.names
+        return [names[idx] for idx in self.name_index.complete(prefix, limit)]
+
+    def fuzzy(self, name: str, max_distance: int = 2, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, отличающиеся от name не более чем на max_distance правок,
+        начиная с самых близких.
+
+        :param name: Название цвета, возможно, с опечаткой.
+        :param max_distance: Максимальное расстояние редактирования.
+        :param limit: Максимальное количество результатов.
+        """
+
+        names = self.names
+        return [names[idx] for idx, _ in self.name_index.fuzzy(name, max_distance, limit)]
+
+
+class Palette(BasePalette):
+    """
+    Палитра в памяти. Коды не хранятся строками, а форматируются из array('I') при обращении.
+    Индексы по названию и по коду, как и в MappedPalette, - массивы позиций, отсортированные
+    по названию и по паре (код, позиция); поиск в обе стороны выполняется двоичным поиском за O(log n)
+    и не требует словарей с упакованными целыми.
+    """
+
+    __slots__ = ("_names", "_codes", "_by_name", "_by_code")
+
+    def __init__(self, colors: Union[Mapping[str, str], Iterable[Tuple[str, Union[str, int]]]] = ()) -> None:
+        """
+        Инициализирует палитру. Повторяющееся название, как в словаре, заменяет код.
+
+        :param colors: Словарь {название: hex-код} или последовательность пар (название, hex-код).
+        """
+
+        super().__init__()
+        self._names: List[str] = []
+        self._codes = array("I")
+
+        # Временный словарь позиций нужен только для замены повторов и освобождается после построения
+        positions: Dict[str, int] = {}
+        items = colors.items() if isinstance(colors, Mapping) else colors
+        for name, code in items:
+            value = _color_code(code)
+            idx = positions.get(name)
+            if idx is None:
+                positions[name] = len(self._names)
+                self._names.append(name)
+                self._codes.append(value)
+            else:
+                self._codes[idx] = value
+        del positions
+
+        # Сортировка устойчива, поэтому позиции с одинаковым кодом идут по возрастанию
+        self._by_name = array("I", sorted(range(len(self._names)), key=self._names.__getitem__))
+        self._by_code = array("I", sorted(range(len(self._codes)), key=self._codes.__getitem__))
+
+    def _code_slot(self, value: int, idx: int) -> int:
+        """
+        Возвращает место пары (код, позиция) в индексе по коду.
+        """
+
+        codes = self._codes
+        return bisect_left(self._by_code, (value, idx), key=lambda i: (codes[i], i))
+
+    def add(self, name: str, code: Union[str, int]) -> int:
+        """
+        Добавляет цвет или заменяет код существующего. Индексы обновляются двоичным поиском
+        и вставкой в массив позиций, без перебора палитры.
+
+        :param name: Название цвета.
+        :param code: Шестнадцатеричный код цвета или целое 0xRRGGBB.
+        :return: Позиция цвета в палитре.
+        """
+
+        value = _color_code(code)
+        self._nearest.clear()
+        self._views.clear()
+
+        idx = self.index_of(name)
+        if idx is None:
+            idx = len(self._names)
+            self._names.append(name)
+            self._codes.append(value)
+            insort(self._by_name, idx, key=self._names.__getitem__)
+            if self._name_index is not None:
+                self._name_index.add(name, idx)
+        elif self._codes[idx] == value:
+            return idx
+        else:
+            # Остальные владельцы старого кода остаются в индексе по порядку позиций
+            del self._by_code[self._code_slot(self._codes[idx], idx)]
+            self._codes[idx] = value
+
+        self._by_code.insert(self._code_slot(value, idx), idx)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def index_of(self, name: str) -> Optional[int]:
+        names = self._names
+        i = bisect_left(self._by_name, name, key=names.__getitem__)
+        if i < len(self._by_name) and names[self._by_name[i]] == name:
+            return self._by_name[i]
+        return None
+
+    def position_of_value(self, value: int) -> Optional[int]:
+        # Среди позиций с одинаковым кодом первой идёт наименьшая, то есть первое название
+        i = bisect_left(self._by_code, value, key=self._codes.__getitem__)
+        if i < len(self._by_code) and self._codes[self._by_code[i]] == value:
+            return self._by_code[i]
+        return None
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def codes(self) -> array:
+        return self._codes
+
+
+def build_palette(colors: Mapping[str, Any], spellings: Dict[str, str]) -> Palette:
+    """
+    Строит палитру из словаря, сохраняя исходную запись кодов, которая отличается от "#rrggbb"
+    в нижнем регистре: "#FF0000", "#f00" или название цвета Tk "red". Такие записи попадают
+    в spellings; цвета без шестнадцатеричного кода в палитру не добавляются.
+
+    :param colors: Словарь "название цвета -> код".
+    :param spellings: Словарь, дополняемый исходными записями кодов по названию.
+    :return: Палитра.
+    """
+
+    def hex_items() -> Iterator[Tuple[str, Union[str, int]]]:
+        for name, code in colors.items():
+            if isinstance(code, str):
+                try:
+                    value = parse_hex(code)
+                except ValueError:
+                    spellings[name] = code
+                    continue
+                if format_hex(value) != code:
+                    spellings[name] = code
+            yield name, code
+
+    return Palette(hex_items())
+
+
+class _MappedNames(Sequence[str]):
+    """
+    Последовательность названий отображённой палитры; названия декодируются при обращении.
+    """
+
+    __slots__ = ("_palette",)
+
+    def __init__(self, palette: "MappedPalette") -> None:
+        self._palette = palette
+
+    def __len__(self) -> int:
+        return self._palette._count
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._palette._name_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Индекс цвета вне диапазона")
+        return self._palette._name_at(index)
+
+
+class MappedPalette(BasePalette):
+    """
+    Палитра только для чтения, открытая из скомпилированного двоичного файла через mmap.
+    Файл не разбирается при открытии: коды, смещения названий и отсортированные индексы
+    читаются прямо из отображённой памяти, поиск по названию и коду - двоичный, за O(log n).
+    """
+
+    __slots__ = ("path", "_file", "_mm", "_count", "_codes", "_offsets", "_by_name", "_by_code", "_blob", "_names")
+
+    def __init__(self, path: str) -> None:
+        """
+        Открывает скомпилированную палитру.
+
+        :param path: Путь к файлу, созданному compile_palette().
+        """
+
+        super().__init__()
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память
+            self._file.close()
+            raise ValueError(f"Файл {path} не является скомпилированной палитрой") from None
+
+        try:
+            if len(self._mm) < _PALETTE_HEADER.size:
+                raise ValueError(f"Файл {path} не является скомпилированной палитрой")
+            magic, version, count, blob_size = _PALETTE_HEADER.unpack_from(self._mm, 0)
+            blob = _PALETTE_HEADER.size + 4 * (4 * count + 1)
+            if magic != _PALETTE_MAGIC or version != _PALETTE_VERSION or len(self._mm) < blob + blob_size:
+                raise ValueError(f"Файл {path} не является скомпилированной палитрой")
+
+            self._count: int = count
+            offset = _PALETTE_HEADER.size
+            self._codes = self._u32_array(offset, count)
+            self._offsets = self._u32_array(offset + 4 * count, count + 1)
+            self._by_name = self._u32_array(offset + 4 * (2 * count + 1), count)
+            self._by_code = self._u32_array(offset + 4 * (3 * count + 1), count)
+            self._blob = blob
+            self._names = _MappedNames(self)
+        except BaseException:
+            self._mm.close()
+            self._file.close()
+            raise
+
+    def _u32_array(self, offset: int, count: int) -> Sequence[int]:
+        """
+        Возвращает массив uint32 из файла: окно memoryview без копирования
+        (на машинах с обратным порядком байт - копию с переставленными байтами).
+        """
+
+        if sys.byteorder == "little":
+            return memoryview(self._mm)[offset : offset + 4 * count].cast("I")
+        values = array("I", self._mm[offset : offset + 4 * count])
+        values.byteswap()
+        return values
+
+    def _name_bytes(self, idx: int) -> bytes:
+        """
+        Возвращает название цвета в кодировке UTF-8.
+        """
+
+        return self._mm[self._blob + self._offsets[idx] : self._blob + self._offsets[idx + 1]]
+
+    def _name_at(self, idx: int) -> str:
+        """
+        Декодирует название цвета по позиции.
+        """
+
+        return self._name_bytes(idx).decode("utf-8")
+
+    @property
+    def names(self) -> Sequence[str]:
+        return self._names
+
+    @property
+    def codes(self) -> Sequence[int]:
+        return self._codes
+
+    def __len__(self) -> int:
+        return self._count
+
+    def index_of(self, name: str) -> Optional[int]:
+        key = name.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_bytes(self._by_name[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._name_bytes(self._by_name[lo]) == key:
+            return self._by_name[lo]
+        return None
+
+    def position_of_value(self, value: int) -> Optional[int]:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._codes[self._by_code[mid]] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._codes[self._by_code[lo]] == value:
+            return self._by_code[lo]
+        return None
+
+    def close(self) -> None:
+        """
+        Закрывает палитру и освобождает отображение файла.
+        """
+
+        self._nearest.clear()
+        self._views.clear()
+        self._name_index = None
+        for view in (self._codes, self._offsets, self._by_name, self._by_code):
+            if isinstance(view, memoryview):
+                view.release()
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedPalette":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def compile_palette(
+    colors: Union[BasePalette, Mapping[str, str], Iterable[Tuple[str, Union[str, int]]]], path: str
+) -> None:
+    """
+    Записывает палитру в двоичный формат для MappedPalette: заголовок, коды, смещения названий,
+    позиции, отсортированные по названию и по коду, и названия в UTF-8.
+
+    :param colors: Палитра, словарь {название: hex-код} или последовательность пар.
+    :param path: Путь к создаваемому файлу.
+    """
+
+    palette = colors if isinstance(colors, BasePalette) else Palette(colors)
+    names = [name.encode("utf-8") for name in palette.names]
+    codes = array("I", palette.codes)
+    count = len(names)
+
+    offsets = array("I", [0])
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+    by_name = array("I", sorted(range(count), key=names.__getitem__))
+    by_code = array("I", sorted(range(count), key=lambda i: (codes[i], i)))
+
+    with open(path, "wb") as file:
+        file.write(_PALETTE_HEADER.pack(_PALETTE_MAGIC, _PALETTE_VERSION, count, offsets[-1]))
+        for values in (codes, offsets, by_name, by_code):
+            if sys.byteorder != "little":
+                values.byteswap()
+            file.write(values.tobytes())
+        for name in names:
+            file.write(name)
+
+
+def _color_value(value: Any) -> int:
+    """
+    Преобразует значение цвета из файла палитры (hex-строка, целое или [r, g, b]) в 0xRRGGBB.
+    """
+
+    if isinstance(value, str):
+        return parse_hex(value.strip())
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 0xFFFFFF:
+        return value
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        r, g, b = value
+        if all(isinstance(c, int) and 0 <= c <= 255 for c in (r, g, b)):
+            return (r << 16) | (g << 8) | b
+    raise ValueError(f"Некорректное значение цвета: {value!r}")
+
+
+def iter_css_palette(lines: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Построчно читает CSS с объявлениями вида "--red: #ff0000;" или "red: #f00;".
+
+    :param lines: Строки файла.
+    :return: Итератор пар (название, код 0xRRGGBB).
+    """
+
+    for line in lines:
+        for match in _CSS_DECLARATION_RE.finditer(line):
+            yield match.group(1), parse_hex(match.group(2))
+
+
+def iter_x11_palette(lines: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Построчно читает палитру в формате X11 rgb.txt ("255 250 250\t\tsnow").
+    Комментарии ("!") и некорректные строки пропускаются.
+
+    :param lines: Строки файла.
+    :return: Итератор пар (название, код 0xRRGGBB).
+    """
+
+    for line in lines:
+        parts = line.split(None, 3)
+        if len(parts) != 4 or line.lstrip().startswith("!"):
+            continue
+        try:
+            r, g, b = (int(part) for part in parts[:3])
+            yield parts[3].strip(), _color_value([r, g, b])
+        except ValueError:
+            continue
+
+
+def iter_csv_palette(lines: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """
+    Построчно читает CSV со столбцами "название,hex-код" или "название,r,g,b".
+    Заголовок и некорректные строки пропускаются.
+
+    :param lines: Строки файла (файл следует открывать с newline="").
+    :return: Итератор пар (название, код 0xRRGGBB).
+    """
+
+    for row in csv.reader(lines):
+        try:
+            if len(row) == 2:
+                yield row[0].strip(), parse_hex(row[1].strip())
+            elif len(row) == 4:
+                yield row[0].strip(), _color_value([int(part) for part in row[1:]])
+        except ValueError:
+            continue
+
+
+def iter_json_palette(file: TextIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, int]]:
+    """
+    Потоково читает JSON-палитру: объект {"название": "#hex", ...} или массив элементов
+    {"name": ..., "hex": ...} либо ["название", "#hex"]. Файл читается блоками по chunk_size
+    символов, в памяти держится только текущий блок, а не весь текст.
+
+    :param file: Открытый текстовый файл.
+    :param chunk_size: Размер блока чтения.
+    :return: Итератор пар (название, код 0xRRGGBB).
+    """
+
+    stream = _JsonStream(file, chunk_size)
+    opening = stream.peek()
+    if opening not in ("{", "["):
+        raise ValueError("JSON-палитра должна быть объектом или массивом")
+    stream.pos += 1
+    closing = "}" if opening == "{" else "]"
+
+    if stream.peek() == closing:
+        return
+    while True:
+        if opening == "{":
+            name = stream.value()
+            if stream.peek() != ":":
+                raise ValueError("Ожидалось ':' в JSON-палитре")
+            stream.pos += 1
+            value = stream.value()
+        else:
+            item = stream.value()
+            if isinstance(item, dict):
+                name, value = item.get("name"), item.get("hex", item.get("code", item.get("color")))
+            elif isinstance(item, list) and len(item) == 2:
+                name, value = item
+            else:
+                raise ValueError(f"Некорректный элемент JSON-палитры: {item!r}")
+        if not isinstance(name, str):
+            raise ValueError(f"Некорректное название цвета: {name!r}")
+        yield name, _color_value(value)
+
+        separator = stream.peek()
+        stream.pos += 1
+        if separator == closing:
+            return
+        if separator != ",":
+            raise ValueError("Ожидалось ',' в JSON-палитре")
+
+
+# Ошибка разбора ближе этого числа символов к концу буфера может быть вызвана обрезанным
+# токеном ("tru", "\u00", "1e"), и тогда буфер дочитывается; более ранняя ошибка окончательна
+_JSON_LOOKAHEAD = 16
+
+
+class _JsonStream:
+    """
+    Буфер для потокового разбора JSON: значения разбираются json.JSONDecoder.raw_decode,
+    а буфер дочитывается из файла, только когда значение не помещается в него целиком.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Дочитывает следующий блок, отбрасывая уже разобранную часть буфера.
+        """
+
+        data = self.file.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Пропускает пробельные символы и возвращает следующий символ ("" в конце файла).
+        """
+
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def value(self) -> Any:
+        """
+        Разбирает следующее JSON-значение. Буфер дочитывается, только если значение
+        может продолжаться в следующем блоке; ошибка внутри прочитанных данных сообщается сразу.
+
+        :raises ValueError: Если JSON некорректен.
+        """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Незакрытая строка или ошибка у самого конца буфера - признак обрезанного значения
+                truncated = e.msg.startswith("Unterminated string") or len(self.buffer) - e.pos < _JSON_LOOKAHEAD
+                if not truncated or self.eof or not self._fill():
+                    raise ValueError("Некорректная JSON-палитра") from None
+                continue
+            # Число у конца буфера может продолжаться в следующем блоке
+            if len(self.buffer) - end < _JSON_LOOKAHEAD and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+# Форматы файлов палитр по расширению
+PALETTE_FORMATS: Dict[str, str] = {".css": "css", ".txt": "x11", ".json": "json", ".csv": "csv", ".cpal": "binary"}
+
+
+def iter_palette_file(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Потоково читает текстовый файл палитры.
+
+    :param path: Путь к файлу.
+    :param fmt: Формат: "css", "x11", "json" или "csv" (по умолчанию - по расширению).
+    :return: Итератор пар (название, код 0xRRGGBB).
+    """
+
+    fmt = fmt or PALETTE_FORMATS.get(os.path.splitext(path)[1].lower())
+    with open(path, "r", encoding="utf-8", newline="" if fmt == "csv" else None) as file:
+        if fmt == "css":
+            yield from iter_css_palette(file)
+        elif fmt == "x11":
+            yield from iter_x11_palette(file)
+        elif fmt == "csv":
+            yield from iter_csv_palette(file)
+        elif fmt == "json":
+            yield from iter_json_palette(file)
+        else:
+            raise ValueError(f"Неизвестный формат палитры: {path}")
+
+
+def load_palette(path: str, fmt: Optional[str] = None) -> BasePalette:
+    """
+    Загружает палитру из файла. Скомпилированная палитра (.cpal) открывается через mmap
+    без разбора, текстовые форматы читаются потоково в компактную Palette.
+
+    :param path: Путь к файлу.
+    :param fmt: Формат: "css", "x11", "json", "csv" или "binary" (по умолчанию - по расширению).
+    :return: Палитра.
+    """
+
+    fmt = fmt or PALETTE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt == "binary":
+        return MappedPalette(path)
+    return Palette(iter_palette_file(path, fmt))
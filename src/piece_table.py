@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Модель документа редактора (task_4) на основе таблицы фрагментов (piece table).
+Текст хранится как последовательность ссылок на неизменяемые буферы - байты UTF-8 исходного
+файла и строки вставленного текста, - поэтому загрузка не копирует содержимое файла,
+а память растёт только на размер правок. Фрагменты лежат в декартовом дереве (treap),
+узлы которого хранят суммарные длины и количества переводов строк поддеревьев: вставка,
+удаление и перевод позиции в строку выполняются за O(log n). Дерево неизменяемое - правка
+копирует только путь от корня, поэтому снимок документа для отмены правок стоит O(1).
+"""
+
+import random
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+
+# Наибольший размер фрагмента: символов для строк, байт для исходного буфера.
+# Операции внутри фрагмента (деление, поиск перевода строки) просматривают не больше PIECE_SIZE элементов
+PIECE_SIZE = 4096
+
+# Короткие вставки дописываются к предыдущему фрагменту из вставленного текста, пока он
+# не длиннее COALESCE_LIMIT символов, чтобы посимвольный ввод не порождал узел на каждый символ
+COALESCE_LIMIT = 256
+
+# Буфер фрагмента: строка или байты UTF-8 (bytes, mmap)
+Buffer = Union[str, bytes]
+
+# Фрагмент: (буфер, начало, конец, символов, переводов строки); начало и конец - в элементах буфера
+Piece = Tuple[Buffer, int, int, int, int]
+
+_random = random.Random()
+
+
+class _Node:
+    """
+    Узел дерева фрагментов. После построения не изменяется.
+    """
+
+    __slots__ = ("left", "right", "data", "start", "end", "chars", "newlines", "priority", "total", "total_newlines")
+
+    def __init__(self, left: "Optional[_Node]", right: "Optional[_Node]", piece: Piece, priority: float) -> None:
+        self.left = left
+        self.right = right
+        self.data, self.start, self.end, self.chars, self.newlines = piece
+        self.priority = priority
+        self.update()
+
+    def update(self) -> None:
+        """
+        Пересчитывает суммы поддерева.
+        """
+
+        self.total = self.chars + _total(self.left) + _total(self.right)
+        self.total_newlines = self.newlines + _newlines(self.left) + _newlines(self.right)
+
+    @property
+    def piece(self) -> Piece:
+        return self.data, self.start, self.end, self.chars, self.newlines
+
+    def text(self) -> str:
+        """
+        Текст фрагмента; фрагмент исходного буфера декодируется.
+        """
+
+        if isinstance(self.data, str):
+            return self.data[self.start : self.end]
+        return bytes(self.data[self.start : self.end]).decode("utf-8")
+
+
+def _total(node: Optional[_Node]) -> int:
+    return node.total if node is not None else 0
+
+
+def _newlines(node: Optional[_Node]) -> int:
+    return node.total_newlines if node is not None else 0
+
+
+def _split_piece(node: _Node, k: int) -> Tuple[Piece, Piece]:
+    """
+    Делит фрагмент узла на первые k символов и остаток (0 < k < node.chars).
+    """
+
+    data, start, end = node.data, node.start, node.end
+    if isinstance(data, str):
+        middle = start + k
+        left_newlines = data.count("\n", start, middle)
+    else:
+        text = node.text()
+        middle = start + len(text[:k].encode("utf-8"))
+        left_newlines = text.count("\n", 0, k)
+    return (
+        (data, start, middle, k, left_newlines),
+        (data, middle, end, node.chars - k, node.newlines - left_newlines),
+    )
+
+
+def _split(node: Optional[_Node], k: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """
+    Делит дерево на первые k символов и остаток, копируя только узлы на пути деления.
+    """
+
+    if node is None:
+        return None, None
+    left_chars = _total(node.left)
+    if k <= left_chars:
+        if k == 0 and node.left is None:
+            return None, node
+        left, right = _split(node.left, k)
+        return left, _Node(right, node.right, node.piece, node.priority)
+    k -= left_chars
+    if k >= node.chars:
+        if k == node.chars and node.right is None:
+            return node, None
+        left, right = _split(node.right, k - node.chars)
+        return _Node(node.left, left, node.piece, node.priority), right
+    first, second = _split_piece(node, k)
+    return _Node(node.left, None, first, node.priority), _Node(None, node.right, second, node.priority)
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    """
+    Соединяет два дерева: все фрагменты left идут перед фрагментами right.
+    """
+
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return _Node(left.left, _merge(left.right, right), left.piece, left.priority)
+    return _Node(_merge(left, right.left), right.right, right.piece, right.priority)
+
+
+def _build(pieces: List[Piece]) -> Optional[_Node]:
+    """
+    Строит дерево из фрагментов за O(n): узлы со случайными приоритетами связываются стеком
+    правой ветви, затем суммы поддеревьев пересчитываются снизу вверх.
+    """
+
+    stack: List[_Node] = []
+    for piece in pieces:
+        node = _Node(None, None, piece, _random.random())
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    if not stack:
+        return None
+
+    # Обход в обратном порядке (правое поддерево, левое, узел) без рекурсии
+    order: List[_Node] = []
+    pending = [stack[0]]
+    while pending:
+        node = pending.pop()
+        order.append(node)
+        for child in (node.left, node.right):
+            if child is not None:
+                pending.append(child)
+    for node in reversed(order):
+        node.update()
+    return stack[0]
+
+
+def _text_pieces(text: str) -> List[Piece]:
+    """
+    Разбивает строку на фрагменты по PIECE_SIZE символов, ссылающиеся на неё без копирования.
+    """
+
+    pieces: List[Piece] = []
+    for start in range(0, len(text), PIECE_SIZE):
+        end = min(start + PIECE_SIZE, len(text))
+        pieces.append((text, start, end, end - start, text.count("\n", start, end)))
+    return pieces
+
+
+def _utf8_pieces(data: bytes, size: int, pieces: List[Piece], texts: Optional[List[str]] = None) -> None:
+    """
+    Делит байты UTF-8 data[:size] на фрагменты не длиннее PIECE_SIZE байт, ссылающиеся на data.
+    Каждый фрагмент декодируется, чтобы проверить его и посчитать символы; тексты фрагментов
+    добавляются в texts, если он передан.
+
+    :raises UnicodeDecodeError: data - не UTF-8.
+    """
+
+    start = 0
+    while start < size:
+        end = min(start + PIECE_SIZE, size)
+        # Фрагмент не должен разрезать многобайтовый символ: у символа UTF-8 не больше трёх
+        # байт продолжения, поэтому граница сдвигается назад не больше чем на три байта.
+        # Если начало символа так и не найдено, данные - не UTF-8, и это покажет декодирование
+        limit = max(start + 1, end - 3)
+        while limit < end < size and data[end] & 0xC0 == 0x80:
+            end -= 1
+        text = bytes(data[start:end]).decode("utf-8")
+        pieces.append((data, start, end, len(text), text.count("\n")))
+        if texts is not None:
+            texts.append(text)
+        start = end
+
+
+def _normalize_newlines(text: str) -> str:
+    """
+    Приводит переводы строк "\\r\\n" и "\\r" к "\\n", как текстовое поле.
+    """
+
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _complete_length(data: bytes) -> int:
+    """
+    Возвращает длину data без незавершённого многобайтового символа UTF-8 в конце.
+    """
+
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:
+            size = 1 if byte < 0x80 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return len(data) - back if size > back else len(data)
+    # Одни байты продолжения: данные не UTF-8, это покажет декодирование
+    return len(data)
+
+
+class PieceTableBuilder:
+    """
+    Пошаговое построение документа из последовательных блоков байт UTF-8 по мере чтения файла:
+    фрагменты ссылаются на сами блоки, поэтому содержимое не копируется и не собирается целиком.
+    Незавершённый многобайтовый символ и "\\r" в конце блока переносятся в следующий блок;
+    блоки с "\\r" приводятся к "\\n" и хранятся строкой, как в PieceTable.from_bytes.
+    """
+
+    __slots__ = ("_pieces", "_rest")
+
+    def __init__(self) -> None:
+        self._pieces: List[Piece] = []
+        # Перенесённый в следующий блок конец предыдущего (не больше четырёх байт)
+        self._rest = b""
+
+    def feed(self, data: bytes, final: bool = False) -> str:
+        """
+        Добавляет очередной блок.
+
+        :param data: Байты блока; они не должны меняться, пока документ используется.
+        :param final: Последний блок: перенесённый остаток должен в нём завершиться.
+        :return: Текст, добавленный в документ (переводы строк приведены к "\\n").
+        :raises UnicodeDecodeError: Данные - не UTF-8.
+        """
+
+        if self._rest:
+            data = self._rest + data
+        size = len(data)
+        if not final:
+            size = _complete_length(data)
+            # "\r" может оказаться первой половиной "\r\n"
+            if size and data[size - 1] == 0x0D:
+                size -= 1
+        self._rest = bytes(data[size:])
+
+        if data.find(b"\r", 0, size) >= 0:
+            text = _normalize_newlines(bytes(data[:size]).decode("utf-8"))
+            self._pieces.extend(_text_pieces(text))
+            return text
+        texts: List[str] = []
+        _utf8_pieces(data, size, self._pieces, texts)
+        return "".join(texts)
+
+    def document(self) -> "PieceTable":
+        """
+        Возвращает документ из добавленных блоков.
+
+        :raises UnicodeDecodeError: Последний блок не передан с final=True, и остался незавершённый символ.
+        """
+
+        if self._rest:
+            self.feed(b"", final=True)
+        return PieceTable._from_root(_build(self._pieces))
+
+
+class PieceTable:
+    """
+    Неизменяемый текстовый документ: правки возвращают новый документ, разделяющий с исходным
+    все не затронутые фрагменты. Позиции - номера символов с нуля; строки и символы в строке
+    считаются так же, как в текстовом поле Tk (переводы строк - "\\n").
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, text: str = "") -> None:
+        """
+        Создаёт документ из строки; фрагменты ссылаются на неё без копирования.
+
+        :param text: Текст документа.
+        """
+
+        self._root = _build(_text_pieces(text))
+
+    @classmethod
+    def _from_root(cls, root: Optional[_Node]) -> "PieceTable":
+        document = cls.__new__(cls)
+        document._root = root
+        return document
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PieceTable":
+        """
+        Создаёт документ из байтов UTF-8, не копируя их: фрагменты ссылаются на data.
+        Содержимое один раз декодируется, чтобы проверить его и посчитать символы.
+        Переводы строк "\\r\\n" и "\\r" приводятся к "\\n", как при загрузке в текстовое поле,
+        поэтому такие файлы копируются в строку.
+
+        :param data: Байты файла (bytes или mmap; они не должны меняться, пока документ используется).
+        :return: Документ.
+        :raises UnicodeDecodeError: data - не UTF-8.
+        """
+
+        if data.find(b"\r") >= 0:
+            return cls(_normalize_newlines(bytes(data).decode("utf-8")))
+        pieces: List[Piece] = []
+        _utf8_pieces(data, len(data), pieces)
+        return cls._from_root(_build(pieces))
+
+    def __len__(self) -> int:
+        return _total(self._root)
+
+    @property
+    def line_count(self) -> int:
+        """
+        Количество строк, как в текстовом поле: на единицу больше количества переводов строки.
+        """
+
+        return _newlines(self._root) + 1
+
+    @property
+    def piece_count(self) -> int:
+        """
+        Количество фрагментов документа.
+        """
+
+        count = 0
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            node = pending.pop()
+            count += 1
+            pending.extend(child for child in (node.left, node.right) if child is not None)
+        return count
+
+    def insert(self, position: int, text: str) -> "PieceTable":
+        """
+        Вставляет текст перед символом position.
+
+        :param position: Позиция вставки (ограничивается длиной документа).
+        :param text: Вставляемый текст; на него ссылаются новые фрагменты.
+        :return: Новый документ.
+        """
+
+        if not text:
+            return self
+        left, right = _split(self._root, min(max(position, 0), len(self)))
+        if len(text) <= COALESCE_LIMIT and left is not None:
+            last = left
+            while last.right is not None:
+                last = last.right
+            if isinstance(last.data, str) and last.chars + len(text) <= COALESCE_LIMIT:
+                left = _split(left, left.total - last.chars)[0]
+                text = last.text() + text
+        middle = _build(_text_pieces(text))
+        return self._from_root(_merge(_merge(left, middle), right))
+
+    def delete(self, start: int, end: int) -> "PieceTable":
+        """
+        Удаляет символы с start по end - 1.
+
+        :return: Новый документ.
+        """
+
+        start, end = max(start, 0), min(end, len(self))
+        if start >= end:
+            return self
+        left, rest = _split(self._root, start)
+        return self._from_root(_merge(left, _split(rest, end - start)[1]))
+
+    def replace(self, start: int, end: int, text: str) -> "PieceTable":
+        """
+        Заменяет символы с start по end - 1 текстом text.
+
+        :return: Новый документ.
+        """
+
+        return self.delete(start, end).insert(start, text)
+
+    def _nodes(self, root: Optional[_Node]) -> Iterator[_Node]:
+        """
+        Обходит узлы дерева по порядку без рекурсии.
+        """
+
+        stack: List[_Node] = []
+        node = root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def chunks(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        Текст документа с start по end - 1 по фрагментам.
+        """
+
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return
+        middle = self._root
+        if start > 0 or end < len(self):
+            middle = _split(_split(self._root, end)[0], start)[1]
+        for node in self._nodes(middle):
+            yield node.text()
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Текст документа с start по end - 1.
+        """
+
+        return "".join(self.chunks(start, end))
+
+    def utf8_chunks(self) -> Iterator[Union[bytes, memoryview]]:
+        """
+        Содержимое документа в UTF-8 по фрагментам. Идущие подряд участки исходного буфера
+        выдаются одним memoryview без копирования, вставленный текст кодируется.
+        """
+
+        run: Optional[Tuple[Any, int, int]] = None
+        for node in self._nodes(self._root):
+            if isinstance(node.data, str):
+                if run is not None:
+                    yield memoryview(run[0])[run[1] : run[2]]
+                    run = None
+                yield node.data[node.start : node.end].encode("utf-8")
+            elif run is not None and run[0] is node.data and run[2] == node.start:
+                run = (run[0], run[1], node.end)
+            else:
+                if run is not None:
+                    yield memoryview(run[0])[run[1] : run[2]]
+                run = (node.data, node.start, node.end)
+        if run is not None:
+            yield memoryview(run[0])[run[1] : run[2]]
+
+    def line_start(self, line: int) -> int:
+        """
+        Позиция начала строки line (с нуля); для строк за концом документа - его длина.
+        """
+
+        if line <= 0:
+            return 0
+        node, offset = self._root, 0
+        while node is not None:
+            left_newlines = _newlines(node.left)
+            if line <= left_newlines:
+                node = node.left
+                continue
+            line -= left_newlines
+            offset += _total(node.left)
+            if line <= node.newlines:
+                text = node.text()
+                pos = -1
+                for _ in range(line):
+                    pos = text.find("\n", pos + 1)
+                return offset + pos + 1
+            line -= node.newlines
+            offset += node.chars
+            node = node.right
+        return len(self)
+
+    def offset_of(self, line: int, column: int) -> int:
+        """
+        Позиция символа column строки line (оба с нуля). Номер символа не ограничивается
+        длиной строки: индексы текстового поля Tk уже приведены к существующим позициям.
+        """
+
+        return min(self.line_start(line) + column, len(self))
+
+    def position_of(self, offset: int) -> Tuple[int, int]:
+        """
+        Переводит позицию в пару (номер строки, номер символа в строке), оба с нуля.
+        """
+
+        offset = min(max(offset, 0), len(self))
+        node, rest, line = self._root, offset, 0
+        while node is not None:
+            left_chars = _total(node.left)
+            if rest <= left_chars:
+                node = node.left
+                continue
+            rest -= left_chars
+            line += _newlines(node.left)
+            if rest <= node.chars:
+                line += node.text().count("\n", 0, rest)
+                break
+            rest -= node.chars
+            line += node.newlines
+            node = node.right
+        return line, offset - self.line_start(line)
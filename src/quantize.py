@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Постеризация изображений под фиксированную палитру ColorManager (task_2, task_3).
+Каждый пиксель RGB-изображения (PPM P6, PAM P7 или «сырой» буфер bytes/memoryview)
+заменяется номером ближайшего цвета палитры. Изображение обрабатывается полосами строк
+через срезы memoryview без копирования, при необходимости - в пуле процессов;
+в памяти одновременно находится ограниченное число полос, поэтому размер изображения
+не влияет на потребление памяти.
+"""
+
+import sys
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, BinaryIO, Deque, Dict, List, NamedTuple, Optional
+
+from src.palette import NearestColorIndex
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy необязателен
+    np = None  # type: ignore
+
+# Форматы результата: PGM с номерами цветов, номера без заголовка, постеризованный PPM
+OUTPUT_FORMATS = ("pgm", "raw", "ppm")
+
+# Количество строк изображения в одной полосе по умолчанию
+DEFAULT_TILE_ROWS = 64
+
+# Предельный размер кэша «цвет -> номер» в реализации без NumPy
+_CACHE_LIMIT = 1 << 16
+
+# Квантователь процесса-исполнителя, создаётся инициализатором пула
+_worker_quantizer: Optional["PaletteQuantizer"] = None
+
+
+class ImageHeader(NamedTuple):
+    """
+    Параметры изображения из заголовка PPM/PAM.
+    """
+
+    width: int
+    height: int
+    channels: int
+
+    @property
+    def row_bytes(self) -> int:
+        """
+        Размер одной строки пикселей в байтах.
+        """
+
+        return self.width * self.channels
+
+
+def _read_token(stream: BinaryIO) -> bytes:
+    """
+    Читает очередное поле заголовка PPM, пропуская пробельные символы и комментарии.
+    Поле завершается ровно одним пробельным символом, который тоже считывается.
+    """
+
+    token = b""
+    while True:
+        char = stream.read(1)
+        if not char:
+            if token:
+                return token
+            raise ValueError("Неожиданный конец заголовка изображения")
+        if char == b"#" and not token:
+            stream.readline()
+        elif char.isspace():
+            if token:
+                return token
+        else:
+            token += char
+
+
+def read_image_header(stream: BinaryIO) -> ImageHeader:
+    """
+    Читает заголовок двоичного PPM (P6) или PAM (P7) с 8-битными каналами.
+    После вызова поток указывает на начало данных пикселей.
+
+    :param stream: Двоичный поток изображения.
+    :return: Параметры изображения.
+    """
+
+    magic = stream.read(2)
+    if magic == b"P6":
+        fields = [int(_read_token(stream)) for _ in range(3)]
+        width, height, maxval = fields
+        channels = 3
+    elif magic == b"P7":
+        params: Dict[str, str] = {}
+        while True:
+            line = stream.readline()
+            if not line:
+                raise ValueError("Неожиданный конец заголовка PAM")
+            words = line.decode("ascii").split("#", 1)[0].split()
+            if not words:
+                continue
+            if words[0] == "ENDHDR":
+                break
+            params[words[0]] = " ".join(words[1:])
+        try:
+            width, height = int(params["WIDTH"]), int(params["HEIGHT"])
+            channels, maxval = int(params["DEPTH"]), int(params["MAXVAL"])
+        except (KeyError, ValueError) as exc:
+            raise ValueError(f"Некорректный заголовок PAM: {exc}") from None
+        if channels not in (3, 4):
+            raise ValueError(f"Поддерживаются только изображения RGB и RGB_ALPHA, DEPTH={channels}")
+    else:
+        raise ValueError("Поддерживаются только двоичные PPM (P6) и PAM (P7)")
+
+    if maxval != 255:
+        raise ValueError(f"Поддерживаются только 8-битные каналы, MAXVAL={maxval}")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Некорректный размер изображения: {width}x{height}")
+    return ImageHeader(width, height, channels)
+
+
+def output_header(header: ImageHeader, output: str, palette_size: int) -> bytes:
+    """
+    Формирует заголовок результата: PGM с максимальным значением, равным номеру
+    последнего цвета палитры, или PPM; для "raw" заголовок пуст.
+
+    :param header: Параметры исходного изображения.
+    :param output: Формат результата из OUTPUT_FORMATS.
+    :param palette_size: Количество цветов палитры.
+    """
+
+    if output == "pgm":
+        return f"P5\n{header.width} {header.height}\n{max(palette_size - 1, 1)}\n".encode("ascii")
+    if output == "ppm":
+        return f"P6\n{header.width} {header.height}\n255\n".encode("ascii")
+    return b""
+
+
+class PaletteQuantizer:
+    """
+    Переводит полосы пикселей в номера ближайших цветов палитры.
+    Номера записываются одним байтом для палитр до 256 цветов, иначе двумя байтами
+    в порядке big-endian (как в PGM с максимальным значением больше 255).
+    """
+
+    __slots__ = ("codes", "_index", "_cache", "_table")
+
+    def __init__(self, codes: Sequence[int], space: str = "rgb") -> None:
+        """
+        Строит индекс поиска ближайшего цвета.
+
+        :param codes: Цвета палитры в виде целых 0xRRGGBB.
+        :param space: Пространство сравнения: "rgb" или "lab".
+        """
+
+        if not codes:
+            raise ValueError("Палитра пуста")
+        if len(codes) > 1 << 16:
+            raise ValueError("Палитра содержит больше 65536 цветов")
+        self.codes = list(codes)
+        self._index = NearestColorIndex(self.codes, space)
+        # Кэш найденных цветов для реализации без NumPy
+        self._cache: Dict[int, int] = {}
+        # Таблица цветов палитры (n, 3) для постеризованного вывода
+        self._table: Any = None
+
+    @property
+    def index_size(self) -> int:
+        """
+        Размер номера цвета в байтах.
+        """
+
+        return 1 if len(self.codes) <= 256 else 2
+
+    def quantize(self, pixels: Any, channels: int = 3, output: str = "raw") -> bytes:
+        """
+        Переводит полосу пикселей в номера цветов или в цвета палитры.
+
+        :param pixels: Байты пикселей (bytes, bytearray или memoryview), по channels байт на пиксель.
+        :param channels: 3 для RGB, 4 для RGB с альфа-каналом (альфа не учитывается).
+        :param output: "raw"/"pgm" - номера цветов, "ppm" - RGB цвета палитры.
+        :return: Байты результата.
+        """
+
+        if len(pixels) % channels:
+            raise ValueError("Размер буфера не кратен размеру пикселя")
+        if np is not None:
+            return self._quantize_numpy(pixels, channels, output)
+        return self._quantize_python(pixels, channels, output)
+
+    def _quantize_numpy(self, pixels: Any, channels: int, output: str) -> bytes:
+        """
+        Векторная реализация: буфер читается через np.frombuffer без копирования,
+        поиск выполняется только для уникальных цветов полосы.
+        """
+
+        data = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, channels)
+        packed = (data[:, 0].astype(np.uint32) << 16) | (data[:, 1].astype(np.uint32) << 8) | data[:, 2]
+        unique, inverse = np.unique(packed, return_inverse=True)
+        nearest = np.asarray(self._index.query_many(unique), dtype=np.uint16)
+        indices = nearest[inverse.reshape(-1)]
+
+        if output == "ppm":
+            if self._table is None:
+                codes = np.asarray(self.codes, dtype=np.uint32)
+                self._table = np.stack([(codes >> shift) & 0xFF for shift in (16, 8, 0)], axis=-1).astype(np.uint8)
+            return self._table[indices].tobytes()
+        if self.index_size == 1:
+            return indices.astype(np.uint8).tobytes()
+        return indices.astype(">u2").tobytes()
+
+    def _quantize_python(self, pixels: Any, channels: int, output: str) -> bytes:
+        """
+        Реализация на чистом Python с кэшем уже найденных цветов.
+        """
+
+        view = memoryview(pixels).cast("B")
+        cache = self._cache
+        indices = array("B" if self.index_size == 1 else "H")
+        for r, g, b in zip(view[0::channels], view[1::channels], view[2::channels]):
+            value = (r << 16) | (g << 8) | b
+            idx = cache.get(value)
+            if idx is None:
+                if len(cache) >= _CACHE_LIMIT:
+                    cache.clear()
+                idx = cache[value] = self._index.query(value)
+            indices.append(idx)
+
+        if output == "ppm":
+            if self._table is None:
+                self._table = [value.to_bytes(3, "big") for value in self.codes]
+            return b"".join([self._table[idx] for idx in indices])
+        if indices.itemsize > 1 and sys.byteorder == "little":
+            indices.byteswap()
+        return indices.tobytes()
+
+
+def iter_stream_tiles(
+    stream: BinaryIO, header: ImageHeader, tile_rows: int = DEFAULT_TILE_ROWS
+) -> Iterator[memoryview]:
+    """
+    Читает данные пикселей полосами по tile_rows строк в один переиспользуемый буфер.
+    Каждая полоса - срез memoryview этого буфера, действительный до следующей итерации.
+
+    :param stream: Двоичный поток, установленный на начало данных пикселей.
+    :param header: Параметры изображения.
+    :param tile_rows: Количество строк в полосе.
+    """
+
+    if tile_rows <= 0:
+        raise ValueError("Количество строк в полосе должно быть положительным")
+    row_bytes = header.row_bytes
+    buffer = memoryview(bytearray(row_bytes * min(tile_rows, header.height)))
+    remaining = header.height
+    while remaining:
+        size = min(tile_rows, remaining) * row_bytes
+        filled = 0
+        while filled < size:
+            read = stream.readinto(buffer[filled:size])  # type: ignore[attr-defined]
+            if not read:
+                raise ValueError("Данные изображения обрываются раньше конца")
+            filled += read
+        yield buffer[:size]
+        remaining -= size // row_bytes
+
+
+def iter_buffer_tiles(data: Any, row_bytes: int, tile_rows: int = DEFAULT_TILE_ROWS) -> Iterator[memoryview]:
+    """
+    Делит буфер пикселей в памяти на полосы по tile_rows строк без копирования.
+
+    :param data: Буфер пикселей (bytes, bytearray, memoryview, mmap).
+    :param row_bytes: Размер строки в байтах.
+    :param tile_rows: Количество строк в полосе.
+    """
+
+    view = memoryview(data).cast("B")
+    if tile_rows <= 0:
+        raise ValueError("Количество строк в полосе должно быть положительным")
+    if len(view) % row_bytes:
+        raise ValueError("Размер буфера не кратен размеру строки")
+    step = row_bytes * tile_rows
+    for start in range(0, len(view), step):
+        yield view[start : start + step]
+
+
+def _init_worker(codes: List[int], space: str) -> None:
+    """
+    Инициализатор процесса пула: строит квантователь один раз на процесс.
+    """
+
+    global _worker_quantizer
+    _worker_quantizer = PaletteQuantizer(codes, space)
+
+
+def _quantize_in_worker(pixels: bytes, channels: int, output: str) -> bytes:
+    """
+    Обрабатывает полосу в процессе пула.
+    """
+
+    assert _worker_quantizer is not None
+    return _worker_quantizer.quantize(pixels, channels, output)
+
+
+def quantize_tiles(
+    tiles: Iterable[Any],
+    codes: Sequence[int],
+    channels: int = 3,
+    output: str = "raw",
+    space: str = "rgb",
+    workers: int = 0,
+) -> Iterator[bytes]:
+    """
+    Ленивый конвейер постеризации: отдаёт результат каждой полосы по мере готовности
+    в исходном порядке. При workers > 0 полосы копируются и распределяются по пулу процессов,
+    причём одновременно в работе находится не более 2 * workers полос.
+
+    :param tiles: Полосы пикселей.
+    :param codes: Цвета палитры в виде целых 0xRRGGBB.
+    :param channels: Количество байт на пиксель (3 или 4).
+    :param output: Формат результата из OUTPUT_FORMATS.
+    :param space: Пространство сравнения: "rgb" или "lab".
+    :param workers: Количество процессов; 0 - обработка в текущем процессе.
+    """
+
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Неизвестный формат результата: {output!r}")
+    if workers <= 0:
+        quantizer = PaletteQuantizer(codes, space)
+        for tile in tiles:
+            yield quantizer.quantize(tile, channels, output)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(list(codes), space)) as executor:
+        pending: Deque["Future[bytes]"] = deque()
+        for tile in tiles:
+            # Полоса копируется, так как буфер потока переиспользуется для следующей
+            pending.append(executor.submit(_quantize_in_worker, bytes(tile), channels, output))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def quantize_buffer(
+    data: Any,
+    width: int,
+    codes: Sequence[int],
+    channels: int = 3,
+    output: str = "raw",
+    space: str = "rgb",
+    tile_rows: int = DEFAULT_TILE_ROWS,
+) -> bytes:
+    """
+    Постеризует изображение, целиком находящееся в памяти, без заголовка.
+
+    :param data: Пиксели построчно, по channels байт на пиксель.
+    :param width: Ширина изображения в пикселях.
+    :param codes: Цвета палитры в виде целых 0xRRGGBB.
+    :param channels: Количество байт на пиксель (3 или 4).
+    :param output: "raw" - номера цветов, "ppm" - RGB цвета палитры.
+    :param space: Пространство сравнения: "rgb" или "lab".
+    :param tile_rows: Количество строк в полосе.
+    :return: Результат без заголовка.
+    """
+
+    tiles = iter_buffer_tiles(data, width * channels, tile_rows)
+    return b"".join(quantize_tiles(tiles, codes, channels, output, space))
+
+
+def quantize_image(
+    source: BinaryIO,
+    target: BinaryIO,
+    codes: Sequence[int],
+    output: str = "pgm",
+    space: str = "rgb",
+    workers: int = 0,
+    tile_rows: int = DEFAULT_TILE_ROWS,
+) -> ImageHeader:
+    """
+    Постеризует изображение PPM/PAM из потока source и записывает результат в target.
+    В памяти находится не более одной полосы чтения и 2 * workers полос в обработке.
+
+    :param source: Двоичный поток с изображением PPM (P6) или PAM (P7).
+    :param target: Двоичный поток для результата.
+    :param codes: Цвета палитры в виде целых 0xRRGGBB.
+    :param output: "pgm" - номера цветов в PGM, "raw" - номера без заголовка, "ppm" - постеризованный PPM.
+    :param space: Пространство сравнения: "rgb" или "lab".
+    :param workers: Количество процессов; 0 - обработка в текущем процессе.
+    :param tile_rows: Количество строк в полосе.
+    :return: Параметры изображения.
+    """
+
+    header = read_image_header(source)
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Неизвестный формат результата: {output!r}")
+    target.write(output_header(header, output, len(codes)))
+    tiles = iter_stream_tiles(source, header, tile_rows)
+    for chunk in quantize_tiles(tiles, codes, header.channels, output, space, workers):
+        target.write(chunk)
+    target.flush()
+    return header
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Виртуализированная сетка образцов цветов для ColorApp (task_2, task_3).
+Вместо отдельной кнопки на каждый цвет палитры используется один Canvas
+с фиксированным пулом ячеек: при прокрутке ячейки переиспользуются и
+перекрашиваются, поэтому время запуска и память не зависят от размера палитры.
+"""
+
+import tkinter as tk
+from typing import Callable, List, Optional, Tuple
+
+from src.palette import BasePalette, format_hex
+
+
+def visible_rows(offset: float, viewport_height: int, cell_height: int, total_rows: int) -> Tuple[int, int, int]:
+    """
+    Вычисляет, какие строки сетки попадают в видимую область.
+
+    :param offset: Смещение прокрутки в пикселях от начала сетки.
+    :param viewport_height: Высота видимой области в пикселях.
+    :param cell_height: Высота строки в пикселях.
+    :param total_rows: Общее количество строк.
+    :return: Кортеж (первая видимая строка, сдвиг первой строки вверх в пикселях, количество строк).
+    """
+
+    first = int(offset // cell_height)
+    shift = int(offset - first * cell_height)
+    rows = min(total_rows - first, (viewport_height + shift + cell_height - 1) // cell_height)
+    return first, shift, max(rows, 0)
+
+
+def wheel_rows(delta: int) -> int:
+    """
+    Переводит event.delta колеса мыши в количество строк прокрутки. В Windows один щелчок
+    колеса даёт delta, кратное 120, в macOS - небольшие значения порядка единиц;
+    в обоих случаях ненулевой поворот прокручивает хотя бы одну строку.
+
+    :param delta: Значение event.delta.
+    :return: Количество строк: отрицательное - вверх, положительное - вниз.
+    """
+
+    if delta == 0:
+        return 0
+    rows = max(1, abs(delta) // 120)
+    return -rows if delta > 0 else rows
+
+
+def text_color(value: int) -> str:
+    """
+    Подбирает цвет подписи (чёрный или белый), контрастный к цвету фона.
+
+    :param value: Цвет фона в виде целого 0xRRGGBB.
+    :return: "#000000" или "#ffffff".
+    """
+
+    r, g, b = (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+    return "#000000" if 0.299 * r + 0.587 * g + 0.114 * b > 140 else "#ffffff"
+
+
+class SwatchGrid(tk.Frame):
+    """
+    Прокручиваемая сетка образцов цветов палитры. Отрисовываются только видимые строки;
+    элементы Canvas создаются один раз для пула ячеек и переиспользуются при прокрутке.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        palette: BasePalette,
+        command: Callable[[str, str], None],
+        cell_width: int = 150,
+        cell_height: int = 32,
+        width: int = 600,
+        height: int = 320,
+        show_names: bool = True,
+    ) -> None:
+        """
+        Создаёт сетку образцов.
+
+        :param master: Родительский виджет.
+        :param palette: Палитра, цвета которой отображаются.
+        :param command: Обработчик щелчка по образцу, получает (hex-код, название).
+        :param cell_width: Ширина ячейки в пикселях.
+        :param cell_height: Высота ячейки в пикселях.
+        :param width: Начальная ширина видимой области.
+        :param height: Начальная высота видимой области.
+        :param show_names: Показывать ли названия цветов на образцах.
+        """
+
+        super().__init__(master)
+        self.palette = palette
+        self.command = command
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.show_names = show_names
+
+        self.columns = max(1, width // cell_width)
+        self.offset = 0.0
+        # Пул ячеек: пары (прямоугольник, подпись) идентификаторов элементов Canvas
+        self._cells: List[Tuple[int, int]] = []
+        self._pool_rows = 0
+
+        self.canvas = tk.Canvas(self, width=width, height=height, highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_pixels(-self.cell_height))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_pixels(self.cell_height))
+
+        self._ensure_pool(height)
+        self.render()
+
+    @property
+    def total_rows(self) -> int:
+        """
+        Количество строк сетки для текущего числа столбцов.
+        """
+
+        return (len(self.palette) + self.columns - 1) // self.columns
+
+    def _viewport_height(self) -> int:
+        """
+        Высота видимой области Canvas.
+        """
+
+        height = self.canvas.winfo_height()
+        return height if height > 1 else int(self.canvas.cget("height"))
+
+    def _max_offset(self) -> float:
+        """
+        Максимальное смещение прокрутки.
+        """
+
+        return max(0.0, float(self.total_rows * self.cell_height - self._viewport_height()))
+
+    def _ensure_pool(self, viewport_height: int) -> None:
+        """
+        Создаёт элементы Canvas для пула ячеек, если видимая область стала больше.
+        Пул покрывает видимые строки и одну частично видимую.
+        """
+
+        rows = viewport_height // self.cell_height + 2
+        needed = rows * self.columns
+        while len(self._cells) < needed:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="#808080", state=tk.HIDDEN)
+            label = self.canvas.create_text(0, 0, text="", font=("Arial", 10), state=tk.HIDDEN)
+            self._cells.append((rect, label))
+        self._pool_rows = rows
+
+    def set_palette(self, palette: BasePalette) -> None:
+        """
+        Заменяет отображаемую палитру, сохраняя пул ячеек.
+
+        :param palette: Новая палитра.
+        """
+
+        self.palette = palette
+        self.offset = min(self.offset, self._max_offset())
+        self.render()
+
+    def render(self) -> None:
+        """
+        Перерисовывает видимые строки: ячейки пула получают координаты, цвет и подпись
+        соответствующих элементов палитры, лишние ячейки скрываются.
+        """
+
+        first, shift, rows = visible_rows(self.offset, self._viewport_height(), self.cell_height, self.total_rows)
+        names, codes = self.palette.names, self.palette.codes
+        count = len(self.palette)
+
+        for slot, (rect, label) in enumerate(self._cells):
+            row, col = divmod(slot, self.columns)
+            idx = (first + row) * self.columns + col
+            if row >= rows or idx >= count:
+                self.canvas.itemconfigure(rect, state=tk.HIDDEN)
+                self.canvas.itemconfigure(label, state=tk.HIDDEN)
+                continue
+
+            x0 = col * self.cell_width
+            y0 = row * self.cell_height - shift
+            value = codes[idx]
+            self.canvas.coords(rect, x0 + 1, y0 + 1, x0 + self.cell_width - 1, y0 + self.cell_height - 1)
+            self.canvas.itemconfigure(rect, fill=format_hex(value), state=tk.NORMAL)
+            self.canvas.coords(label, x0 + self.cell_width / 2, y0 + self.cell_height / 2)
+            self.canvas.itemconfigure(
+                label,
+                text=names[idx] if self.show_names else "",
+                fill=text_color(value),
+                state=tk.NORMAL,
+            )
+
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        """
+        Синхронизирует положение ползунка с текущим смещением.
+        """
+
+        total = self.total_rows * self.cell_height
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        top = self.offset / total
+        self.scrollbar.set(top, min(1.0, top + self._viewport_height() / total))
+
+    def scroll_to(self, offset: float) -> None:
+        """
+        Прокручивает сетку к смещению в пикселях.
+
+        :param offset: Смещение от начала сетки.
+        """
+
+        offset = min(max(offset, 0.0), self._max_offset())
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll_pixels(self, delta: float) -> None:
+        """
+        Прокручивает сетку на delta пикселей.
+        """
+
+        self.scroll_to(self.offset + delta)
+
+    def yview(self, *args: str) -> None:
+        """
+        Обработчик команд полосы прокрутки ("moveto", доля) и ("scroll", n, "units"/"pages").
+        """
+
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total_rows * self.cell_height)
+        elif args[0] == "scroll":
+            step = self.cell_height if args[2] == "units" else self._viewport_height()
+            self.scroll_pixels(int(args[1]) * step)
+
+    def index_at(self, x: int, y: int) -> Optional[int]:
+        """
+        Возвращает позицию цвета палитры под точкой видимой области или None.
+        """
+
+        col = x // self.cell_width
+        if not 0 <= col < self.columns:
+            return None
+        row = int((self.offset + y) // self.cell_height)
+        idx = row * self.columns + col
+        return idx if 0 <= idx < len(self.palette) else None
+
+    def _on_click(self, event: tk.Event) -> None:
+        """
+        Вызывает command для цвета под указателем мыши.
+        """
+
+        idx = self.index_at(event.x, event.y)
+        if idx is not None:
+            self.command(format_hex(self.palette.codes[idx]), self.palette.names[idx])
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        """
+        Прокрутка колесом мыши (Windows, macOS).
+        """
+
+        self.scroll_pixels(wheel_rows(event.delta) * self.cell_height)
+
+    def _on_configure(self, event: tk.Event) -> None:
+        """
+        Пересчитывает количество столбцов и размер пула при изменении размеров Canvas.
+        """
+
+        columns = max(1, event.width // self.cell_width)
+        if columns != self.columns:
+            # Сохраняем первую видимую позицию при перестроении сетки
+            first = int(self.offset // self.cell_height) * self.columns
+            self.columns = columns
+            self.offset = float(first // columns * self.cell_height)
+        self._ensure_pool(event.height)
+        self.offset = min(self.offset, self._max_offset())
+        self.render()
@@ -7,35 +7,915 @@
 # действие выполнить невозможно (например, если были введены буквы, а
 # не числа), то в метке должно появляться слово "ошибка".
 
+import argparse
+import asyncio
+import json
+import math
+import mmap
+import operator
+import os
+import re
+import struct
+import sys
+import threading
+import time
 import tkinter as tk
-from typing import Union
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy является необязательной зависимостью
+    np = None  # type: ignore
+
+
+class BatchResult(NamedTuple):
+    """
+    Результат пакетного вычисления: непрерывный буфер значений float и маска ошибок.
+    Для элементов с ошибкой (деление на ноль, неизвестная операция) в results записан NaN.
+    """
+
+    results: Any
+    errors: Any
+
+
+class Operation:
+    """
+    Операция калькулятора: скалярная реализация и необязательная пакетная (векторная).
+    """
+
+    __slots__ = ("symbol", "scalar", "bulk", "invalid")
+
+    def __init__(
+        self,
+        symbol: str,
+        scalar: Callable[[float, float], float],
+        bulk: Optional[Callable[[Any, Any], Any]] = None,
+        invalid: Optional[Callable[[Any, Any], Any]] = None,
+    ) -> None:
+        """
+        Инициализирует операцию.
+
+        :param symbol: Обозначение операции, например "+" или "hypot".
+        :param scalar: Функция от двух чисел. Исключения ArithmeticError и ValueError означают "ошибка".
+        :param bulk: Функция от двух массивов NumPy, возвращающая массив результатов (например, ufunc).
+                     Бесконечность и NaN, полученные из конечных операндов, в обеих реализациях
+                     считаются ошибкой (переполнение или выход за область определения).
+        :param invalid: Функция от двух массивов, возвращающая маску недопустимых аргументов
+                        (например, нулевых делителей) для пакетной реализации.
+        """
+
+        self.symbol = symbol
+        self.scalar = scalar
+        self.bulk = bulk
+        self.invalid = invalid
+
+    def apply(self, first: float, second: float) -> float:
+        """
+        Вычисляет скалярную реализацию операции по тем же правилам, что и пакетную:
+        бесконечность или NaN из конечных операндов, а также целый результат вне диапазона float
+        считаются ошибкой.
+
+        :raises ArithmeticError: При делении на ноль, переполнении или нечисловом результате.
+        :raises ValueError: При выходе за область определения.
+        """
+
+        value = self.scalar(first, second)
+        if isinstance(value, float) and not math.isfinite(value) and math.isfinite(first) and math.isfinite(second):
+            raise ArithmeticError(f"Нечисловой результат операции {self.symbol!r}")
+        if isinstance(value, int) and not isinstance(value, bool):
+            # Целый результат вне диапазона float - такое же переполнение (OverflowError)
+            float(value)
+        return value
+
+
+def _zero_divisor(first: Any, second: Any) -> Any:
+    """
+    Маска нулевых делителей для пакетных реализаций деления.
+    """
+
+    return second == 0
+
+
+class OperatorRegistry:
+    """
+    Реестр операций калькулятора. Поиск операции - одно обращение к словарю,
+    поэтому стоимость диспетчеризации не зависит от количества зарегистрированных операций.
+    """
+
+    def __init__(self, operations: Iterable[Operation] = ()) -> None:
+        """
+        Инициализирует реестр набором операций.
+
+        :param operations: Операции, регистрируемые сразу.
+        """
+
+        self._operations: Dict[str, Operation] = {}
+        for operation in operations:
+            self.register(operation)
+
+    @classmethod
+    def default(cls) -> "OperatorRegistry":
+        """
+        Создаёт реестр с базовыми операциями "+", "-", "*", "/".
+        """
+
+        return cls(BASIC_OPERATIONS)
+
+    @classmethod
+    def extended(cls) -> "OperatorRegistry":
+        """
+        Создаёт реестр с базовыми операциями и операциями "**", "%", "//".
+        """
+
+        return cls(BASIC_OPERATIONS + EXTENDED_OPERATIONS)
+
+    def register(self, operation: Operation, replace: bool = False) -> Operation:
+        """
+        Регистрирует операцию.
+
+        :param operation: Регистрируемая операция.
+        :param replace: Разрешить замену уже зарегистрированной операции с тем же обозначением.
+        :return: Зарегистрированная операция.
+        """
+
+        if operation.symbol in self._operations and not replace:
+            raise ValueError(f"Операция {operation.symbol!r} уже зарегистрирована")
+        self._operations[operation.symbol] = operation
+        return operation
+
+    def register_function(
+        self,
+        symbol: str,
+        scalar: Callable[[float, float], float],
+        bulk: Optional[Callable[[Any, Any], Any]] = None,
+        invalid: Optional[Callable[[Any, Any], Any]] = None,
+    ) -> Operation:
+        """
+        Регистрирует операцию по её функциям, например register_function("hypot", math.hypot, np.hypot).
+
+        :return: Зарегистрированная операция.
+        """
+
+        return self.register(Operation(symbol, scalar, bulk, invalid))
+
+    def unregister(self, symbol: str) -> None:
+        """
+        Удаляет операцию из реестра.
+
+        :param symbol: Обозначение операции.
+        """
+
+        del self._operations[symbol]
+
+    def get(self, symbol: str) -> Optional[Operation]:
+        """
+        Возвращает операцию по обозначению или None, если она не зарегистрирована.
+        """
+
+        return self._operations.get(symbol)
+
+    def symbols(self) -> List[str]:
+        """
+        Возвращает обозначения зарегистрированных операций в порядке регистрации.
+        """
+
+        return list(self._operations)
+
+    def measure_dispatch(self, rounds: int = 100000) -> float:
+        """
+        Измеряет среднее время поиска операции в реестре.
+
+        :param rounds: Количество поисков.
+        :return: Среднее время одного поиска в секундах.
+        """
+
+        symbols = self.symbols() or [""]
+        count = len(symbols)
+        get = self.get
+        started = time.perf_counter()
+        for i in range(rounds):
+            get(symbols[i % count])
+        return (time.perf_counter() - started) / rounds
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._operations
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+
+# Базовые операции калькулятора
+BASIC_OPERATIONS: Tuple[Operation, ...] = (
+    Operation("+", operator.add, np.add if np is not None else None),
+    Operation("-", operator.sub, np.subtract if np is not None else None),
+    Operation("*", operator.mul, np.multiply if np is not None else None),
+    Operation("/", operator.truediv, np.true_divide if np is not None else None, _zero_divisor),
+)
+
+# Дополнительные операции: возведение в степень, остаток и целочисленное деление
+EXTENDED_OPERATIONS: Tuple[Operation, ...] = (
+    Operation("**", math.pow, np.power if np is not None else None),
+    Operation("%", operator.mod, np.mod if np is not None else None, _zero_divisor),
+    Operation("//", operator.floordiv, np.floor_divide if np is not None else None, _zero_divisor),
+)
+
+
+# Коды операций в журнале вычислений; 0 - операция, отсутствующая в таблице
+HISTORY_OP_CODES: Dict[str, int] = {"+": 1, "-": 2, "*": 3, "/": 4, "**": 5, "%": 6, "//": 7}
+HISTORY_OP_SYMBOLS: Dict[int, str] = {code: symbol for symbol, code in HISTORY_OP_CODES.items()}
+
+# Запись журнала: первый операнд, второй операнд, результат, время, код операции, флаг ошибки
+_HISTORY_RECORD = struct.Struct("<ddddHB5x")
+
+# Заголовок файла журнала: сигнатура, версия, размер записи, ёмкость, общее число добавленных записей
+_HISTORY_HEADER = struct.Struct("<8sIIQQ")
+_HISTORY_HEADER_SIZE = 64
+_HISTORY_TOTAL_OFFSET = 24
+_HISTORY_MAGIC = b"CALCHIST"
+_HISTORY_VERSION = 1
+
+
+class HistoryRecord(NamedTuple):
+    """
+    Запись журнала вычислений.
+    """
+
+    first: float
+    second: float
+    result: float
+    timestamp: float
+    operation: str
+    error: bool
+
+
+def _record_value(value: float) -> float:
+    """
+    Приводит число к float для записи в журнал. Целые вне диапазона float записываются
+    бесконечностью того же знака.
+    """
+
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+
+class CalculationHistory:
+    """
+    Журнал вызовов Calculator.calculate в отображённом в память файле. Записи фиксированного
+    размера хранятся в кольцевом буфере: при заполнении новые записи замещают самые старые.
+    Добавление выполняется за O(1) без создания Python-объектов на запись.
+    """
+
+    def __init__(self, path: str, capacity: int = 1 << 20) -> None:
+        """
+        Открывает существующий журнал или создаёт новый.
+
+        :param path: Путь к файлу журнала.
+        :param capacity: Ёмкость кольцевого буфера в записях (для существующего файла берётся из заголовка).
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "r+b" if exists else "w+b")
+        try:
+            if exists:
+                header = self._file.read(_HISTORY_HEADER.size)
+                if len(header) < _HISTORY_HEADER.size:
+                    raise ValueError(f"Файл {path} не является журналом вычислений")
+                magic, version, record_size, capacity, total = _HISTORY_HEADER.unpack(header)
+                if magic != _HISTORY_MAGIC or version != _HISTORY_VERSION or record_size != _HISTORY_RECORD.size:
+                    raise ValueError(f"Файл {path} не является журналом вычислений")
+            else:
+                if capacity <= 0:
+                    raise ValueError("Ёмкость журнала должна быть положительной")
+                total = 0
+                # Файл создаётся разреженным, место на диске выделяется по мере записи
+                self._file.truncate(_HISTORY_HEADER_SIZE + capacity * _HISTORY_RECORD.size)
+
+            self.capacity: int = capacity
+            self._total: int = total
+            self._mm = mmap.mmap(self._file.fileno(), _HISTORY_HEADER_SIZE + capacity * _HISTORY_RECORD.size)
+            if not exists:
+                _HISTORY_HEADER.pack_into(
+                    self._mm, 0, _HISTORY_MAGIC, _HISTORY_VERSION, _HISTORY_RECORD.size, capacity, 0
+                )
+        except BaseException:
+            self._file.close()
+            raise
+
+    @property
+    def total(self) -> int:
+        """
+        Общее количество записей, добавленных за всё время (включая вытесненные).
+        """
+
+        return self._total
+
+    def append(self, first: float, second: float, operation: str, result: Union[float, str]) -> None:
+        """
+        Добавляет запись о вычислении.
+
+        :param first: Первое число.
+        :param second: Второе число.
+        :param operation: Обозначение операции.
+        :param result: Результат Calculator.calculate (float или "ошибка").
+        """
+
+        error = isinstance(result, str)
+        value = float("nan") if error else _record_value(result)  # type: ignore[arg-type]
+        first, second = _record_value(first), _record_value(second)
+        code = HISTORY_OP_CODES.get(operation, 0)
+        with self._lock:
+            offset = _HISTORY_HEADER_SIZE + (self._total % self.capacity) * _HISTORY_RECORD.size
+            _HISTORY_RECORD.pack_into(self._mm, offset, first, second, value, time.time(), code, error)
+            self._total += 1
+            struct.pack_into("<Q", self._mm, _HISTORY_TOTAL_OFFSET, self._total)
+
+    def __len__(self) -> int:
+        return min(self._total, self.capacity)
+
+    def raw(self, start: int = 0, stop: Optional[int] = None) -> List[memoryview]:
+        """
+        Возвращает байты записей [start, stop) без копирования: одно или два окна memoryview
+        (два, если диапазон проходит через конец кольцевого буфера). Индекс 0 - самая старая запись.
+
+        :param start: Индекс первой записи.
+        :param stop: Индекс записи после последней (по умолчанию - длина журнала).
+        :return: Список окон memoryview над отображённым файлом.
+        """
+
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+
+        size = _HISTORY_RECORD.size
+        first = (self._total - len(self) + start) % self.capacity
+        count = stop - start
+        view = memoryview(self._mm)
+        head = min(count, self.capacity - first)
+        segments = [view[_HISTORY_HEADER_SIZE + first * size : _HISTORY_HEADER_SIZE + (first + head) * size]]
+        if head < count:
+            segments.append(view[_HISTORY_HEADER_SIZE : _HISTORY_HEADER_SIZE + (count - head) * size])
+        return segments
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[HistoryRecord]:
+        """
+        Лениво перебирает записи [start, stop), распаковывая их прямо из отображённого файла.
+
+        :param start: Индекс первой записи.
+        :param stop: Индекс записи после последней.
+        :return: Итератор записей журнала.
+        """
+
+        for segment in self.raw(start, stop):
+            with segment:
+                for first, second, result, timestamp, code, error in _HISTORY_RECORD.iter_unpack(segment):
+                    yield HistoryRecord(
+                        first, second, result, timestamp, HISTORY_OP_SYMBOLS.get(code, "?"), bool(error)
+                    )
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[HistoryRecord, List[HistoryRecord]]:
+        """
+        Возвращает запись по индексу или список записей по срезу (шаг среза не поддерживается).
+        """
+
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError("Шаг среза журнала не поддерживается")
+            return list(self.records(index.start or 0, index.stop))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Индекс записи журнала вне диапазона")
+        return next(self.records(index, index + 1))
+
+    def flush(self) -> None:
+        """
+        Сбрасывает изменения отображённого файла на диск.
+        """
+
+        self._mm.flush()
+
+    def close(self) -> None:
+        """
+        Закрывает журнал. Окна memoryview, полученные через raw(), должны быть освобождены заранее.
+        """
+
+        if not self._mm.closed:
+            self._mm.flush()
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "CalculationHistory":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
 
 class Calculator:
     """
     Класс калькулятора, реализующий базовые арифметические операции.
+    Операции берутся из реестра OperatorRegistry, в который можно добавлять новые.
     """
 
+    def __init__(
+        self, registry: Optional[OperatorRegistry] = None, history: Optional[CalculationHistory] = None
+    ) -> None:
+        """
+        Инициализирует калькулятор.
+
+        :param registry: Реестр операций (по умолчанию "+", "-", "*", "/").
+        :param history: Журнал, в который записывается каждый вызов calculate().
+        """
+
+        self.registry = registry if registry is not None else OperatorRegistry.default()
+        self.history = history
+
     def calculate(self, first: float, second: float, operation: str) -> Union[float, str]:
         """
-        Выполняет арифметические операции (сложение, вычитание, умножение, деление).
+        Выполняет арифметическую операцию из реестра (по умолчанию сложение, вычитание, умножение, деление).
 
         :param first: Первое число.
         :param second: Второе число.
         :param operation: Строка, обозначающая требуемую операцию: "+", "-", "*", "/".
-        :return: Результат вычисления (float или "ошибка" при делении на ноль или неверном типе операции).
+        :return: Результат вычисления (float или "ошибка" при делении на ноль, переполнении,
+                 выходе за область определения или неверном типе операции).
+        """
+
+        result = self._calculate(first, second, operation)
+        if self.history is not None:
+            self.history.append(first, second, operation, result)
+        return result
+
+    def _calculate(self, first: float, second: float, operation: str) -> Union[float, str]:
+        """
+        Выполняет операцию из реестра без записи в журнал.
+        """
+
+        op = self.registry.get(operation)
+        if op is None:
+            return "ошибка"
+        try:
+            return op.apply(first, second)
+        except (ArithmeticError, ValueError):
+            # Деление на ноль, переполнение или выход за область определения
+            return "ошибка"
+
+    def calculate_many(
+        self, firsts: Sequence[float], seconds: Sequence[float], ops: Union[str, Sequence[str]]
+    ) -> BatchResult:
+        """
+        Выполняет арифметические операции над массивами операндов за один вызов.
+        Если установлен NumPy, вычисления выполняются векторно, иначе используется
+        цикл на чистом Python с результатом в array.array.
+
+        :param firsts: Первые операнды (NumPy-массив, array.array или любая последовательность чисел).
+        :param seconds: Вторые операнды той же длины, что и firsts.
+        :param ops: Одна операция для всех элементов или последовательность операций по элементам.
+        :return: BatchResult с буфером результатов (float64) и маской ошибок (bool/uint8).
+        """
+
+        if len(firsts) != len(seconds) or (not isinstance(ops, str) and len(ops) != len(firsts)):
+            raise ValueError("Длины массивов операндов и операций должны совпадать")
+
+        if np is not None:
+            return self._calculate_many_numpy(firsts, seconds, ops)
+        return self._calculate_many_python(firsts, seconds, ops)
+
+    def _calculate_many_numpy(self, firsts: Any, seconds: Any, ops: Union[str, Sequence[str]]) -> BatchResult:
+        """
+        Векторная реализация calculate_many на NumPy. Для каждой операции используется
+        её пакетная реализация; операции без неё вычисляются поэлементно скалярной функцией.
+        """
+
+        a = np.asarray(firsts, dtype=np.float64)
+        b = np.asarray(seconds, dtype=np.float64)
+        results = np.full(a.shape, np.nan, dtype=np.float64)
+        errors = np.zeros(a.shape, dtype=bool)
+
+        # Для одной операции на весь массив маски не нужны
+        if isinstance(ops, str):
+            selections = {ops: None}
+        else:
+            op_codes = np.asarray(ops)
+            selections = {str(op): op_codes == op for op in np.unique(op_codes)}
+
+        for symbol, sel in selections.items():
+            op = self.registry.get(symbol)
+            if op is None:
+                # Неизвестная операция: все соответствующие элементы помечаются ошибкой
+                if sel is None:
+                    errors[...] = True
+                else:
+                    errors |= sel
+                continue
+
+            x, y = (a, b) if sel is None else (a[sel], b[sel])
+            if op.bulk is not None:
+                value, error = self._apply_bulk(op, x, y)
+            else:
+                value, error = self._apply_scalar(op, x, y)
+
+            if sel is None:
+                results[...] = value
+                errors[...] = error
+            else:
+                results[sel] = value
+                errors[sel] = error
+
+        return BatchResult(results, errors)
+
+    @staticmethod
+    def _apply_bulk(op: Operation, x: Any, y: Any) -> Tuple[Any, Any]:
+        """
+        Применяет пакетную реализацию операции. Недопустимые аргументы, а также бесконечность
+        и NaN, полученные из конечных операндов, помечаются в маске ошибок, как в Operation.apply.
+        """
+
+        with np.errstate(all="ignore"):
+            value = np.asarray(op.bulk(x, y), dtype=np.float64)  # type: ignore[misc]
+        error = ~np.isfinite(value) & np.isfinite(x) & np.isfinite(y)
+        if op.invalid is not None:
+            error |= op.invalid(x, y)
+        value[error] = np.nan
+        return value, error
+
+    @staticmethod
+    def _apply_scalar(op: Operation, x: Any, y: Any) -> Tuple[Any, Any]:
+        """
+        Поэлементно применяет скалярную реализацию операции, не имеющей пакетной.
+        """
+
+        value = np.full(x.shape, np.nan, dtype=np.float64)
+        error = np.zeros(x.shape, dtype=bool)
+        for i, (first, second) in enumerate(zip(x.tolist(), y.tolist())):
+            try:
+                value[i] = op.apply(first, second)
+            except (ArithmeticError, ValueError):
+                error[i] = True
+        return value, error
+
+    def _calculate_many_python(
+        self, firsts: Sequence[float], seconds: Sequence[float], ops: Union[str, Sequence[str]]
+    ) -> BatchResult:
+        """
+        Резервная реализация calculate_many без NumPy.
+        """
+
+        n = len(firsts)
+        results = array("d", bytes(8 * n))
+        errors = array("B", bytes(n))
+        nan = float("nan")
+
+        for i in range(n):
+            op = ops if isinstance(ops, str) else ops[i]
+            value = self._calculate(float(firsts[i]), float(seconds[i]), op)
+            if isinstance(value, str):
+                results[i] = nan
+                errors[i] = 1
+            else:
+                results[i] = value
+
+        return BatchResult(results, errors)
+
+
+# Приоритеты операторов выражения ("neg" - унарный минус)
+_PRECEDENCE: Dict[str, int] = {"+": 1, "-": 1, "*": 2, "/": 2, "neg": 3}
+
+# Лексемы выражения: число, имя переменной, оператор или скобка
+_TOKEN_RE = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))")
+
+# Узел скомпилированного выражения: функция от словаря значений переменных
+_Node = Callable[[Mapping[str, float]], float]
+
+
+class CompiledExpression:
+    """
+    Скомпилированное арифметическое выражение. Разбор выполняется один раз,
+    после чего выражение вычисляется как дерево замыканий без повторного разбора и без eval.
+    """
+
+    __slots__ = ("text", "variables", "_root")
+
+    def __init__(self, text: str, variables: Tuple[str, ...], root: _Node) -> None:
+        """
+        Инициализирует скомпилированное выражение.
+
+        :param text: Исходный текст выражения.
+        :param variables: Имена переменных в порядке первого появления.
+        :param root: Корневой узел дерева замыканий.
+        """
+
+        self.text = text
+        self.variables = variables
+        self._root = root
+
+    def evaluate(self, variables: Optional[Mapping[str, float]] = None) -> Union[float, str]:
+        """
+        Вычисляет выражение при заданных значениях переменных.
+
+        :param variables: Словарь значений переменных.
+        :return: Результат вычисления (float или "ошибка" при делении на ноль или переполнении).
+        """
+
+        values = variables if variables is not None else {}
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise KeyError(f"Не заданы значения переменных: {', '.join(missing)}")
+
+        try:
+            return self._root(values)
+        except ArithmeticError:
+            # Деление на ноль или переполнение
+            return "ошибка"
+
+    def __call__(self, **variables: float) -> Union[float, str]:
+        """
+        Вычисляет выражение, принимая значения переменных как именованные аргументы.
+        """
+
+        return self.evaluate(variables)
+
+
+class ExpressionEngine:
+    """
+    Движок арифметических выражений вида "(a+b)*c/d". Скомпилированные выражения
+    хранятся в ограниченном LRU-кэше по тексту выражения.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        """
+        Инициализирует движок выражений.
+
+        :param max_size: Максимальное количество скомпилированных выражений в кэше.
+        """
+
+        if max_size <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+
+    def compile(self, text: str) -> CompiledExpression:
+        """
+        Возвращает скомпилированное выражение из кэша или разбирает и компилирует его.
+
+        :param text: Текст выражения.
+        :return: Экземпляр CompiledExpression.
+        """
+
+        compiled = self._cache.get(text)
+        if compiled is not None:
+            self.hits += 1
+            self._cache.move_to_end(text)
+            return compiled
+
+        self.misses += 1
+        compiled = self._compile(text)
+        self._cache[text] = compiled
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def evaluate(self, text: str, variables: Optional[Mapping[str, float]] = None) -> Union[float, str]:
+        """
+        Вычисляет выражение, используя кэш скомпилированных форм.
+
+        :param text: Текст выражения.
+        :param variables: Словарь значений переменных.
+        :return: Результат вычисления (float или "ошибка" при делении на ноль или переполнении).
+        """
+
+        return self.compile(text).evaluate(variables)
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Возвращает статистику кэша: попадания, промахи, текущий и максимальный размер.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max_size": self.max_size}
+
+    def cache_clear(self) -> None:
+        """
+        Очищает кэш и сбрасывает счётчики.
+        """
+
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        """
+        Разбивает выражение на лексемы вида (тип, значение).
         """
 
-        if operation == "+":
-            return first + second
-        elif operation == "-":
-            return first - second
-        elif operation == "*":
-            return first * second
-        elif operation == "/":
-            # Проверяем деление на ноль
-            return first / second if second != 0 else "ошибка"
-        return "ошибка"
+        tokens: List[Tuple[str, str]] = []
+        for match in _TOKEN_RE.finditer(text.rstrip()):
+            number, name, symbol = match.groups()
+            if number is not None:
+                tokens.append(("num", number))
+            elif name is not None:
+                tokens.append(("var", name))
+            elif symbol in "+-*/()":
+                tokens.append(("op", symbol))
+            else:
+                raise ValueError(f"Недопустимый символ в выражении: {symbol!r}")
+        return tokens
+
+    def _compile(self, text: str) -> CompiledExpression:
+        """
+        Разбирает выражение алгоритмом сортировочной станции и строит дерево замыканий.
+        Поддеревья из одних констант сворачиваются на этапе компиляции.
+        """
+
+        tokens = self._tokenize(text)
+        if not tokens:
+            raise ValueError("Пустое выражение")
+
+        operands: List[Tuple[_Node, Optional[float]]] = []
+        operators: List[str] = []
+        variables: Dict[str, None] = {}
+
+        def reduce() -> None:
+            op = operators.pop()
+            if op == "neg":
+                if not operands:
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+                operands.append(_negate(*operands.pop()))
+                return
+            if len(operands) < 2:
+                raise ValueError(f"Некорректное выражение: {text!r}")
+            right = operands.pop()
+            left = operands.pop()
+            operands.append(_binary(op, left, right))
+
+        expect_operand = True
+        for kind, value in tokens:
+            if kind == "num":
+                if not expect_operand:
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+                number = float(value)
+                operands.append((_constant(number), number))
+                expect_operand = False
+            elif kind == "var":
+                if not expect_operand:
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+                variables[value] = None
+                operands.append((_variable(value), None))
+                expect_operand = False
+            elif value == "(":
+                if not expect_operand:
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+                operators.append(value)
+            elif value == ")":
+                if expect_operand:
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+                while operators and operators[-1] != "(":
+                    reduce()
+                if not operators:
+                    raise ValueError(f"Несогласованные скобки: {text!r}")
+                operators.pop()
+            elif expect_operand:
+                # Унарный плюс игнорируется, унарный минус становится отдельным оператором
+                if value == "-":
+                    operators.append("neg")
+                elif value != "+":
+                    raise ValueError(f"Некорректное выражение: {text!r}")
+            else:
+                while operators and operators[-1] != "(" and _PRECEDENCE[operators[-1]] >= _PRECEDENCE[value]:
+                    reduce()
+                operators.append(value)
+                expect_operand = True
+
+        if expect_operand:
+            raise ValueError(f"Некорректное выражение: {text!r}")
+        while operators:
+            if operators[-1] == "(":
+                raise ValueError(f"Несогласованные скобки: {text!r}")
+            reduce()
+        if len(operands) != 1:
+            raise ValueError(f"Некорректное выражение: {text!r}")
+
+        return CompiledExpression(text, tuple(variables), operands[0][0])
+
+
+def _constant(value: float) -> _Node:
+    """
+    Строит узел константы.
+    """
+
+    return lambda _: value
+
+
+def _variable(name: str) -> _Node:
+    """
+    Строит узел чтения переменной.
+    """
+
+    return lambda env: env[name]
+
+
+def _negate(node: _Node, constant: Optional[float]) -> Tuple[_Node, Optional[float]]:
+    """
+    Строит узел унарного минуса.
+    """
+
+    if constant is not None:
+        return _constant(-constant), -constant
+    return (lambda env: -node(env)), None
+
+
+def _binary(
+    op: str, left: Tuple[_Node, Optional[float]], right: Tuple[_Node, Optional[float]]
+) -> Tuple[_Node, Optional[float]]:
+    """
+    Строит узел бинарной операции, сворачивая константы, если это возможно.
+    """
+
+    func = _OPERATOR_FUNCS[op]
+    (lnode, lconst), (rnode, rconst) = left, right
+    if lconst is not None and rconst is not None:
+        try:
+            value = func(lconst, rconst)
+        except ArithmeticError:
+            # Деление на ноль или переполнение сообщается при вычислении, а не при компиляции
+            pass
+        else:
+            return _constant(value), value
+    return (lambda env: func(lnode(env), rnode(env))), None
+
+
+# Функции бинарных операторов выражения: те же операции, что и у Calculator, с той же проверкой результата
+_OPERATOR_FUNCS: Dict[str, Callable[[float, float], float]] = {op.symbol: op.apply for op in BASIC_OPERATIONS}
+
+
+# Задержка пересчёта в живом режиме после последнего нажатия клавиши, мс
+LIVE_DEBOUNCE_MS = 150
+
+# Период проверки готовности фонового вычисления, мс
+LIVE_POLL_MS = 20
+
+# Длина ввода, начиная с которой число считается "тяжёлым" и вычисляется в фоновом потоке
+HEAVY_INPUT_LENGTH = 64
+
+# Количество записей журнала на одной странице панели истории
+HISTORY_PAGE_SIZE = 20
+
+
+def parse_operand(text: str, engine: ExpressionEngine) -> float:
+    """
+    Преобразует содержимое поля ввода в число. Помимо обычных чисел допускаются
+    выражения без переменных, например "(1+2)*3".
+
+    :param text: Текст поля ввода.
+    :param engine: Движок выражений для вычисления выражений.
+    :return: Значение операнда.
+    :raises ValueError: Если текст не является числом или корректным выражением.
+    """
+
+    try:
+        return float(text)
+    except ValueError:
+        if not text.strip():
+            raise
+
+    compiled = engine.compile(text)
+    if compiled.variables:
+        raise ValueError(f"Выражение содержит переменные: {text!r}")
+    value = compiled.evaluate()
+    if isinstance(value, str):
+        raise ValueError(f"Не удалось вычислить выражение: {text!r}")
+    return value
+
+
+def is_heavy_input(text: str) -> bool:
+    """
+    Определяет, нужно ли вычислять ввод в фоновом потоке: выражения и очень длинные числа.
+
+    :param text: Текст поля ввода.
+    :return: True, если ввод требует фонового вычисления.
+    """
+
+    if len(text) > HEAVY_INPUT_LENGTH:
+        return True
+    try:
+        float(text)
+    except ValueError:
+        return bool(text.strip())
+    return False
 
 
 class CalculatorApp:
@@ -53,11 +933,25 @@ class CalculatorApp:
 
         self.root = root
         self.calculator = calculator
+        # Последняя выбранная операция, используется в живом режиме
+        self.operation = "+"
+        self.expression_engine = ExpressionEngine()
+        # Номер поколения ввода: результаты устаревших вычислений отбрасываются
+        self._generation = 0
+        self._debounce_id: Optional[str] = None
+        # Запланированная проверка готовности фонового вычисления
+        self._poll_id: Optional[str] = None
+        # Один фоновый поток для тяжёлых вычислений
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Индекс первой записи страницы истории; None - следить за последней страницей
+        self.history_start: Optional[int] = None
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
     def create_widgets(self) -> None:
         """
-        Создаёт и размещает на форме все виджеты: поля ввода, кнопки операций и метку для результата.
+        Создаёт и размещает на форме все виджеты: поля ввода, кнопки операций, метку для результата
+        и переключатель живого режима.
         """
 
         # Поля ввода для двух чисел
@@ -67,6 +961,10 @@ class CalculatorApp:
         self.entry2 = tk.Entry(self.root, width=10)
         self.entry2.grid(row=1, column=0, columnspan=2, padx=5, pady=5)
 
+        # Пересчёт при вводе в живом режиме
+        self.entry1.bind("<KeyRelease>", self.schedule_live_update)
+        self.entry2.bind("<KeyRelease>", self.schedule_live_update)
+
         # Кнопки операций
         btn_add = tk.Button(self.root, text="+", width=5, command=lambda: self.calculate("+"))
         btn_add.grid(row=2, column=0, columnspan=2, padx=5, pady=2)
@@ -84,6 +982,76 @@ class CalculatorApp:
         self.result_label = tk.Label(self.root, text="", font=("Arial", 14))
         self.result_label.grid(row=6, column=0, columnspan=2, pady=10)
 
+        # Переключатель живого режима
+        self.live_var = tk.BooleanVar(value=False)
+        live_check = tk.Checkbutton(
+            self.root, text="Живой расчёт", variable=self.live_var, command=self.schedule_live_update
+        )
+        live_check.grid(row=7, column=0, columnspan=2, padx=5, pady=2)
+
+        # Панель истории создаётся, только если калькулятор ведёт журнал
+        if self.calculator.history is not None:
+            self.create_history_panel()
+
+    def create_history_panel(self) -> None:
+        """
+        Создаёт панель истории: список записей текущей страницы журнала и кнопки листания.
+        Из журнала читаются только записи отображаемой страницы.
+        """
+
+        frame = tk.Frame(self.root)
+        frame.grid(row=0, column=2, rowspan=8, padx=5, pady=5, sticky="n")
+
+        self.history_list = tk.Listbox(frame, width=40, height=HISTORY_PAGE_SIZE, font=("Courier", 10))
+        self.history_list.grid(row=0, column=0, columnspan=3)
+
+        btn_prev = tk.Button(frame, text="<", width=3, command=lambda: self.page_history(-1))
+        btn_prev.grid(row=1, column=0, pady=2)
+
+        self.history_label = tk.Label(frame, text="")
+        self.history_label.grid(row=1, column=1, pady=2)
+
+        btn_next = tk.Button(frame, text=">", width=3, command=lambda: self.page_history(1))
+        btn_next.grid(row=1, column=2, pady=2)
+
+        self.refresh_history()
+
+    def page_history(self, direction: int) -> None:
+        """
+        Перелистывает панель истории на страницу назад (-1) или вперёд (1).
+
+        :param direction: Направление листания.
+        """
+
+        history = self.calculator.history
+        if history is None:
+            return
+        last_start = max(len(history) - HISTORY_PAGE_SIZE, 0)
+        start = last_start if self.history_start is None else self.history_start
+        start = min(max(start + direction * HISTORY_PAGE_SIZE, 0), last_start)
+        # На последней странице панель снова следит за новыми записями
+        self.history_start = None if start == last_start else start
+        self.refresh_history()
+
+    def refresh_history(self) -> None:
+        """
+        Перерисовывает текущую страницу панели истории.
+        """
+
+        history = self.calculator.history
+        if history is None:
+            return
+
+        total = len(history)
+        start = max(total - HISTORY_PAGE_SIZE, 0) if self.history_start is None else self.history_start
+        stop = min(start + HISTORY_PAGE_SIZE, total)
+
+        self.history_list.delete(0, tk.END)
+        for record in history.records(start, stop):
+            result = "ошибка" if record.error else str(record.result)
+            self.history_list.insert(tk.END, f"{record.first} {record.operation} {record.second} = {result}")
+        self.history_label.config(text=f"{start + 1 if stop else 0}-{stop} из {total}")
+
     def calculate(self, operation: str) -> None:
         """
         Получает значения из полей ввода, вызывает метод calculate() у объекта Calculator
@@ -93,6 +1061,10 @@ class CalculatorApp:
         :return: None
         """
 
+        self.operation = operation
+        # Результаты живого режима, запущенные до нажатия кнопки, больше не нужны
+        self._generation += 1
+
         try:
             num1 = float(self.entry1.get())
             num2 = float(self.entry2.get())
@@ -100,22 +1072,520 @@ class CalculatorApp:
             self.result_label.config(text=str(result))
         except ValueError:
             self.result_label.config(text="ошибка")
+        self.refresh_history()
 
+    def schedule_live_update(self, event: Optional[tk.Event] = None) -> None:
+        """
+        Откладывает пересчёт в живом режиме: каждое новое нажатие клавиши отменяет
+        ранее запланированный пересчёт.
 
-def main() -> None:
+        :param event: Событие Tkinter (не используется).
+        """
+
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self.live_var.get():
+            self._debounce_id = self.root.after(LIVE_DEBOUNCE_MS, self.recalculate_live)
+
+    def recalculate_live(self) -> None:
+        """
+        Пересчитывает результат по текущему вводу и последней выбранной операции.
+        Простые числа вычисляются сразу, выражения и очень длинные числа - в фоновом потоке.
+        """
+
+        self._debounce_id = None
+        self._generation += 1
+        generation = self._generation
+        first, second = self.entry1.get(), self.entry2.get()
+
+        if is_heavy_input(first) or is_heavy_input(second):
+            future = self._executor.submit(self.evaluate_inputs, first, second, self.operation)
+            self._poll_id = self.root.after(LIVE_POLL_MS, self._poll_live_result, future, generation)
+        else:
+            self._show_live_result(generation, self.evaluate_inputs(first, second, self.operation))
+
+    def evaluate_inputs(self, first: str, second: str, operation: str) -> str:
+        """
+        Вычисляет результат по тексту полей ввода. Может выполняться в фоновом потоке,
+        поэтому не обращается к виджетам.
+
+        :param first: Текст первого поля.
+        :param second: Текст второго поля.
+        :param operation: Операция калькулятора.
+        :return: Текст для метки результата.
+        """
+
+        try:
+            num1 = parse_operand(first, self.expression_engine)
+            num2 = parse_operand(second, self.expression_engine)
+        except (ValueError, KeyError):
+            return "ошибка"
+        return str(self.calculator.calculate(num1, num2, operation))
+
+    def _poll_live_result(self, future: "Future[str]", generation: int) -> None:
+        """
+        Проверяет готовность фонового вычисления из главного потока через root.after.
+        Результаты устаревших поколений отбрасываются.
+        """
+
+        self._poll_id = None
+        if generation != self._generation:
+            return
+        if not future.done():
+            self._poll_id = self.root.after(LIVE_POLL_MS, self._poll_live_result, future, generation)
+            return
+        self._show_live_result(generation, future.result())
+
+    def _show_live_result(self, generation: int, text: str) -> None:
+        """
+        Отображает результат, если он относится к последнему вводу и отличается от текущего,
+        чтобы метка не перерисовывалась без необходимости.
+        """
+
+        if generation == self._generation and self.result_label.cget("text") != text:
+            self.result_label.config(text=text)
+        self.refresh_history()
+
+    def close(self) -> None:
+        """
+        Закрывает окно: отменяет запланированный пересчёт и проверку фонового вычисления,
+        останавливает фоновый поток, не дожидаясь текущего вычисления, и уничтожает окно.
+        """
+
+        for after_id in (self._debounce_id, self._poll_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._debounce_id = self._poll_id = None
+        self._generation += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+
+def parse_record(line: str) -> Optional[Tuple[float, str, float]]:
+    """
+    Разбирает запись пакетного режима вида "a op b", где элементы разделены пробелами.
+
+    :param line: Строка входного потока.
+    :return: Кортеж (первое число, операция, второе число) или None, если запись некорректна.
+    """
+
+    parts = line.split()
+    if len(parts) != 3:
+        return None
+    try:
+        return float(parts[0]), parts[1], float(parts[2])
+    except ValueError:
+        return None
+
+
+def evaluate_chunk(lines: Sequence[str]) -> List[str]:
+    """
+    Вычисляет блок записей одним вызовом Calculator.calculate_many и форматирует результаты
+    так же, как метка CalculatorApp. Функция объявлена на уровне модуля, чтобы её можно было
+    передавать в дочерние процессы.
+
+    :param lines: Строки с записями "a op b".
+    :return: Строки результатов в порядке входных записей.
+    """
+
+    records = [parse_record(line) for line in lines]
+    valid = [record for record in records if record is not None]
+    batch = Calculator().calculate_many(
+        [record[0] for record in valid], [record[2] for record in valid], [record[1] for record in valid]
+    )
+
+    output: List[str] = []
+    pos = 0
+    for record in records:
+        if record is None:
+            output.append("ошибка")
+            continue
+        output.append("ошибка" if batch.errors[pos] else str(float(batch.results[pos])))
+        pos += 1
+    return output
+
+
+def _chunked(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """
+    Группирует поток строк в блоки фиксированного размера. Пустые строки сохраняются: для них,
+    как и для других некорректных записей, выводится "ошибка", и строки вывода соответствуют
+    строкам ввода.
+    """
+
+    chunk: List[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def evaluate_stream(lines: Iterable[str], workers: int = 0, chunk_size: int = 1024) -> Iterator[str]:
+    """
+    Ленивый конвейер пакетного режима: читает записи, вычисляет их блоками и отдаёт
+    результаты по мере готовности. При workers > 0 блоки распределяются по пулу процессов,
+    причём в работе одновременно находится не более 2 * workers блоков, а порядок вывода
+    совпадает с порядком ввода. Потребление памяти не зависит от размера входа.
+
+    :param lines: Итерируемый источник строк (файл, sys.stdin).
+    :param workers: Количество процессов; 0 - вычисление в текущем процессе.
+    :param chunk_size: Количество записей в одном блоке.
+    :return: Итератор строк результатов.
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("Размер блока должен быть положительным")
+
+    chunks = _chunked(lines, chunk_size)
+    if workers <= 0:
+        for chunk in chunks:
+            yield from evaluate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque["Future[List[str]]"] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(evaluate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_batch(source: TextIO, target: TextIO, workers: int = 0, chunk_size: int = 1024) -> Tuple[int, float]:
+    """
+    Выполняет пакетную обработку: записывает результаты в target по мере их получения.
+
+    :param source: Входной поток с записями "a op b".
+    :param target: Выходной поток для результатов.
+    :param workers: Количество процессов для параллельной обработки.
+    :param chunk_size: Количество записей в одном блоке.
+    :return: Кортеж (количество обработанных записей, затраченное время в секундах).
+    """
+
+    count = 0
+    started = time.perf_counter()
+    for result in evaluate_stream(source, workers, chunk_size):
+        target.write(result + "\n")
+        count += 1
+    target.flush()
+    return count, time.perf_counter() - started
+
+
+class CalculationServer:
+    """
+    Асинхронный TCP-сервер калькулятора с протоколом JSON lines.
+    Запрос: {"id": 1, "a": 6, "b": 3, "op": "/"}, ответ: {"id": 1, "result": 2.0}
+    или {"id": 1, "error": "ошибка"}. Запросы всех клиентов, пришедшие в течение короткого окна,
+    объединяются в один вызов Calculator.calculate_many, который выполняется в пуле потоков,
+    не блокируя цикл событий.
+    """
+
+    def __init__(
+        self,
+        calculator: Calculator,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_batch_size: int = 1024,
+        batch_window: float = 0.002,
+        max_pending: int = 65536,
+        max_in_flight: int = 256,
+    ) -> None:
+        """
+        Инициализирует сервер.
+
+        :param calculator: Экземпляр Calculator, выполняющий вычисления.
+        :param host: Адрес для прослушивания.
+        :param port: Порт (0 - выбрать свободный).
+        :param max_batch_size: Максимальное количество запросов в одном пакете.
+        :param batch_window: Время ожидания дополнительных запросов для пакета, в секундах.
+        :param max_pending: Размер общей очереди запросов; при её заполнении чтение от клиентов приостанавливается.
+        :param max_in_flight: Максимальное количество неотвеченных запросов одного клиента.
+        """
+
+        if max_batch_size <= 0:
+            raise ValueError("Размер пакета должен быть положительным")
+
+        self.calculator = calculator
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self.requests = 0
+        self.batches = 0
+        self._queue: Optional["asyncio.Queue[Tuple[float, float, str, asyncio.Future[Dict[str, Any]], Any]]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """
+        Запускает прослушивание порта и цикл формирования пакетов.
+        """
+
+        self._queue = asyncio.Queue(self.max_pending)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """
+        Запускает сервер и обслуживает клиентов до отмены.
+        """
+
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """
+        Останавливает сервер и цикл формирования пакетов.
+        """
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Возвращает статистику: количество запросов, пакетов и средний размер пакета.
+        """
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "average_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживает одно соединение. Ответы отправляются отдельной задачей в порядке запросов,
+        а при превышении max_in_flight чтение новых запросов приостанавливается.
+        """
+
+        responses: "asyncio.Queue[Optional[asyncio.Future[Dict[str, Any]]]]" = asyncio.Queue(self.max_in_flight)
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # Строка длиннее лимита StreamReader: граница следующего запроса потеряна,
+                    # поэтому клиент получает ошибку, и соединение закрывается
+                    await responses.put(self._resolved({"error": "слишком длинный запрос"}))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await responses.put(await self._submit(line))
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _resolved(response: Dict[str, Any]) -> "asyncio.Future[Dict[str, Any]]":
+        """
+        Возвращает уже завершённый future с готовым ответом.
+        """
+
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        future.set_result(response)
+        return future
+
+    async def _submit(self, line: bytes) -> "asyncio.Future[Dict[str, Any]]":
+        """
+        Разбирает запрос и ставит его в общую очередь. Для некорректного запроса
+        сразу возвращает завершённый future с описанием ошибки; если запрос разобран
+        как JSON-объект, в ответ включается его id.
+        """
+
+        request: Any = None
+        try:
+            request = json.loads(line)
+            a, b, op = request["a"], request["b"], request["op"]
+            if not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in (a, b)):
+                raise TypeError
+            if not isinstance(op, str):
+                raise TypeError
+            # Целое JSON за пределами диапазона float даёт OverflowError
+            first, second = float(a), float(b)
+        except (ValueError, KeyError, TypeError, OverflowError):
+            if isinstance(request, dict):
+                return self._resolved({"id": request.get("id"), "error": "некорректный запрос"})
+            return self._resolved({"error": "некорректный запрос"})
+
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        assert self._queue is not None
+        await self._queue.put((first, second, op, future, request.get("id")))
+        return future
+
+    async def _send_responses(
+        self, responses: "asyncio.Queue[Optional[asyncio.Future[Dict[str, Any]]]]", writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Отправляет ответы клиенту по мере их готовности, соблюдая порядок запросов.
+        """
+
+        while True:
+            future = await responses.get()
+            if future is None:
+                return
+            response = await future
+            try:
+                data = json.dumps(response, ensure_ascii=False, allow_nan=False)
+            except ValueError:
+                # NaN и бесконечность (например, в id запроса) не представимы в JSON
+                data = json.dumps({"error": "некорректный ответ"}, ensure_ascii=False)
+            try:
+                writer.write(data.encode("utf-8") + b"\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _batch_loop(self) -> None:
+        """
+        Собирает запросы в пакеты: ожидает первый запрос, затем добирает остальные
+        в течение batch_window или до max_batch_size и вычисляет пакет одним вызовом.
+        """
+
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._evaluate(batch)
+
+    async def _evaluate(self, batch: List[Tuple[float, float, str, "asyncio.Future[Dict[str, Any]]", Any]]) -> None:
+        """
+        Вычисляет пакет запросов в пуле потоков и завершает их future. Если вычисление пакета
+        завершилось исключением или было отменено, каждый запрос пакета получает ответ с ошибкой;
+        бесконечность и NaN, не представимые в JSON, также возвращаются как ошибка.
+        """
+
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                result = await loop.run_in_executor(
+                    None,
+                    self.calculator.calculate_many,
+                    [item[0] for item in batch],
+                    [item[1] for item in batch],
+                    [item[2] for item in batch],
+                )
+            except Exception:
+                # Сбой вычисления пакета не останавливает сервер: запросы пакета получат ошибку ниже
+                return
+
+            self.requests += len(batch)
+            self.batches += 1
+            for i, (_, _, _, future, request_id) in enumerate(batch):
+                if future.done():
+                    continue
+                value = float(result.results[i])
+                if result.errors[i] or not math.isfinite(value):
+                    future.set_result({"id": request_id, "error": "ошибка"})
+                else:
+                    future.set_result({"id": request_id, "result": value})
+        finally:
+            # Клиенты ждут ответы в порядке запросов, поэтому ни один future не остаётся незавершённым
+            for _, _, _, future, request_id in batch:
+                if not future.done():
+                    future.set_result({"id": request_id, "error": "ошибка"})
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
     """
     Главная функция: создаёт окно, инициализирует приложение калькулятора и запускает главный цикл.
+    С ключом --batch работает без графического интерфейса: читает записи "a op b" из файла
+    или stdin, выводит результаты в stdout, а пропускную способность - в stderr.
+    С ключом --serve запускает TCP-сервер CalculationServer.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:]).
     """
 
+    parser = argparse.ArgumentParser(description="Калькулятор")
+    parser.add_argument(
+        "--batch", nargs="?", const="-", metavar="FILE", help="пакетный режим: файл с записями или '-' для stdin"
+    )
+    parser.add_argument("--workers", type=int, default=0, help="количество процессов для пакетного режима")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="количество записей в одном блоке")
+    parser.add_argument("--history", metavar="FILE", help="файл журнала вычислений для графического интерфейса")
+    parser.add_argument("--serve", action="store_true", help="запустить TCP-сервер с протоколом JSON lines")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес сервера")
+    parser.add_argument("--port", type=int, default=8765, help="порт сервера")
+    parser.add_argument("--max-batch-size", type=int, default=1024, help="максимальный размер пакета сервера")
+    parser.add_argument("--batch-window", type=float, default=0.002, help="окно объединения запросов, с")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = CalculationServer(
+            Calculator(), args.host, args.port, max_batch_size=args.max_batch_size, batch_window=args.batch_window
+        )
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.batch is not None:
+        if args.batch == "-":
+            count, elapsed = run_batch(sys.stdin, sys.stdout, args.workers, args.chunk_size)
+        else:
+            with open(args.batch, "r", encoding="utf-8") as source:
+                count, elapsed = run_batch(source, sys.stdout, args.workers, args.chunk_size)
+        rate = count / elapsed if elapsed > 0 else float("inf")
+        print(f"Обработано записей: {count} за {elapsed:.3f} с ({rate:.0f} записей/с)", file=sys.stderr)
+        return
+
     root = tk.Tk()
     root.title("Калькулятор")
 
     # Создаем экземпляры калькулятора и приложения
-    calculator = Calculator()
+    history = CalculationHistory(args.history) if args.history else None
+    calculator = Calculator(history=history)
     app = CalculatorApp(root, calculator)
 
     # Запускаем основной цикл обработки событий
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        if history is not None:
+            history.close()
 
 
 if __name__ == "__main__":
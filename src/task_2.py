@@ -7,8 +7,22 @@
 # кодировке: #ff0000 – красный, #ff7d00 – оранжевый, #ffff00 – желтый,
 # 00ff00 – зеленый, #007dff – голубой, #0000ff – синий, #7d00ff – фиолетовый.
 
+import argparse
 import tkinter as tk
-from typing import Dict
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import palette
+from src.palette import BasePalette, build_palette, format_hex, load_palette
+from src.quantize import ImageHeader, quantize_image
+from src.swatches import SwatchGrid
+
+
+# Максимальное количество вариантов автодополнения под полем ввода
+SUGGESTION_LIMIT = 8
+
+# Палитры больше этого размера отображаются виртуализированной сеткой вместо кнопок
+SWATCH_GRID_THRESHOLD = 32
 
 
 class ColorManager:
@@ -16,26 +30,164 @@ class ColorManager:
     Класс для управления цветовыми данными.
     """
 
-    def __init__(self, colors: Dict[str, str]) -> None:
+    def __init__(self, colors: Mapping[str, str]) -> None:
         """
         Инициализирует ColorManager, принимая на вход словарь соответствия:
-        название цвета -> шестнадцатеричный код.
+        название цвета -> код. Цвета переносятся в компактную палитру Palette; готовая палитра
+        используется как есть. Отдельно хранятся только коды, записанные не как "#rrggbb"
+        (например, "#FF0000" или название Tk "red"): они возвращаются в исходном виде, а цвета
+        без шестнадцатеричного кода находятся только по точному названию.
+
+        :param colors: Словарь кодов цветов или палитра.
+        """
 
-        :param colors: Словарь кодов цветов.
+        # Исходные записи кодов, отличающиеся от "#rrggbb", по названию цвета
+        self.spellings: Dict[str, str] = {}
+        self.colors: BasePalette = colors if isinstance(colors, BasePalette) else build_palette(colors, self.spellings)
+        # Цвета без шестнадцатеричного кода следуют за цветами палитры
+        self._unindexed: List[str] = [name for name in self.spellings if name not in self.colors]
+
+    @classmethod
+    def from_file(cls, path: str) -> "ColorManager":
+        """
+        Создаёт ColorManager из файла палитры (CSS, X11 rgb.txt, JSON, CSV или скомпилированной .cpal).
+
+        :param path: Путь к файлу палитры.
+        :return: Экземпляр ColorManager.
         """
 
-        self.colors = colors
+        return cls(load_palette(path))
 
     def get_color_code(self, color_name: str) -> str:
         """
-        Возвращает код цвета по его названию. Если цвет не найден,
-        возвращает строку "Неизвестный цвет".
+        Возвращает код цвета по его названию в том виде, в каком он задан. Название сравнивается
+        без учёта регистра и различия "е"/"ё". Если цвет не найден, возвращает строку "Неизвестный цвет".
 
         :param color_name: Название цвета.
         :return: Строка с шестнадцатеричным кодом цвета.
         """
 
-        return self.colors.get(color_name, "Неизвестный цвет")
+        name = self.colors.resolve(color_name)
+        if name is not None:
+            spelling = self.spellings.get(name)
+            return spelling if spelling is not None else self.colors[name]
+        return self.spellings.get(color_name, "Неизвестный цвет")
+
+    def __len__(self) -> int:
+        return len(self.colors) + len(self._unindexed)
+
+    def color_at(self, idx: int) -> Tuple[str, str]:
+        """
+        Возвращает название и код цвета по позиции: сначала цвета палитры,
+        затем цвета, заданные только названием Tk.
+
+        :param idx: Позиция цвета.
+        :return: Кортеж (название, код в исходной записи).
+        """
+
+        count = len(self.colors)
+        if idx >= count:
+            name = self._unindexed[idx - count]
+            return name, self.spellings[name]
+        name = self.colors.names[idx]
+        spelling = self.spellings.get(name)
+        return name, spelling if spelling is not None else format_hex(self.colors.codes[idx])
+
+    def get_color_name(self, color_code: str) -> Optional[str]:
+        """
+        Возвращает название цвета по его шестнадцатеричному коду.
+
+        :param color_code: Шестнадцатеричный код цвета.
+        :return: Название цвета или None, если цвет не найден.
+        """
+
+        return self.colors.name_of(color_code)
+
+    def find_nearest_color(self, color_code: str, space: str = "rgb") -> Optional[str]:
+        """
+        Возвращает название цвета палитры, ближайшего к произвольному коду.
+
+        :param color_code: Шестнадцатеричный код цвета (например, "#3a7bd5").
+        :param space: Пространство сравнения: "rgb" или "lab" (перцептивное CIE Lab).
+        :return: Название ближайшего цвета или None, если палитра пуста.
+        """
+
+        return self.colors.nearest(color_code, space)
+
+    def find_nearest_colors(self, color_codes: Iterable[str], space: str = "rgb") -> List[str]:
+        """
+        Пакетный вариант find_nearest_color: находит ближайшие цвета для всех кодов за один вызов.
+
+        :param color_codes: Шестнадцатеричные коды цветов.
+        :param space: Пространство сравнения: "rgb" или "lab".
+        :return: Названия ближайших цветов в порядке запросов.
+        """
+
+        return self.colors.nearest_many(color_codes, space)
+
+    def complete_color_name(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, начинающиеся с prefix, для автодополнения.
+
+        :param prefix: Начало названия (регистр и "е"/"ё" не учитываются).
+        :param limit: Максимальное количество вариантов.
+        :return: Названия цветов в алфавитном порядке.
+        """
+
+        return self.colors.complete(prefix, limit)
+
+    def find_similar_colors(self, color_name: str, max_distance: int = 2, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, похожих на color_name с точностью до опечаток.
+
+        :param color_name: Название цвета, возможно, с опечаткой.
+        :param max_distance: Максимальное количество правок (вставка, удаление, замена символа).
+        :param limit: Максимальное количество вариантов.
+        :return: Названия цветов, начиная с самых близких.
+        """
+
+        return self.colors.fuzzy(color_name, max_distance, limit)
+
+    def convert_palette(self, space: str) -> Any:
+        """
+        Возвращает все цвета палитры в выбранном цветовом пространстве.
+        Результат вычисляется один раз и кэшируется палитрой.
+
+        :param space: Пространство: "int", "hex", "rgb", "hsv", "hsl" или "lab".
+        :return: Массив (n, 3) или (n,) с NumPy, иначе список кортежей или array('I').
+        """
+
+        return self.colors.converted(space)
+
+    def convert_colors(self, colors: Iterable[Any], target: str, source: str = "hex") -> Any:
+        """
+        Переводит произвольный набор цветов из одного пространства в другое целиком.
+
+        :param colors: Цвета в пространстве source (по умолчанию строки "#rrggbb").
+        :param target: Целевое пространство.
+        :param source: Исходное пространство.
+        :return: Цвета в пространстве target.
+        """
+
+        return palette.convert_colors(colors, source, target)
+
+    def quantize_image(
+        self, source: str, target: str, output: str = "pgm", space: str = "rgb", workers: int = 0
+    ) -> ImageHeader:
+        """
+        Постеризует изображение PPM/PAM под палитру: каждый пиксель заменяется
+        ближайшим цветом палитры. Файл обрабатывается потоково полосами строк.
+
+        :param source: Путь к исходному изображению PPM (P6) или PAM (P7).
+        :param target: Путь к результату.
+        :param output: "pgm" - номера цветов палитры, "raw" - номера без заголовка, "ppm" - цвета палитры.
+        :param space: Пространство сравнения: "rgb" или "lab".
+        :param workers: Количество процессов; 0 - обработка в текущем процессе.
+        :return: Параметры изображения.
+        """
+
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            return quantize_image(src, dst, self.colors.codes, output, space, workers)
 
 
 class ColorApp:
@@ -58,28 +210,103 @@ class ColorApp:
     def create_widgets(self) -> None:
         """
         Создаёт и размещает на форме все виджеты: метку для кода цвета,
-        текстовое поле для названия цвета и кнопки, соответствующие цветам радуги.
+        текстовое поле для названия цвета и кнопки, соответствующие цветам радуги
+        (для больших палитр - виртуализированную сетку образцов).
         """
 
         # Метка для отображения кода цвета
         self.color_label: tk.Label = tk.Label(self.root, text="", font=("Arial", 14))
         self.color_label.grid(row=0, column=0, padx=5, pady=5)
 
-        # Текстовое поле для отображения названия цвета
-        self.color_entry: tk.Entry = tk.Entry(self.root, width=20, font=("Arial", 14))
+        # Текстовое поле для отображения названия цвета; содержимое задаётся одной операцией через переменную
+        self.color_name_var: tk.StringVar = tk.StringVar(self.root)
+        self.color_entry: tk.Entry = tk.Entry(self.root, width=20, font=("Arial", 14), textvariable=self.color_name_var)
         self.color_entry.grid(row=1, column=0, padx=5, pady=5)
+        self.color_entry.bind("<KeyRelease>", self.update_suggestions)
+        self.color_entry.bind("<Return>", self.apply_entry)
+
+        # Список вариантов автодополнения для введённого названия
+        self.suggestions: List[str] = []
+        self.suggestion_list: tk.Listbox = tk.Listbox(self.root, width=20, height=SUGGESTION_LIMIT)
+        self.suggestion_list.grid(row=0, column=1, rowspan=SUGGESTION_LIMIT, padx=5, pady=5, sticky="n")
+        self.suggestion_list.bind("<<ListboxSelect>>", self.choose_suggestion)
+
+        # Кнопки цветов (или сетка образцов для больших палитр) переиспользуются при смене палитры
+        self.buttons: List[tk.Button] = []
+        self.swatch_grid: Optional[SwatchGrid] = None
+        self.layout_swatches()
+
+    def layout_swatches(self) -> None:
+        """
+        Приводит кнопки цветов в соответствие с текущей палитрой: существующие кнопки
+        перекрашиваются и переподписываются одним вызовом configure, недостающие создаются,
+        лишние удаляются. Большие палитры показываются виртуализированной сеткой образцов,
+        которая при смене палитры только перерисовывает видимые ячейки.
+        """
 
-        # Создание кнопок для каждого цвета из словаря ColorManager
-        for idx, (color_name, color_code) in enumerate(self.color_manager.colors.items()):
+        colors = self.color_manager.colors
+        if len(self.color_manager) > SWATCH_GRID_THRESHOLD:
+            self._resize_buttons(0)
+            if self.swatch_grid is None:
+                # Большие палитры показываются сеткой образцов, которая отрисовывает только видимые строки
+                self.swatch_grid = SwatchGrid(self.root, colors, self.set_color)
+                self.swatch_grid.grid(row=2, column=0, padx=5, pady=5, sticky="nsew")
+            else:
+                self.swatch_grid.set_palette(colors)
+            return
+
+        if self.swatch_grid is not None:
+            self.swatch_grid.destroy()
+            self.swatch_grid = None
+
+        self._resize_buttons(len(self.color_manager))
+        # Кнопки хранят только свою позицию, поэтому при смене палитры меняются лишь текст и цвет
+        for idx, button in enumerate(self.buttons):
+            color_name, color_code = self.color_manager.color_at(idx)
+            button.configure(text=color_name, bg=color_code)
+
+    def _resize_buttons(self, count: int) -> None:
+        """
+        Создаёт или удаляет кнопки так, чтобы их стало ровно count.
+
+        :param count: Требуемое количество кнопок.
+        """
+
+        while len(self.buttons) > count:
+            self.buttons.pop().destroy()
+        for idx in range(len(self.buttons), count):
             button: tk.Button = tk.Button(
                 self.root,
-                text=color_name,  # Текст на кнопке: название цвета
-                bg=color_code,  # Цвет фона кнопки: шестнадцатеричный код
                 width=20,
-                command=lambda code=color_code, name=color_name: self.set_color(code, name),  # type: ignore
+                command=lambda idx=idx: self.choose_index(idx),  # type: ignore
             )
             # Размещение кнопки ниже предыдущих виджетов
             button.grid(row=2 + idx, column=0, padx=5, pady=5)
+            self.buttons.append(button)
+
+    def swap_palette(self, colors: Mapping[str, str]) -> None:
+        """
+        Переключает приложение на другую палитру за одно обновление интерфейса:
+        виджеты переиспользуются, а перерисовка выполняется один раз после всех изменений.
+
+        :param colors: Словарь "название цвета -> код" или палитра.
+        """
+
+        self.color_manager = ColorManager(colors)
+        self.suggestions = []
+        self.suggestion_list.delete(0, tk.END)
+        self.layout_swatches()
+        self.root.update_idletasks()
+
+    def choose_index(self, idx: int) -> None:
+        """
+        Обработчик нажатия кнопки: выбирает цвет палитры по его позиции.
+
+        :param idx: Позиция цвета в палитре.
+        """
+
+        name, code = self.color_manager.color_at(idx)
+        self.set_color(code, name)
 
     def set_color(self, color_code: str, color_name: str) -> None:
         """
@@ -88,16 +315,80 @@ class ColorApp:
         :param color_code: Шестнадцатеричный код цвета (например, "#ff0000").
         :param color_name: Название цвета (например, "Красный").
         """
-        self.color_entry.delete(0, tk.END)  # Очищаем текстовое поле
-        self.color_entry.insert(0, color_name)  # Вставляем название цвета в текстовое поле
+        self.color_name_var.set(color_name)  # Заменяем текст поля одной операцией
         self.color_label.config(text=color_code)  # Обновляем метку, показывая код цвета
 
+    def update_suggestions(self, event: Optional[tk.Event] = None) -> None:
+        """
+        Обновляет список вариантов по введённому тексту: сначала названия с таким началом,
+        а если их нет - похожие названия с опечатками.
+
+        :param event: Событие Tkinter (не используется).
+        """
+
+        text = self.color_entry.get()
+        suggestions: List[str] = []
+        if text.strip():
+            suggestions = self.color_manager.complete_color_name(text, SUGGESTION_LIMIT)
+            if not suggestions:
+                suggestions = self.color_manager.find_similar_colors(text, limit=SUGGESTION_LIMIT)
+
+        # Список перерисовывается, только если варианты изменились
+        if suggestions != self.suggestions:
+            self.suggestions = suggestions
+            self.suggestion_list.delete(0, tk.END)
+            self.suggestion_list.insert(tk.END, *suggestions)
+
+    def choose_suggestion(self, event: Optional[tk.Event] = None) -> None:
+        """
+        Выбирает цвет из списка вариантов.
+
+        :param event: Событие Tkinter (не используется).
+        """
+
+        selection = self.suggestion_list.curselection()
+        if selection:
+            name = self.suggestions[selection[0]]
+            self.set_color(self.color_manager.get_color_code(name), name)
+
+    def apply_entry(self, event: Optional[tk.Event] = None) -> None:
+        """
+        Применяет введённое название цвета; при опечатке берётся самый похожий вариант.
+
+        :param event: Событие Tkinter (не используется).
+        """
+
+        name = self.color_manager.colors.resolve(self.color_entry.get())
+        if name is None:
+            similar = self.color_manager.find_similar_colors(self.color_entry.get(), limit=1)
+            name = similar[0] if similar else None
+        if name is not None:
+            self.set_color(self.color_manager.get_color_code(name), name)
+        else:
+            self.color_label.config(text=self.color_manager.get_color_code(self.color_entry.get()))
+
 
-def main() -> None:
+def main(argv: Optional[Sequence[str]] = None) -> None:
     """
     Основная функция приложения. Создаёт окно, инициализирует ColorManager и ColorApp,
-    а затем запускает главный цикл обработки событий Tkinter.
+    а затем запускает главный цикл обработки событий Tkinter. Если указан файл палитры,
+    цвета загружаются из него; с ключом --compile палитра сохраняется в двоичном формате .cpal,
+    с ключом --quantize изображение постеризуется под палитру.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:]).
     """
+    parser = argparse.ArgumentParser(description="Цвета радуги")
+    parser.add_argument("palette", nargs="?", help="файл палитры (.css, .txt, .json, .csv, .cpal)")
+    parser.add_argument("--compile", metavar="OUT", help="скомпилировать палитру в двоичный файл и выйти")
+    parser.add_argument(
+        "--quantize",
+        nargs=2,
+        metavar=("IMAGE", "OUT"),
+        help="постеризовать изображение PPM/PAM под палитру и выйти (OUT: .pgm - номера цветов, .ppm - цвета)",
+    )
+    parser.add_argument("--workers", type=int, default=0, help="количество процессов для --quantize")
+    args = parser.parse_args(argv)
+
     # Словарь соответствий цвета радуги и их hex-кодов
     colors: Dict[str, str] = {
         "Красный": "#ff0000",
@@ -109,11 +400,21 @@ def main() -> None:
         "Фиолетовый": "#7d00ff",
     }
 
+    if args.compile:
+        palette.compile_palette(load_palette(args.palette) if args.palette else colors, args.compile)
+        return
+    if args.quantize:
+        manager = ColorManager.from_file(args.palette) if args.palette else ColorManager(colors)
+        image, out = args.quantize
+        output = "ppm" if out.endswith(".ppm") else "pgm" if out.endswith(".pgm") else "raw"
+        manager.quantize_image(image, out, output, workers=args.workers)
+        return
+
     root: tk.Tk = tk.Tk()
     root.title("Цвета радуги")
 
     # Создаём экземпляр ColorManager, который управляет данными о цветах
-    color_manager: ColorManager = ColorManager(colors)
+    color_manager: ColorManager = ColorManager.from_file(args.palette) if args.palette else ColorManager(colors)
 
     # Создаём и запускаем приложение
     app: ColorApp = ColorApp(root, color_manager)
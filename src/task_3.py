@@ -10,8 +10,22 @@
 соответствующими значениями.
 """
 
+import argparse
 import tkinter as tk
-from typing import Dict
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import palette
+from src.palette import BasePalette, build_palette, format_hex, load_palette
+from src.quantize import ImageHeader, quantize_image
+from src.swatches import SwatchGrid
+
+
+# Палитры больше этого размера отображаются виртуализированной сеткой вместо кнопок
+SWATCH_GRID_THRESHOLD = 32
+
+# Цвет, показываемый в метке и текстовом поле при запуске и после смены палитры
+INITIAL_COLOR = "желтый"
 
 
 class ColorManager:
@@ -20,24 +34,153 @@ class ColorManager:
     Хранит соответствия названий цветов их шестнадцатеричным кодам.
     """
 
-    def __init__(self, colors: Dict[str, str]) -> None:
+    def __init__(self, colors: Mapping[str, str]) -> None:
         """
         Инициализирует ColorManager словарём, в котором ключ — это название цвета,
-        а значение — его шестнадцатеричный код.
+        а значение — его код. Цвета хранятся в компактной палитре Palette; готовая палитра
+        используется как есть. Отдельно хранятся только коды, записанные не как "#rrggbb"
+        (например, "#FF0000" или название Tk "red"); цвета без шестнадцатеричного кода
+        находятся только по точному названию.
+
+        :param colors: Словарь вида {название_цвета: код_цвета} или палитра.
+        """
+        # Исходные записи кодов, отличающиеся от "#rrggbb", по названию цвета
+        self.spellings: Dict[str, str] = {}
+        self.colors: BasePalette = colors if isinstance(colors, BasePalette) else build_palette(colors, self.spellings)
+        # Цвета без шестнадцатеричного кода следуют за цветами палитры
+        self._unindexed: List[str] = [name for name in self.spellings if name not in self.colors]
+
+    @classmethod
+    def from_file(cls, path: str) -> "ColorManager":
+        """
+        Создаёт ColorManager из файла палитры (CSS, X11 rgb.txt, JSON, CSV или скомпилированной .cpal).
 
-        :param colors: Словарь вида {название_цвета: hex-код_цвета}.
+        :param path: Путь к файлу палитры.
+        :return: Экземпляр ColorManager.
         """
-        self.colors = colors
+        return cls(load_palette(path))
 
     def get_color_code(self, color_name: str) -> str:
         """
-        Возвращает шестнадцатеричный код цвета по его названию. Если цвет
-        не найден, возвращает белый цвет (#ffffff) по умолчанию.
+        Возвращает код цвета по его названию (в том виде, в каком он задан) без учёта регистра
+        и различия "е"/"ё". Если цвет не найден, возвращает белый цвет (#ffffff) по умолчанию.
 
         :param color_name: Название цвета.
         :return: Шестнадцатеричный код цвета или #ffffff, если цвет не найден.
         """
-        return self.colors.get(color_name, "#ffffff")
+        name = self.colors.resolve(color_name)
+        if name is not None:
+            spelling = self.spellings.get(name)
+            return spelling if spelling is not None else self.colors[name]
+        return self.spellings.get(color_name, "#ffffff")
+
+    def __len__(self) -> int:
+        return len(self.colors) + len(self._unindexed)
+
+    def color_at(self, idx: int) -> Tuple[str, str]:
+        """
+        Возвращает название и код цвета по позиции: сначала цвета палитры,
+        затем цвета, заданные только названием Tk.
+
+        :param idx: Позиция цвета.
+        :return: Кортеж (название, код в исходной записи).
+        """
+
+        count = len(self.colors)
+        if idx >= count:
+            name = self._unindexed[idx - count]
+            return name, self.spellings[name]
+        name = self.colors.names[idx]
+        spelling = self.spellings.get(name)
+        return name, spelling if spelling is not None else format_hex(self.colors.codes[idx])
+
+    def get_color_name(self, color_code: str) -> Optional[str]:
+        """
+        Возвращает название цвета по его шестнадцатеричному коду.
+
+        :param color_code: Шестнадцатеричный код цвета.
+        :return: Название цвета или None, если цвет не найден.
+        """
+        return self.colors.name_of(color_code)
+
+    def find_nearest_color(self, color_code: str, space: str = "rgb") -> Optional[str]:
+        """
+        Возвращает название цвета палитры, ближайшего к произвольному коду.
+
+        :param color_code: Шестнадцатеричный код цвета (например, "#3a7bd5").
+        :param space: Пространство сравнения: "rgb" или "lab" (перцептивное CIE Lab).
+        :return: Название ближайшего цвета или None, если палитра пуста.
+        """
+        return self.colors.nearest(color_code, space)
+
+    def find_nearest_colors(self, color_codes: Iterable[str], space: str = "rgb") -> List[str]:
+        """
+        Пакетный вариант find_nearest_color: находит ближайшие цвета для всех кодов за один вызов.
+
+        :param color_codes: Шестнадцатеричные коды цветов.
+        :param space: Пространство сравнения: "rgb" или "lab".
+        :return: Названия ближайших цветов в порядке запросов.
+        """
+        return self.colors.nearest_many(color_codes, space)
+
+    def complete_color_name(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, начинающиеся с prefix, для автодополнения.
+
+        :param prefix: Начало названия (регистр и "е"/"ё" не учитываются).
+        :param limit: Максимальное количество вариантов.
+        :return: Названия цветов в алфавитном порядке.
+        """
+        return self.colors.complete(prefix, limit)
+
+    def find_similar_colors(self, color_name: str, max_distance: int = 2, limit: int = 10) -> List[str]:
+        """
+        Возвращает названия цветов, похожих на color_name с точностью до опечаток.
+
+        :param color_name: Название цвета, возможно, с опечаткой.
+        :param max_distance: Максимальное количество правок (вставка, удаление, замена символа).
+        :param limit: Максимальное количество вариантов.
+        :return: Названия цветов, начиная с самых близких.
+        """
+        return self.colors.fuzzy(color_name, max_distance, limit)
+
+    def convert_palette(self, space: str) -> Any:
+        """
+        Возвращает все цвета палитры в выбранном цветовом пространстве.
+        Результат вычисляется один раз и кэшируется палитрой.
+
+        :param space: Пространство: "int", "hex", "rgb", "hsv", "hsl" или "lab".
+        :return: Массив (n, 3) или (n,) с NumPy, иначе список кортежей или array('I').
+        """
+        return self.colors.converted(space)
+
+    def convert_colors(self, colors: Iterable[Any], target: str, source: str = "hex") -> Any:
+        """
+        Переводит произвольный набор цветов из одного пространства в другое целиком.
+
+        :param colors: Цвета в пространстве source (по умолчанию строки "#rrggbb").
+        :param target: Целевое пространство.
+        :param source: Исходное пространство.
+        :return: Цвета в пространстве target.
+        """
+        return palette.convert_colors(colors, source, target)
+
+    def quantize_image(
+        self, source: str, target: str, output: str = "pgm", space: str = "rgb", workers: int = 0
+    ) -> ImageHeader:
+        """
+        Постеризует изображение PPM/PAM под палитру: каждый пиксель заменяется
+        ближайшим цветом палитры. Файл обрабатывается потоково полосами строк.
+
+        :param source: Путь к исходному изображению PPM (P6) или PAM (P7).
+        :param target: Путь к результату.
+        :param output: "pgm" - номера цветов палитры, "raw" - номера без заголовка, "ppm" - цвета палитры.
+        :param space: Пространство сравнения: "rgb" или "lab".
+        :param workers: Количество процессов; 0 - обработка в текущем процессе.
+        :return: Параметры изображения.
+        """
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            return quantize_image(src, dst, self.colors.codes, output, space, workers)
 
 
 class ColorApp:
@@ -63,28 +206,84 @@ class ColorApp:
         Создаёт и размещает элементы интерфейса:
         - Метку с начальным названием цвета (по умолчанию "желтый");
         - Текстовое поле, куда вставляется код выбранного цвета;
-        - Горизонтальные кнопки, каждая из которых окрашена в соответствующий цвет.
+        - Горизонтальные кнопки, каждая из которых окрашена в соответствующий цвет
+          (для больших палитр - виртуализированная сетка образцов).
         """
         # Метка, отображающая название текущего цвета
-        self.label: tk.Label = tk.Label(self.root, text="желтый", width=20, font=("Arial", 14))
+        self.label: tk.Label = tk.Label(self.root, text=INITIAL_COLOR, width=20, font=("Arial", 14))
         self.label.pack(pady=5)
 
-        # Текстовое поле для отображения кода цвета
-        self.color_code_entry: tk.Entry = tk.Entry(self.root, width=10, justify="center", font=("Arial", 14))
-        self.color_code_entry.insert(0, self.color_manager.get_color_code("желтый"))
+        # Текстовое поле для отображения кода цвета; содержимое задаётся одной операцией через переменную
+        self.color_code_var: tk.StringVar = tk.StringVar(self.root, self.color_manager.get_color_code(INITIAL_COLOR))
+        self.color_code_entry: tk.Entry = tk.Entry(
+            self.root, width=10, justify="center", font=("Arial", 14), textvariable=self.color_code_var
+        )
         self.color_code_entry.pack(pady=5)
 
-        # Создаём горизонтальные кнопки для каждого цвета из словаря
-        for color_name, color_code in self.color_manager.colors.items():
+        # Кнопки цветов (или сетка образцов для больших палитр) переиспользуются при смене палитры
+        self.buttons: List[tk.Button] = []
+        self.swatch_grid: Optional[SwatchGrid] = None
+        self.layout_swatches()
+
+    def layout_swatches(self) -> None:
+        """
+        Приводит кнопки цветов в соответствие с текущей палитрой: существующие кнопки
+        перекрашиваются одним вызовом configure, недостающие создаются, лишние удаляются.
+        Для больших палитр используется виртуализированная сетка образцов.
+        """
+        colors = self.color_manager.colors
+        if len(self.color_manager) > SWATCH_GRID_THRESHOLD:
+            self._resize_buttons(0)
+            if self.swatch_grid is None:
+                # Сетка образцов отрисовывает только видимые строки
+                self.swatch_grid = SwatchGrid(
+                    self.root, colors, lambda code, name: self.update_color(name), show_names=False
+                )
+                self.swatch_grid.pack(fill=tk.BOTH, expand=True, padx=2, pady=10)
+            else:
+                self.swatch_grid.set_palette(colors)
+            return
+
+        if self.swatch_grid is not None:
+            self.swatch_grid.destroy()
+            self.swatch_grid = None
+
+        self._resize_buttons(len(self.color_manager))
+        # Кнопки хранят только свою позицию, поэтому при смене палитры меняется лишь цвет
+        for idx, btn in enumerate(self.buttons):
+            btn.configure(bg=self.color_manager.color_at(idx)[1])
+
+    def _resize_buttons(self, count: int) -> None:
+        """
+        Создаёт или удаляет кнопки так, чтобы их стало ровно count.
+
+        :param count: Требуемое количество кнопок.
+        """
+        while len(self.buttons) > count:
+            self.buttons.pop().destroy()
+        for idx in range(len(self.buttons), count):
             btn: tk.Button = tk.Button(
                 self.root,
-                bg=color_code,
                 width=4,
                 height=2,
-                command=lambda c=color_name: self.update_color(c),  # type: ignore
+                command=lambda idx=idx: self.update_color(self.color_manager.color_at(idx)[0]),  # type: ignore
             )
             # Размещаем кнопки слева направо в одной строке
             btn.pack(side=tk.LEFT, padx=2, pady=10)
+            self.buttons.append(btn)
+
+    def swap_palette(self, colors: Mapping[str, str]) -> None:
+        """
+        Переключает приложение на другую палитру за одно обновление интерфейса:
+        виджеты переиспользуются, а перерисовка выполняется один раз после всех изменений.
+        Метка и текстовое поле возвращаются к начальному цвету, код которого берётся из новой палитры.
+
+        :param colors: Словарь "название цвета -> код" или палитра.
+        """
+        self.color_manager = ColorManager(colors)
+        self.layout_swatches()
+        self.update_color(INITIAL_COLOR)
+        self.root.update_idletasks()
 
     def update_color(self, selected_color: str) -> None:
         """
@@ -97,18 +296,33 @@ class ColorApp:
         color_code = self.color_manager.get_color_code(selected_color)
 
         # Обновляем текстовое поле кодом цвета
-        self.color_code_entry.delete(0, tk.END)
-        self.color_code_entry.insert(0, color_code)
+        self.color_code_var.set(color_code)
 
         # Обновляем метку названием цвета
         self.label.config(text=selected_color)
 
 
-def main() -> None:
+def main(argv: Optional[Sequence[str]] = None) -> None:
     """
     Основная функция программы. Создаёт окно, инициализирует объекты ColorManager
-    и ColorApp, а затем запускает главный цикл обработки событий.
+    и ColorApp, а затем запускает главный цикл обработки событий. Если указан файл палитры,
+    цвета загружаются из него; с ключом --compile палитра сохраняется в двоичном формате .cpal,
+    с ключом --quantize изображение постеризуется под палитру.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:]).
     """
+    parser = argparse.ArgumentParser(description="Цветовая палитра")
+    parser.add_argument("palette", nargs="?", help="файл палитры (.css, .txt, .json, .csv, .cpal)")
+    parser.add_argument("--compile", metavar="OUT", help="скомпилировать палитру в двоичный файл и выйти")
+    parser.add_argument(
+        "--quantize",
+        nargs=2,
+        metavar=("IMAGE", "OUT"),
+        help="постеризовать изображение PPM/PAM под палитру и выйти (OUT: .pgm - номера цветов, .ppm - цвета)",
+    )
+    parser.add_argument("--workers", type=int, default=0, help="количество процессов для --quantize")
+    args = parser.parse_args(argv)
+
     # Словарь с набором цветов (название_цвета -> шестнадцатеричный_код)
     colors: Dict[str, str] = {
         "красный": "#ff0000",
@@ -120,11 +334,21 @@ def main() -> None:
         "фиолетовый": "#7f00ff",
     }
 
+    if args.compile:
+        palette.compile_palette(load_palette(args.palette) if args.palette else colors, args.compile)
+        return
+    if args.quantize:
+        manager = ColorManager.from_file(args.palette) if args.palette else ColorManager(colors)
+        image, out = args.quantize
+        output = "ppm" if out.endswith(".ppm") else "pgm" if out.endswith(".pgm") else "raw"
+        manager.quantize_image(image, out, output, workers=args.workers)
+        return
+
     root: tk.Tk = tk.Tk()
     root.title("Цветовая палитра")
 
     # Создаём экземпляр ColorManager
-    color_manager: ColorManager = ColorManager(colors)
+    color_manager: ColorManager = ColorManager.from_file(args.palette) if args.palette else ColorManager(colors)
 
     # Создаём экземпляр приложения и запускаем цикл обработки событий
     app: ColorApp = ColorApp(root, color_manager)
@@ -12,9 +12,396 @@
 # вам понадобится функция open языка Python и методы файловых объектов чтения
 # и записи.
 
+import argparse
+import bisect
+import codecs
+import contextlib
+import io
+import mmap
+import os
+import queue
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
 import tkinter as tk
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
-from typing import Optional
+from typing import Any, BinaryIO, List, NamedTuple, Optional, Set, Tuple, Union
+
+from src.piece_table import PieceTable, PieceTableBuilder
+
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy необязателен
+    np = None  # type: ignore
+
+# Наибольший суммарный размер содержимого недавно открытых файлов в кэше FileManager, байт
+CONTENT_CACHE_BYTES = 32 * 1024 * 1024
+
+# Количество потоков пакетной обработки файлов по умолчанию
+BATCH_WORKERS = 8
+
+# Переводы строк, к которым приводятся файлы при пакетной обработке
+NEWLINES = {"lf": "\n", "crlf": "\r\n", "cr": "\r"}
+
+# Период проверки файла в режиме слежения по умолчанию, мс
+FOLLOW_POLL_MS = 500
+
+# Наибольший объём дописанных данных, читаемый в режиме слежения за один шаг, байт
+FOLLOW_READ_LIMIT = 1024 * 1024
+
+# Размер блока потокового чтения файла, байт
+OPEN_CHUNK_SIZE = 256 * 1024
+
+# Файлы больше этого размера открываются потоково в фоновом потоке, байт
+STREAM_OPEN_THRESHOLD = 1024 * 1024
+
+# Период проверки очереди прочитанных блоков, мс
+LOAD_POLL_MS = 15
+
+# Максимальное количество блоков, ожидающих вставки в текстовое поле
+LOAD_QUEUE_SIZE = 8
+
+# Сколько последних правок можно отменить
+UNDO_LIMIT = 1000
+
+# Наибольший размер изменённого участка, который сохраняется без перезаписи всего файла, символов
+INCREMENTAL_SAVE_LIMIT = 1024 * 1024
+
+# Файлы больше этого размера открываются только для просмотра через mmap, байт
+VIEWER_THRESHOLD = 64 * 1024 * 1024
+
+# Индекс строк хранит смещение каждой LINE_INDEX_STRIDE-й строки
+LINE_INDEX_STRIDE = 64
+
+# Объём файла, индексируемый за один шаг фонового индексирования, байт
+INDEX_STEP_BYTES = 16 * 1024 * 1024
+
+# Объём документа, просматриваемый поиском между проверками отмены, байт
+SEARCH_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Количество совпадений, подсвечиваемых за один шаг
+SEARCH_HIGHLIGHT_BATCH = 2000
+
+# Количество запросов, результаты которых хранятся для повторного поиска
+SEARCH_CACHE_SIZE = 8
+
+# Тег подсветки найденных совпадений
+SEARCH_TAG = "match"
+
+
+def _current_umask() -> int:
+    """
+    Возвращает маску прав процесса. В Linux она читается из /proc/self/status без изменения;
+    на других системах маска на мгновение заменяется строгой 0o077 и сразу восстанавливается,
+    так что файлы, созданные другими потоками в этот момент, не получат лишних прав.
+    """
+
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    mask = os.umask(0o077)
+    os.umask(mask)
+    return mask
+
+
+class AtomicWriter:
+    """
+    Потоковая атомарная запись текстового файла: текст кодируется инкрементальным кодировщиком
+    и пишется во временный файл в каталоге целевого; commit() сбрасывает данные на диск (fsync)
+    и переименовывает временный файл поверх целевого. При сбое на диске остаётся либо старое,
+    либо новое содержимое. Права существующего файла сохраняются.
+    """
+
+    def __init__(self, filename: str, encoding: str = "utf-8", newline: Optional[str] = None) -> None:
+        """
+        Создаёт временный файл рядом с целевым.
+
+        :param filename: Путь к целевому файлу.
+        :param encoding: Кодировка файла.
+        :param newline: На что заменяются переводы строк "\\n", как в open(): None - os.linesep,
+            "" или "\\n" - без замены.
+        """
+
+        self.filename = filename
+        self.newline = os.linesep if newline is None else newline or "\n"
+        self.directory = os.path.dirname(os.path.abspath(filename))
+        try:
+            self.mode = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            # Новый файл получает права 0o666 & ~umask, как при open(..., "w")
+            self.mode = 0o666 & ~_current_umask()
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        fd, self.temp_name = tempfile.mkstemp(
+            prefix=f".{os.path.basename(filename)}.", suffix=".tmp", dir=self.directory
+        )
+        self._file = open(fd, "wb")
+        self.written = 0
+
+    def write(self, text: str) -> None:
+        """
+        Кодирует и дописывает очередной фрагмент текста. Переводы строк "\\n" заменяются
+        на self.newline, как при записи файла в текстовом режиме.
+
+        :param text: Фрагмент текста.
+        """
+
+        if self.newline != "\n":
+            text = text.replace("\n", self.newline)
+        data = self._encoder.encode(text)
+        self._file.write(data)
+        self.written += len(data)
+
+    def write_bytes(self, data: Union[bytes, memoryview]) -> None:
+        """
+        Дописывает уже закодированные байты без замены переводов строк.
+
+        :param data: Байты в кодировке файла.
+        """
+
+        self._file.write(data)
+        self.written += len(data)
+
+    def commit(self) -> None:
+        """
+        Завершает запись: сбрасывает данные на диск и атомарно заменяет целевой файл.
+        При ошибке временный файл удаляется, а исключение пробрасывается.
+        """
+
+        try:
+            self._file.write(self._encoder.encode("", final=True))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.chmod(self.temp_name, self.mode)
+            os.replace(self.temp_name, self.filename)
+        except BaseException:
+            self.abort()
+            raise
+
+        # Переименование становится устойчивым к сбоям после fsync каталога
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def abort(self) -> None:
+        """
+        Отменяет запись: временный файл закрывается и удаляется, целевой файл не меняется.
+        """
+
+        self._file.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.temp_name)
+
+    def __enter__(self) -> "AtomicWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class FileManagerError(Exception):
+    """
+    Ошибка работы с файлом в FileManager. Исходное исключение доступно в __cause__.
+    """
+
+    def __init__(self, filename: str, message: str) -> None:
+        """
+        :param filename: Путь к файлу.
+        :param message: Сообщение для пользователя.
+        """
+
+        super().__init__(message)
+        self.filename = filename
+
+
+class FileMissingError(FileManagerError):
+    """
+    Файл не найден.
+    """
+
+
+class FileReadError(FileManagerError):
+    """
+    Файл не удалось прочитать: нет доступа, это каталог, ошибка ввода-вывода.
+    """
+
+
+class FileEncodingError(FileManagerError):
+    """
+    Содержимое не удалось декодировать или закодировать в заданной кодировке.
+    """
+
+
+class FileWriteError(FileManagerError):
+    """
+    Файл не удалось записать.
+    """
+
+
+class BatchResult(NamedTuple):
+    """
+    Итог пакетной обработки одного файла: ошибка (None - успешно), время обработки в секундах,
+    количество прочитанных и записанных байт и был ли файл перезаписан.
+    """
+
+    filename: str
+    error: Optional[FileManagerError]
+    elapsed: float
+    read: int
+    written: int
+    changed: bool
+
+
+class CacheStats(NamedTuple):
+    """
+    Статистика кэша содержимого файлов.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class ContentCache:
+    """
+    LRU-кэш содержимого файлов, ограниченный суммарным размером записей в байтах.
+    Запись действительна, пока у файла не изменились (st_mtime_ns, st_size, st_ino),
+    поэтому устаревшее содержимое не возвращается. В компактном режиме содержимое хранится
+    в виде байтов UTF-8 и декодируется только при попадании: строки с кириллицей или
+    отдельными символами вне BMP в памяти Python занимают 2-4 байта на каждый символ.
+    Потокобезопасен.
+    """
+
+    def __init__(self, max_bytes: int = CONTENT_CACHE_BYTES, encoded: bool = False) -> None:
+        """
+        :param max_bytes: Наибольший суммарный размер записей.
+        :param encoded: Хранить ли содержимое в виде байтов UTF-8.
+        """
+
+        self.max_bytes = max_bytes
+        self.encoded = encoded
+        self._lock = threading.Lock()
+        # Абсолютный путь -> (ключ файла, содержимое, размер записи)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, int], Union[str, bytes], int]]" = OrderedDict()
+        self._size = 0
+        self._hits = self._misses = self._evictions = 0
+
+    @staticmethod
+    def file_key(filename: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Ключ, по которому проверяется актуальность записи.
+
+        :param filename: Путь к файлу.
+        :return: (st_mtime_ns, st_size, st_ino) или None, если файл недоступен.
+        """
+
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def get(self, filename: str, key: Tuple[int, int, int]) -> Optional[str]:
+        """
+        Возвращает содержимое файла, если оно есть в кэше и файл с тех пор не менялся.
+        Устаревшая запись удаляется.
+
+        :param filename: Путь к файлу.
+        :param key: Текущий ключ файла (см. file_key).
+        :return: Содержимое или None.
+        """
+
+        path = os.path.abspath(filename)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != key:
+                if entry is not None:
+                    self._remove(path)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self._hits += 1
+        data = entry[1]
+        return data.decode("utf-8") if isinstance(data, bytes) else data
+
+    def put(self, filename: str, key: Tuple[int, int, int], content: str) -> None:
+        """
+        Сохраняет содержимое файла, вытесняя давно не использованные записи сверх max_bytes.
+        Содержимое больше max_bytes не кэшируется.
+
+        :param filename: Путь к файлу.
+        :param key: Ключ файла на момент чтения содержимого.
+        :param content: Содержимое файла.
+        """
+
+        data: Union[str, bytes] = content.encode("utf-8") if self.encoded else content
+        size = sys.getsizeof(data)
+        path = os.path.abspath(filename)
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (key, data, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def discard(self, filename: str) -> None:
+        """
+        Удаляет запись файла, например перед его изменением на месте.
+        """
+
+        with self._lock:
+            self._remove(os.path.abspath(filename))
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи. Статистика сохраняется.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, path: str) -> None:
+        """
+        Удаляет запись, если она есть. Вызывается под блокировкой.
+        """
+
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def stats(self) -> CacheStats:
+        """
+        Возвращает количество попаданий, промахов, вытеснений, записей и их суммарный размер.
+        """
+
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._size)
 
 
 class FileManager:
@@ -22,26 +409,128 @@ class FileManager:
     Класс для работы с файлами: открытие, сохранение, чтение.
     """
 
+    def __init__(self, cache_bytes: int = CONTENT_CACHE_BYTES, encoded_cache: bool = False) -> None:
+        """
+        :param cache_bytes: Наибольший размер кэша недавно открытых файлов (0 - без кэша).
+        :param encoded_cache: Хранить ли содержимое в кэше в виде байтов UTF-8 (см. ContentCache).
+        """
+
+        self.cache: Optional[ContentCache] = ContentCache(cache_bytes, encoded_cache) if cache_bytes > 0 else None
+
     def open_file(self, filename: str) -> Optional[str]:
         """
         Открывает файл с именем filename и возвращает содержимое файла в виде строки.
+        Ошибки показываются в окне сообщения (см. read_text).
 
         :param filename: Путь к файлу, который нужно открыть.
         :return: Содержимое файла или None, если файл не удалось открыть.
         """
 
         try:
-            with open(filename, "r", encoding="utf-8") as file:
-                return file.read()
-        except FileNotFoundError:
-            messagebox.showerror("Ошибка", f"Файл {filename} не найден!")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+            return self.read_text(filename)
+        except FileManagerError as e:
+            messagebox.showerror("Ошибка", str(e))
         return None
 
+    def read_text(self, filename: str, encoding: str = "utf-8", newline: Optional[str] = None) -> str:
+        """
+        Читает файл целиком без обращения к интерфейсу. Недавно открытые и с тех пор
+        не изменённые файлы в UTF-8 возвращаются из кэша без чтения (см. ContentCache).
+
+        :param filename: Путь к файлу.
+        :param encoding: Кодировка файла.
+        :param newline: Обработка переводов строк, как в open(): None - приводятся к "\\n",
+            "" - остаются как в файле.
+        :return: Содержимое файла.
+        :raises FileMissingError: Файл не найден.
+        :raises FileReadError: Файл не удалось прочитать.
+        :raises FileEncodingError: Содержимое не соответствует кодировке.
+        """
+
+        cache = self.cache if encoding == "utf-8" and newline is None else None
+        key = ContentCache.file_key(filename) if cache is not None else None
+        if cache is not None and key is not None:
+            content = cache.get(filename, key)
+            if content is not None:
+                return content
+
+        try:
+            if newline is None:
+                with open(filename, "r", encoding=encoding) as file:
+                    content = file.read()
+            else:
+                with open(filename, "r", encoding=encoding, newline=newline) as file:
+                    content = file.read()
+        except FileNotFoundError as e:
+            raise FileMissingError(filename, f"Файл {filename} не найден!") from e
+        except (UnicodeError, LookupError) as e:
+            raise FileEncodingError(filename, f"Не удалось открыть файл: {str(e)}") from e
+        except OSError as e:
+            raise FileReadError(filename, f"Не удалось открыть файл: {str(e)}") from e
+
+        # Если файл изменился во время чтения, прочитанное содержимое не кэшируется
+        if cache is not None and key is not None and ContentCache.file_key(filename) == key:
+            cache.put(filename, key, content)
+        return content
+
+    def read_document(self, filename: str) -> PieceTable:
+        """
+        Читает файл в UTF-8 как документ (см. PieceTable.from_bytes): фрагменты документа
+        ссылаются на прочитанные байты, поэтому содержимое не копируется в строку.
+
+        :param filename: Путь к файлу.
+        :return: Документ с содержимым файла.
+        :raises FileMissingError: Файл не найден.
+        :raises FileReadError: Файл не удалось прочитать.
+        :raises FileEncodingError: Содержимое не в UTF-8.
+        """
+
+        try:
+            with open(filename, "rb") as file:
+                return PieceTable.from_bytes(file.read())
+        except FileNotFoundError as e:
+            raise FileMissingError(filename, f"Файл {filename} не найден!") from e
+        except UnicodeError as e:
+            raise FileEncodingError(filename, f"Не удалось открыть файл: {str(e)}") from e
+        except OSError as e:
+            raise FileReadError(filename, f"Не удалось открыть файл: {str(e)}") from e
+
+    def read_chunks(
+        self, filename: str, chunk_size: int = OPEN_CHUNK_SIZE, builder: Optional[PieceTableBuilder] = None
+    ) -> Iterator[Tuple[str, int]]:
+        """
+        Потоково читает файл в кодировке UTF-8 блоками по chunk_size байт.
+        Многобайтовые символы и переводы строк "\\r\\n" на границах блоков обрабатываются
+        инкрементальным декодером так же, как при чтении файла целиком в текстовом режиме.
+        Если передан builder, блоки декодируются им, и из прочитанных байт без копирования
+        собирается документ. Ошибки открытия и декодирования не перехватываются.
+
+        :param filename: Путь к файлу.
+        :param chunk_size: Размер блока в байтах.
+        :param builder: Построитель документа, в который передаются прочитанные блоки.
+        :return: Итератор пар (текст блока, количество прочитанных байт с начала файла).
+        """
+
+        decode: Callable[[bytes, bool], str]
+        if builder is not None:
+            decode = builder.feed
+        else:
+            decode = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True).decode
+        done = 0
+        with open(filename, "rb") as file:
+            while True:
+                data = file.read(chunk_size)
+                done += len(data)
+                text = decode(data, not data)
+                if text:
+                    yield text, done
+                if not data:
+                    return
+
     def save_file(self, filename: str, content: str) -> None:
         """
         Сохраняет переданное содержимое content в файл с именем filename.
+        Файл заменяется атомарно (см. write_text), итог показывается в окне сообщения.
 
         :param filename: Путь к файлу, в который требуется сохранить данные.
         :param content: Строка с содержимым, которое нужно записать в файл.
@@ -49,97 +538,2286 @@ class FileManager:
         """
 
         try:
-            with open(filename, "w", encoding="utf-8") as file:
-                file.write(content)
+            self.write_text(filename, content)
             messagebox.showinfo("Успех", f"Файл {filename} успешно сохранён!")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {str(e)}")
+        except FileManagerError as e:
+            messagebox.showerror("Ошибка", str(e))
 
+    def write_text(
+        self, filename: str, content: Union[str, Iterable[str]], encoding: str = "utf-8", newline: Optional[str] = None
+    ) -> int:
+        """
+        Атомарно записывает содержимое в файл без обращения к интерфейсу (см. write_atomic).
 
-class FileEditorApp:
-    """
-    Класс для создания интерфейса простого текстового редактора, который
-    позволяет открывать и сохранять файлы.
-    """
+        :param filename: Путь к файлу.
+        :param content: Строка или итерируемый источник фрагментов текста.
+        :param encoding: Кодировка файла.
+        :param newline: Замена переводов строк "\\n", как в open() (см. AtomicWriter).
+        :return: Количество записанных байт.
+        :raises FileEncodingError: Текст не представим в кодировке.
+        :raises FileWriteError: Файл не удалось записать.
+        """
+
+        try:
+            return self.write_atomic(filename, content, encoding, newline)
+        except (UnicodeError, LookupError) as e:
+            raise FileEncodingError(filename, f"Не удалось сохранить файл: {str(e)}") from e
+        except OSError as e:
+            raise FileWriteError(filename, f"Не удалось сохранить файл: {str(e)}") from e
 
-    def __init__(self, root: tk.Tk, file_manager: FileManager) -> None:
+    def write_atomic(
+        self, filename: str, content: Union[str, Iterable[str]], encoding: str = "utf-8", newline: Optional[str] = None
+    ) -> int:
         """
-        Инициализирует приложение, создавая необходимые виджеты и
-        связывая их с методами класса FileEditorApp.
+        Атомарно записывает содержимое в файл (см. AtomicWriter). Содержимое может быть строкой
+        или последовательностью фрагментов: фрагменты кодируются и пишутся по одному,
+        поэтому весь текст не собирается в одну строку. Ошибки не перехватываются.
 
-        :param root: Главное окно приложения, экземпляр tk.Tk.
-        :param file_manager: Экземпляр класса FileManager.
+        :param filename: Путь к файлу.
+        :param content: Строка или итерируемый источник фрагментов текста.
+        :param encoding: Кодировка файла.
+        :param newline: Замена переводов строк "\\n", как в open() (см. AtomicWriter).
+        :return: Количество записанных байт.
         """
 
-        self.root: tk.Tk = root
-        self.file_manager: FileManager = file_manager
-        self.create_widgets()
+        if self.cache is not None:
+            self.cache.discard(filename)
+        with AtomicWriter(filename, encoding, newline) as writer:
+            for chunk in [content] if isinstance(content, str) else content:
+                writer.write(chunk)
+        return writer.written
 
-    def create_widgets(self) -> None:
+    def write_document(
+        self, filename: str, document: PieceTable, encoding: str = "utf-8", newline: Optional[str] = None
+    ) -> int:
         """
-        Создаёт и располагает на форме все необходимые элементы интерфейса.
+        Атомарно записывает документ в файл по фрагментам, не собирая текст в одну строку.
+        Если кодировка - UTF-8 и переводы строк не заменяются, участки исходного файла пишутся
+        прямо из буфера документа без декодирования.
+
+        :param filename: Путь к файлу.
+        :param document: Документ (снимок не меняется, поэтому его можно записывать в фоновом потоке).
+        :param encoding: Кодировка файла.
+        :param newline: Замена переводов строк "\\n", как в open() (см. AtomicWriter).
+        :return: Количество записанных байт.
+        :raises FileEncodingError: Текст не представим в кодировке.
+        :raises FileWriteError: Файл не удалось записать.
         """
 
-        # Поле ввода имени файла
-        self.filename_entry: tk.Entry = tk.Entry(self.root, width=40, font=("Arial", 14))
-        self.filename_entry.grid(row=0, column=0, padx=10, pady=10)
+        if self.cache is not None:
+            self.cache.discard(filename)
+        try:
+            with AtomicWriter(filename, encoding, newline) as writer:
+                if codecs.lookup(encoding).name == "utf-8" and writer.newline == "\n":
+                    for data in document.utf8_chunks():
+                        writer.write_bytes(data)
+                else:
+                    for chunk in document.chunks():
+                        writer.write(chunk)
+            return writer.written
+        except (UnicodeError, LookupError) as e:
+            raise FileEncodingError(filename, f"Не удалось сохранить файл: {str(e)}") from e
+        except OSError as e:
+            raise FileWriteError(filename, f"Не удалось сохранить файл: {str(e)}") from e
 
-        # Кнопка "Открыть"
-        open_button: tk.Button = tk.Button(
-            self.root, text="Открыть", width=15, font=("Arial", 14), command=self.open_file
-        )
-        open_button.grid(row=0, column=1, padx=10, pady=10)
+    def transform_file(
+        self,
+        filename: str,
+        encoding: str = "utf-8",
+        target_encoding: Optional[str] = None,
+        newline: Optional[str] = None,
+    ) -> Tuple[int, int, bool]:
+        """
+        Перекодирует файл и приводит переводы строк к одному виду. Файл перезаписывается атомарно
+        и только если его содержимое меняется.
 
-        # Кнопка "Сохранить"
-        save_button: tk.Button = tk.Button(
-            self.root, text="Сохранить", width=15, font=("Arial", 14), command=self.save_file
-        )
-        save_button.grid(row=0, column=2, padx=10, pady=10)
+        :param filename: Путь к файлу.
+        :param encoding: Кодировка файла.
+        :param target_encoding: Новая кодировка (None - прежняя).
+        :param newline: Новый перевод строки (None - переводы строк не меняются).
+        :return: Кортеж (прочитано байт, записано байт, был ли файл перезаписан).
+        :raises FileManagerError: Файл не удалось прочитать, перекодировать или записать.
+        """
 
-        # Фрейм для текстового поля и полосы прокрутки
-        frame: tk.Frame = tk.Frame(self.root)
-        frame.grid(row=1, column=0, columnspan=3, padx=10, pady=10)
+        try:
+            size = os.stat(filename).st_size
+        except FileNotFoundError as e:
+            raise FileMissingError(filename, f"Файл {filename} не найден!") from e
+        except OSError as e:
+            raise FileReadError(filename, f"Не удалось открыть файл: {str(e)}") from e
+        text = self.read_text(filename, encoding, newline="")
+        result = text
+        if newline is not None and "\r" in result:
+            result = result.replace("\r\n", "\n").replace("\r", "\n")
+        if newline is not None and newline != "\n":
+            result = result.replace("\n", newline)
+        target_encoding = target_encoding or encoding
+        if result == text and codecs.lookup(target_encoding) == codecs.lookup(encoding):
+            return size, 0, False
+        return size, self.write_text(filename, result, target_encoding, newline=""), True
 
-        # Многострочное текстовое поле
-        self.text_field: tk.Text = tk.Text(frame, width=60, height=15, font=("Arial", 14))
-        self.text_field.grid(row=0, column=0, padx=5, pady=5)
+    def process_files(
+        self,
+        filenames: Iterable[str],
+        workers: int = BATCH_WORKERS,
+        encoding: str = "utf-8",
+        target_encoding: Optional[str] = None,
+        newline: Optional[str] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Обрабатывает файлы (см. transform_file) в пуле из workers потоков. Одновременно в работе
+        не больше 2 * workers файлов, поэтому список файлов может быть сколь угодно длинным
+        и читается лениво. Ошибки отдельных файлов не прерывают обработку.
 
-        # Полоса прокрутки для текстового поля
-        scrollbar: tk.Scrollbar = tk.Scrollbar(frame, command=self.text_field.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns", pady=5)
+        :param filenames: Пути к файлам.
+        :param workers: Количество потоков.
+        :param encoding: Кодировка файлов.
+        :param target_encoding: Новая кодировка (None - прежняя).
+        :param newline: Новый перевод строки (None - переводы строк не меняются).
+        :return: Итератор итогов в порядке завершения обработки.
+        """
 
-        # Связываем текстовое поле с полосой прокрутки
-        self.text_field.config(yscrollcommand=scrollbar.set)
+        codecs.lookup(encoding)
+        if target_encoding is not None:
+            codecs.lookup(target_encoding)
 
-    def open_file(self) -> None:
+        def process(filename: str) -> BatchResult:
+            start = time.perf_counter()
+            try:
+                read, written, changed = self.transform_file(filename, encoding, target_encoding, newline)
+            except FileManagerError as e:
+                return BatchResult(filename, e, time.perf_counter() - start, 0, 0, False)
+            return BatchResult(filename, None, time.perf_counter() - start, read, written, changed)
+
+        workers = max(1, workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: Set["futures.Future[BatchResult]"] = set()
+            for filename in filenames:
+                pending.add(executor.submit(process, filename))
+                if len(pending) >= 2 * workers:
+                    done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def patch_file(self, filename: str, start: int, end: int, data: bytes) -> None:
         """
-        Получает из поля ввода имя файла, открывает его с помощью FileManager,
-        и, в случае успеха, загружает содержимое в текстовое поле.
+        Заменяет байты [start, end) файла на data, не переписывая файл целиком.
+        Правка той же длины записывается на место, иначе сдвигается только хвост файла после end.
+        Ошибки не перехватываются.
+
+        :param filename: Путь к файлу.
+        :param start: Начало заменяемого участка.
+        :param end: Конец заменяемого участка.
+        :param data: Новые байты участка.
         """
 
-        filename = self.filename_entry.get()
-        content = self.file_manager.open_file(filename)
-        if content is not None:
-            self.text_field.delete(1.0, tk.END)
-            self.text_field.insert(tk.END, content)
+        try:
+            with open(filename, "r+b") as file:
+                size = os.fstat(file.fileno()).st_size
+                if not 0 <= start <= end <= size:
+                    raise ValueError(f"Участок {start}-{end} выходит за пределы файла размером {size}")
+                shift = len(data) - (end - start)
+                # При удлинении хвост сдвигается до записи правки, при укорочении - после
+                if shift > 0:
+                    self._move_tail(file, end, end + shift, size)
+                file.seek(start)
+                file.write(data)
+                if shift < 0:
+                    self._move_tail(file, end, end + shift, size)
+                    file.truncate(size + shift)
+                file.flush()
+                os.fsync(file.fileno())
+        finally:
+            # Правка той же длины в пределах одного тика часов файловой системы не меняет ключ записи кэша
+            if self.cache is not None:
+                self.cache.discard(filename)
 
-    def save_file(self) -> None:
+    @staticmethod
+    def _move_tail(file: BinaryIO, source: int, target: int, size: int) -> None:
         """
-        Получает из поля ввода имя файла и сохраняет в него текущее содержимое
-        многострочного текстового поля (self.text_field) с помощью FileManager.
+        Переносит байты [source, size) файла на позицию target блоками по OPEN_CHUNK_SIZE.
+        Порядок копирования выбирается так, чтобы ещё не перенесённые байты не затирались.
         """
 
-        filename = self.filename_entry.get()
-        content = self.text_field.get(1.0, tk.END)
-        self.file_manager.save_file(filename, content)
+        if target > source:
+            pos = size
+            while pos > source:
+                length = min(OPEN_CHUNK_SIZE, pos - source)
+                pos -= length
+                file.seek(pos)
+                block = file.read(length)
+                file.seek(pos + target - source)
+                file.write(block)
+        else:
+            pos = source
+            while pos < size:
+                file.seek(pos)
+                block = file.read(min(OPEN_CHUNK_SIZE, size - pos))
+                file.seek(pos + target - source)
+                file.write(block)
+                pos += len(block)
 
 
-def main() -> None:
+class TextIndex:
     """
-    Основная функция, создаёт главное окно, инициализирует FileManager и FileEditorApp,
-    а затем запускает главный цикл обработки событий Tkinter.
+    Постепенно строящийся индекс строк байтового содержимого документа в UTF-8.
+    Индекс разреженный: хранится смещение каждой LINE_INDEX_STRIDE-й строки, поэтому переход
+    к проиндексированной строке требует не больше LINE_INDEX_STRIDE поисков перевода строки,
+    а память индекса в LINE_INDEX_STRIDE раз меньше, чем при хранении всех смещений.
     """
 
+    def __init__(self, data: Any) -> None:
+        """
+        Создаёт пустой индекс. Содержимое не просматривается.
+
+        :param data: Байты документа: bytes или mmap.
+        """
+
+        self._data = data
+        self.size = len(data)
+        # Смещения начала строк с номерами 0, LINE_INDEX_STRIDE, 2 * LINE_INDEX_STRIDE, ...
+        self._checkpoints = array("Q", [0])
+        # Количество найденных переводов строки, начало строки после последнего из них
+        # и позиция, до которой документ просмотрен
+        self._newlines = 0
+        self._tail = 0
+        self.scanned = 0
+
+    @property
+    def complete(self) -> bool:
+        """
+        Построен ли индекс по всему документу.
+        """
+
+        return self.scanned >= self.size
+
+    @property
+    def indexed_lines(self) -> int:
+        """
+        Количество строк, начало которых уже известно индексу.
+        """
+
+        # После завершающего перевода строки (и в пустом документе) строки нет
+        return self._newlines if self.complete and self._tail == self.size else self._newlines + 1
+
+    @property
+    def line_count(self) -> int:
+        """
+        Количество строк документа: точное после полного индексирования, иначе оценка
+        по средней длине уже просмотренных строк.
+        """
+
+        if self.complete:
+            return self.indexed_lines
+        if not self._newlines:
+            return 1
+        return max(self.indexed_lines, self._newlines * self.size // self.scanned)
+
+    def index_step(self, max_bytes: int = INDEX_STEP_BYTES) -> bool:
+        """
+        Продолжает индексирование ещё на max_bytes байт.
+
+        :param max_bytes: Сколько байт документа просмотреть.
+        :return: True, если индекс построен полностью.
+        """
+
+        start, end = self.scanned, min(self.size, self.scanned + max_bytes)
+        if start >= end:
+            return True
+        stride = LINE_INDEX_STRIDE
+        if np is not None:
+            block = np.frombuffer(self._data, dtype=np.uint8, count=end - start, offset=start)
+            positions = np.flatnonzero(block == 10)
+            del block
+            # Номер строки, начинающейся после j-го перевода строки блока: self._newlines + j + 1
+            first = -(self._newlines + 1) % stride
+            self._checkpoints.extend((positions[first::stride] + (start + 1)).tolist())
+            self._newlines += len(positions)
+            if len(positions):
+                self._tail = int(positions[-1]) + start + 1
+        else:
+            find = self._data.find
+            pos = find(b"\n", start, end)
+            while pos >= 0:
+                self._newlines += 1
+                if self._newlines % stride == 0:
+                    self._checkpoints.append(pos + 1)
+                self._tail = pos + 1
+                pos = find(b"\n", pos + 1, end)
+        self.scanned = end
+        return self.complete
+
+    def ensure_lines(self, count: int) -> None:
+        """
+        Индексирует документ, пока не станут известны начала первых count строк (или до его конца).
+
+        :param count: Требуемое количество строк.
+        """
+
+        # Шаг растёт вдвое, чтобы ближние строки находились без просмотра лишних мегабайт
+        step = 64 * 1024
+        while not self.complete and self._newlines + 1 < count:
+            self.index_step(step)
+            step = min(step * 2, INDEX_STEP_BYTES)
+
+    def line_start(self, number: int) -> int:
+        """
+        Смещение начала строки number (с нуля). Строка должна быть уже проиндексирована.
+
+        :param number: Номер строки.
+        :return: Смещение в байтах.
+        """
+
+        if number > self._newlines:
+            raise IndexError(f"Строка {number} ещё не проиндексирована")
+        checkpoint, skip = divmod(number, LINE_INDEX_STRIDE)
+        pos = self._checkpoints[checkpoint]
+        for _ in range(skip):
+            pos = self._data.find(b"\n", pos) + 1
+        return pos
+
+    def lines(self, start: int, count: int) -> List[str]:
+        """
+        Возвращает count строк, начиная со строки start (меньше - у конца документа).
+        Недостающая часть индекса достраивается. Декодируются только запрошенные строки.
+
+        :param start: Номер первой строки.
+        :param count: Количество строк.
+        :return: Строки без символов перевода строки.
+        """
+
+        self.ensure_lines(start + count)
+        result: List[str] = []
+        if start >= self.indexed_lines:
+            return result
+        pos = self.line_start(start)
+        while len(result) < count and pos < self.size:
+            end = self._data.find(b"\n", pos)
+            if end < 0:
+                end = self.size
+            result.append(self._data[pos:end].decode("utf-8", errors="replace").rstrip("\r"))
+            pos = end + 1
+        return result
+
+    def line_offset(self, number: int) -> int:
+        """
+        Смещение начала строки number; для строк за концом документа - его размер.
+        Недостающая часть индекса достраивается.
+
+        :param number: Номер строки (с нуля).
+        :return: Смещение в байтах.
+        """
+
+        self.ensure_lines(number + 1)
+        return self.line_start(number) if number <= self._newlines else self.size
+
+    def contains(self, pattern: bytes) -> bool:
+        """
+        Проверяет, встречается ли pattern в документе.
+        """
+
+        return self._data.find(pattern) >= 0
+
+    def ensure_offset(self, offset: int) -> None:
+        """
+        Индексирует документ, пока не будут просмотрены все переводы строки до смещения offset.
+
+        :param offset: Смещение в байтах.
+        """
+
+        step = 64 * 1024
+        while not self.complete and self.scanned < offset:
+            self.index_step(step)
+            step = min(step * 2, INDEX_STEP_BYTES)
+
+    def position_of(self, offset: int) -> Tuple[int, int]:
+        """
+        Переводит смещение в байтах в позицию (номер строки с нуля, номер символа в строке),
+        как её понимает текстовое поле. Недостающая часть индекса достраивается.
+
+        :param offset: Смещение начала символа в байтах.
+        :return: Кортеж (строка, символ).
+        """
+
+        self.ensure_offset(offset)
+        checkpoint = bisect.bisect_right(self._checkpoints, offset) - 1
+        line, start = checkpoint * LINE_INDEX_STRIDE, self._checkpoints[checkpoint]
+        newline = self._data.find(b"\n", start, offset)
+        while newline >= 0:
+            line, start = line + 1, newline + 1
+            newline = self._data.find(b"\n", start, offset)
+        return line, len(self._data[start:offset].decode("utf-8", errors="replace"))
+
+    def find(self, pattern: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Ищет pattern в документе между смещениями start и end.
+
+        :return: Смещение начала вхождения или -1.
+        """
+
+        return self._data.find(pattern, start, self.size if end is None else end)
+
+    def text(self, start: int, end: int) -> str:
+        """
+        Декодирует участок документа между смещениями start и end.
+        """
+
+        return self._data[start:end].decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        """
+        Освобождает содержимое документа. Для байтов в памяти ничего не делает.
+        """
+
+
+class MappedTextFile(TextIndex):
+    """
+    Файл, отображённый в память только для чтения, с постепенно строящимся индексом строк (см. TextIndex).
+    """
+
+    def __init__(self, filename: str) -> None:
+        """
+        Открывает файл и отображает его в память. Содержимое не читается.
+
+        :param filename: Путь к файлу.
+        """
+
+        self.filename = filename
+        self._file = open(filename, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # Пустой файл нельзя отобразить в память
+        super().__init__(mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+
+    def remap(self, valid_until: int) -> None:
+        """
+        Заново отображает файл после его изменения на месте. Индекс строк сохраняется
+        только для части файла до смещения valid_until, остальное будет проиндексировано заново.
+
+        :param valid_until: Смещение, до которого содержимое файла не менялось.
+        """
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        keep = max(bisect.bisect_right(self._checkpoints, min(valid_until, self.size)), 1)
+        del self._checkpoints[keep:]
+        self._newlines = (keep - 1) * LINE_INDEX_STRIDE
+        self._tail = self.scanned = self._checkpoints[-1]
+
+    def close(self) -> None:
+        """
+        Закрывает отображение и файл.
+        """
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedTextFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class SearchMatch(NamedTuple):
+    """
+    Совпадение поиска: позиции начала и конца в виде (номер строки с нуля, номер символа в строке).
+    """
+
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+
+
+class TextSearcher:
+    """
+    Поиск подстроки или регулярного выражения в документе блоками по SEARCH_CHUNK_BYTES байт,
+    выровненными по переводам строки, чтобы поиск можно было выполнять в фоновом потоке
+    и прерывать между блоками. Подстрока сначала ищется прямо в байтах UTF-8 (в том числе
+    в отображённом в память файле), и блоки без неё не декодируются; номер первой строки
+    блока берётся из индекса строк (см. TextIndex.position_of). Совпадения регулярного
+    выражения не переходят через границу блока.
+    """
+
+    def __init__(self, index: TextIndex, pattern: str, regex: bool = False) -> None:
+        """
+        Подготавливает поиск. Некорректное регулярное выражение вызывает re.error сразу,
+        а не в фоновом потоке.
+
+        :param index: Документ с индексом строк; поиск становится его владельцем (см. close).
+        :param pattern: Искомая подстрока или регулярное выражение.
+        :param regex: Является ли pattern регулярным выражением.
+        """
+
+        self.index = index
+        self._compiled = self.compile_pattern(pattern, regex)
+        # Подстрока с переводом строки может не совпасть с байтами файла с переводами "\r\n",
+        # поэтому предварительная проверка по байтам выполняется только для подстрок без них
+        needle = pattern.encode("utf-8")
+        self._needle = None if regex or b"\n" in needle or b"\r" in needle else needle
+        # Количество строк, на которые совпадение подстроки может продолжаться за границей блока
+        self._spill = 0 if regex else pattern.count("\n")
+
+    @staticmethod
+    def compile_pattern(pattern: str, regex: bool = False) -> "re.Pattern[str]":
+        """
+        Компилирует образец поиска.
+
+        :param pattern: Искомая подстрока или регулярное выражение.
+        :param regex: Является ли pattern регулярным выражением.
+        :return: Скомпилированное выражение.
+        :raises ValueError: Образец пуст.
+        :raises re.error: Некорректное регулярное выражение.
+        """
+
+        if not pattern:
+            raise ValueError("Пустой образец поиска")
+        return re.compile(pattern if regex else re.escape(pattern), re.MULTILINE)
+
+    def batches(self, chunk_bytes: int = SEARCH_CHUNK_BYTES) -> Iterator[Tuple[List[SearchMatch], int]]:
+        """
+        Ищет непересекающиеся совпадения от начала документа. Пустые совпадения пропускаются.
+
+        :param chunk_bytes: Объём документа, просматриваемый за один шаг.
+        :return: Итератор пар (совпадения очередного блока, просмотрено байт).
+        """
+
+        index = self.index
+        pos = 0
+        while pos < index.size:
+            end = spill_end = self._line_end(pos + chunk_bytes)
+            for _ in range(self._spill):
+                spill_end = self._line_end(spill_end)
+            matches: List[SearchMatch] = []
+            if self._needle is None or index.find(self._needle, pos, spill_end) >= 0:
+                matches = self._match_block(pos, end, spill_end)
+            pos = end
+            yield matches, pos
+
+    def _line_end(self, offset: int) -> int:
+        """
+        Смещение после ближайшего перевода строки не раньше offset или конец документа.
+        """
+
+        end = self.index.find(b"\n", offset) if offset < self.index.size else -1
+        return self.index.size if end < 0 else end + 1
+
+    @staticmethod
+    def _decode(index: TextIndex, start: int, end: int) -> str:
+        """
+        Декодирует участок документа, приводя переводы строк к "\n", как при загрузке в текстовое поле.
+        """
+
+        text = index.text(start, end)
+        return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+    def _match_block(self, start: int, end: int, spill_end: int) -> List[SearchMatch]:
+        """
+        Ищет совпадения, начинающиеся в блоке документа от start до end; участок до spill_end
+        нужен для совпадений, продолжающихся за границей блока.
+        """
+
+        text = self._decode(self.index, start, end)
+        limit = len(text)
+        if spill_end > end:
+            text += self._decode(self.index, end, spill_end)
+        line = self.index.position_of(start)[0]
+        matches: List[SearchMatch] = []
+        last = 0
+        for match in self._compiled.finditer(text):
+            if match.start() >= limit:
+                break
+            if match.start() == match.end():
+                continue
+            positions = []
+            for offset in match.span():
+                line += text.count("\n", last, offset)
+                last = offset
+                positions.append((line, offset - text.rfind("\n", 0, offset) - 1))
+            matches.append(SearchMatch(positions[0], positions[1]))
+        return matches
+
+    def close(self) -> None:
+        """
+        Освобождает документ, по которому выполнялся поиск.
+        """
+
+        self.index.close()
+
+
+class SearchResults:
+    """
+    Совпадения одного запроса поиска в порядке следования, пополняемые по мере фонового поиска.
+    По списку начал совпадений следующее совпадение находится двоичным поиском,
+    поэтому повторные переходы не требуют нового просмотра документа.
+    """
+
+    def __init__(self, pattern: str, regex: bool, size: int = 0) -> None:
+        """
+        :param pattern: Искомая подстрока или регулярное выражение.
+        :param regex: Является ли pattern регулярным выражением.
+        :param size: Размер документа в байтах (для хода поиска).
+        """
+
+        self.pattern = pattern
+        self.regex = regex
+        self.size = size
+        self.matches: List[SearchMatch] = []
+        self.starts: List[Tuple[int, int]] = []
+        self.scanned = 0
+        self.complete = False
+
+    def add(self, matches: List[SearchMatch], scanned: int) -> None:
+        """
+        Добавляет совпадения очередного блока.
+
+        :param matches: Совпадения в порядке следования.
+        :param scanned: Сколько байт документа просмотрено.
+        """
+
+        self.matches.extend(matches)
+        self.starts.extend(match.start for match in matches)
+        self.scanned = scanned
+
+    def next_after(self, position: Tuple[int, int]) -> Optional[SearchMatch]:
+        """
+        Первое совпадение, начинающееся не раньше position; после последнего - снова первое.
+
+        :param position: Позиция (строка, символ).
+        :return: Совпадение или None, если его нет или оно ещё не найдено.
+        """
+
+        idx = bisect.bisect_left(self.starts, position)
+        if idx < len(self.matches):
+            return self.matches[idx]
+        return self.matches[0] if self.complete and self.matches else None
+
+    def in_lines(self, first: int, last: int) -> List[SearchMatch]:
+        """
+        Совпадения, начинающиеся в строках с first по last - 1.
+        """
+
+        return self.matches[bisect.bisect_left(self.starts, (first, 0)) : bisect.bisect_left(self.starts, (last, 0))]
+
+
+class FollowUpdate(NamedTuple):
+    """
+    Итог проверки отслеживаемого файла: дописанный текст, был ли файл усечён (текст тогда
+    читается с начала файла) и остались ли непрочитанные данные.
+    """
+
+    text: str
+    reset: bool
+    more: bool
+
+
+class FileFollower:
+    """
+    Слежение за дописыванием в файл, как tail -F. Каждая проверка - это stat пути к файлу;
+    читаются только новые байты из постоянно открытого файла. Многобайтовые символы
+    и переводы строк "\\r\\n" на границах дописанных участков обрабатываются инкрементальным
+    декодером. Если файл усечён, он читается заново с начала. Если файл переименован при ротации
+    и по прежнему пути создан новый, сначала дочитывается старый файл, затем с начала читается новый.
+    """
+
+    def __init__(self, filename: str, encoding: str = "utf-8", lines: Optional[int] = None) -> None:
+        """
+        Открывает файл.
+
+        :param filename: Путь к файлу.
+        :param encoding: Кодировка файла.
+        :param lines: Сколько последних строк файла прочитать первой проверкой (None - весь файл).
+        """
+
+        self.filename = filename
+        self.encoding = encoding
+        self._open(lines)
+
+    def _open(self, lines: Optional[int] = None) -> None:
+        """
+        Открывает файл по пути self.filename и переходит к началу его последних lines строк.
+        """
+
+        self._file = open(self.filename, "rb")
+        st = os.fstat(self._file.fileno())
+        self._identity = (st.st_dev, st.st_ino)
+        self.position = 0 if lines is None else self._tail_offset(st.st_size, lines)
+        self._file.seek(self.position)
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def _tail_offset(self, size: int, lines: int) -> int:
+        """
+        Смещение начала последних lines строк файла размером size. Файл читается блоками с конца;
+        завершающий перевод строки не начинает новую строку.
+        """
+
+        if lines <= 0:
+            return size
+        count = 0
+        pos = size
+        while pos > 0:
+            start = max(0, pos - OPEN_CHUNK_SIZE)
+            self._file.seek(start)
+            block = self._file.read(pos - start)
+            end = len(block) - 1 if pos == size and block.endswith(b"\n") else len(block)
+            newline = block.rfind(b"\n", 0, end)
+            while newline >= 0:
+                count += 1
+                if count == lines:
+                    return start + newline + 1
+                newline = block.rfind(b"\n", 0, newline)
+            pos = start
+        return 0
+
+    def _read(self, size: int, limit: int) -> str:
+        """
+        Читает и декодирует не больше limit байт, дописанных до размера size.
+        """
+
+        length = min(limit, size - self.position)
+        if length <= 0:
+            return ""
+        data = self._file.read(length)
+        self.position += len(data)
+        return self._decoder.decode(data)
+
+    def poll(self, limit: int = FOLLOW_READ_LIMIT) -> FollowUpdate:
+        """
+        Проверяет файл и читает дописанные с прошлой проверки данные, не больше limit байт.
+        Если файл не менялся, выполняется только stat.
+
+        :param limit: Наибольший объём читаемых данных.
+        :return: Дописанный текст и состояние файла.
+        """
+
+        try:
+            st = os.stat(self.filename)
+            identity: Optional[Tuple[int, int]] = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            # После ротации новый файл ещё не создан - дочитываем старый
+            identity = None
+        size = st.st_size if identity == self._identity else os.fstat(self._file.fileno()).st_size
+
+        reset = False
+        if size < self.position:
+            # Файл усечён (например, при ротации с copytruncate)
+            self._file.seek(0)
+            self.position = 0
+            self._decoder.reset()
+            reset = True
+        text = self._read(size, limit)
+        if self.position < size:
+            return FollowUpdate(text, reset, True)
+
+        if identity is not None and identity != self._identity:
+            # Старый файл дочитан, по прежнему пути уже другой файл
+            text += self._decoder.decode(b"", final=True)
+            old = self._file
+            try:
+                self._open()
+            except FileNotFoundError:
+                return FollowUpdate(text, reset, False)
+            old.close()
+            return FollowUpdate(text, reset, True)
+        return FollowUpdate(text, reset, False)
+
+    def close(self) -> None:
+        """
+        Закрывает файл.
+        """
+
+        self._file.close()
+
+    def __enter__(self) -> "FileFollower":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class DirtyLines:
+    """
+    Непрерывный диапазон изменённых строк документа относительно последней сохранённой версии.
+    Строки [start, end) текущего документа заменяют строки [start, base_end) сохранённого файла;
+    строки до start не менялись, строки после диапазона только сдвинулись на delta.
+    """
+
+    __slots__ = ("start", "end", "delta", "invalid")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Отмечает документ как совпадающий с сохранённой версией.
+        """
+
+        self.start: Optional[int] = None
+        self.end = 0
+        self.delta = 0
+        # Изменение, которое нельзя описать диапазоном строк: следующее сохранение будет полным
+        self.invalid = False
+
+    def __bool__(self) -> bool:
+        return self.start is not None or self.invalid
+
+    @property
+    def base_end(self) -> int:
+        """
+        Конец диапазона в строках сохранённого файла.
+        """
+
+        return self.end - self.delta
+
+    def record(self, first: int, removed: int, added: int) -> None:
+        """
+        Учитывает правку: строки [first, first + removed) документа заменены на added строк.
+        Диапазон расширяется так, чтобы покрывать все правки с момента сохранения.
+
+        :param first: Первая затронутая строка (с нуля, в координатах до правки).
+        :param removed: Количество затронутых строк до правки.
+        :param added: Количество строк на их месте после правки.
+        """
+
+        if self.start is None:
+            self.start, self.end = first, first + added
+        else:
+            end = max(self.end, first + removed)
+            self.start = min(self.start, first)
+            self.end = end + added - removed
+        self.delta += added - removed
+
+
+class FilePatch(NamedTuple):
+    """
+    Частичное сохранение: байты [start, end) файла заменяются на data.
+    """
+
+    start: int
+    end: int
+    data: bytes
+
+
+class EditRecord(NamedTuple):
+    """
+    Правка для отмены и повтора: снимки документа до и после неё и заменённый участок -
+    removed символов с позиции start заменены на added символов. Снимки разделяют
+    фрагменты с текущим документом, поэтому запись не копирует текст.
+    """
+
+    before: PieceTable
+    after: PieceTable
+    start: int
+    removed: int
+    added: int
+
+
+class SaveResult(NamedTuple):
+    """
+    Итог фонового сохранения.
+    """
+
+    filename: str
+    error: Optional[Exception]
+    elapsed: float
+
+
+class SaveQueue:
+    """
+    Очередь фоновых сохранений с одним рабочим потоком. Пока идёт запись, новые запросы
+    не ставятся в очередь друг за другом, а заменяют единственное отложенное сохранение:
+    после окончания текущей записи выполняется только самое последнее из них.
+    Итоги забираются из главного потока методом results().
+    """
+
+    def __init__(self, write: Callable[[str, Any], None], discard: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        :param write: Функция записи (имя файла, содержимое), выполняется в рабочем потоке.
+        :param discard: Функция, освобождающая содержимое вытесненного отложенного сохранения.
+        """
+
+        self._write = write
+        self._discard = discard
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Condition()
+        self._running = False
+        self._pending: Optional[Tuple[str, Any]] = None
+        self._results: "queue.Queue[SaveResult]" = queue.Queue()
+
+    @property
+    def busy(self) -> bool:
+        """
+        Выполняется ли сейчас запись или ожидает ли отложенное сохранение.
+        """
+
+        with self._lock:
+            return self._running or self._pending is not None
+
+    def submit(self, filename: str, content: Any) -> bool:
+        """
+        Запрашивает сохранение.
+
+        :param filename: Путь к файлу.
+        :param content: Содержимое для функции записи.
+        :return: True, если запись начата сразу; False, если она отложена до окончания текущей.
+        """
+
+        with self._lock:
+            deferred = self._running
+            replaced, self._pending = (self._pending, (filename, content)) if deferred else (None, None)
+            self._running = True
+        if deferred:
+            # Вытесненное отложенное сохранение уже не будет выполнено
+            if replaced is not None and self._discard is not None:
+                self._discard(replaced[1])
+            return False
+        self._executor.submit(self._run, filename, content)
+        return True
+
+    def _run(self, filename: str, content: Any) -> None:
+        """
+        Выполняет записи в рабочем потоке, пока есть отложенные сохранения.
+        """
+
+        while True:
+            started = time.perf_counter()
+            try:
+                self._write(filename, content)
+                error: Optional[Exception] = None
+            except Exception as e:
+                error = e
+            self._results.put(SaveResult(filename, error, time.perf_counter() - started))
+            with self._lock:
+                if self._pending is None:
+                    self._running = False
+                    self._lock.notify_all()
+                    return
+                (filename, content), self._pending = self._pending, None
+
+    def results(self) -> List[SaveResult]:
+        """
+        Возвращает итоги завершённых с прошлого вызова сохранений.
+        """
+
+        finished: List[SaveResult] = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def wait(self) -> None:
+        """
+        Ожидает завершения всех запрошенных сохранений.
+        """
+
+        with self._lock:
+            self._lock.wait_for(lambda: not self._running)
+
+
+class FileEditorApp:
+    """
+    Класс для создания интерфейса простого текстового редактора, который
+    позволяет открывать и сохранять файлы.
+    """
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        file_manager: FileManager,
+        follow_interval: int = FOLLOW_POLL_MS,
+        follow_max_lines: Optional[int] = None,
+    ) -> None:
+        """
+        Инициализирует приложение, создавая необходимые виджеты и
+        связывая их с методами класса FileEditorApp.
+
+        :param root: Главное окно приложения, экземпляр tk.Tk.
+        :param file_manager: Экземпляр класса FileManager.
+        :param follow_interval: Период проверки файла в режиме слежения, мс.
+        :param follow_max_lines: Сколько последних строк хранить в режиме слежения (None - все).
+        """
+
+        self.root: tk.Tk = root
+        self.file_manager: FileManager = file_manager
+        # Номер поколения загрузки: блоки отменённых и устаревших загрузок отбрасываются
+        self._generation = 0
+        # Один фоновый поток для чтения файлов
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Фоновые сохранения: повторные запросы во время записи схлопываются в одно.
+        # Содержимое сохранения - снимок документа или FilePatch
+        self.save_queue = SaveQueue(self._write_save)
+        # Модель документа: повторяет все правки текстового поля (см. _text_proxy),
+        # и история правок для отмены и повтора
+        self.document = PieceTable()
+        self._undo_stack: "deque[EditRecord]" = deque(maxlen=UNDO_LIMIT)
+        self._redo_stack: List[EditRecord] = []
+        # Изменённые строки с момента загрузки или сохранения и файл, с которым совпадала
+        # сохранённая версия документа (None - следующее сохранение будет полным)
+        self.dirty = DirtyLines()
+        self._synced_file: Optional[str] = None
+        # Отображение сохранённого файла для перевода номеров строк в смещения
+        # и смещение, после которого его индекс нужно обновить
+        self._baseline: Optional[MappedTextFile] = None
+        self._baseline_valid_until: Optional[int] = None
+        # Файл, открытый в режиме просмотра, и номер первой видимой строки
+        self.viewer: Optional[MappedTextFile] = None
+        self.viewer_top = 0
+        # Фоновый поиск: отдельный поток, чтобы поиск не задерживал загрузку файлов,
+        # номер поколения поиска, текущие результаты и результаты недавних запросов,
+        # действительные, пока документ не изменился
+        self._search_executor = ThreadPoolExecutor(max_workers=1)
+        self._search_generation = 0
+        self.search_results: Optional[SearchResults] = None
+        self._search_cache: "OrderedDict[Tuple[str, bool], SearchResults]" = OrderedDict()
+        # Количество подсвеченных совпадений, выбранное совпадение, позиция, от которой в режиме
+        # просмотра ищется следующее совпадение, и нужно ли перейти к совпадению, когда оно найдётся
+        self._highlighted = 0
+        self.current_match: Optional[SearchMatch] = None
+        self._viewer_cursor: Optional[Tuple[int, int]] = None
+        self._search_jump = False
+        # Режим слежения за дописыванием в файл
+        self.follow_interval = follow_interval
+        self.follow_max_lines = follow_max_lines
+        self.follower: Optional[FileFollower] = None
+        self.create_widgets()
+
+    def create_widgets(self) -> None:
+        """
+        Создаёт и располагает на форме все необходимые элементы интерфейса.
+        """
+
+        # Поле ввода имени файла
+        self.filename_entry: tk.Entry = tk.Entry(self.root, width=40, font=("Arial", 14))
+        self.filename_entry.grid(row=0, column=0, padx=10, pady=10)
+
+        # Кнопка "Открыть"
+        open_button: tk.Button = tk.Button(
+            self.root, text="Открыть", width=15, font=("Arial", 14), command=self.open_file
+        )
+        open_button.grid(row=0, column=1, padx=10, pady=10)
+
+        # Кнопка "Сохранить"
+        save_button: tk.Button = tk.Button(
+            self.root, text="Сохранить", width=15, font=("Arial", 14), command=self.save_file
+        )
+        save_button.grid(row=0, column=2, padx=10, pady=10)
+
+        # Фрейм для текстового поля и полосы прокрутки
+        frame: tk.Frame = tk.Frame(self.root)
+        frame.grid(row=1, column=0, columnspan=3, padx=10, pady=10)
+
+        # Многострочное текстовое поле
+        self.text_field: tk.Text = tk.Text(frame, width=60, height=15, font=("Arial", 14))
+        self.text_field.grid(row=0, column=0, padx=5, pady=5)
+
+        # Полоса прокрутки для текстового поля; в режиме просмотра она управляет окном строк файла
+        self.scrollbar: tk.Scrollbar = tk.Scrollbar(frame, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns", pady=5)
+
+        # Связываем текстовое поле с полосой прокрутки
+        self.text_field.config(yscrollcommand=self.scrollbar.set)
+
+        # Все правки текстового поля проходят через _text_proxy, который отмечает изменённые строки
+        widget = str(self.text_field)
+        self._text_command = widget + "_orig"
+        self.root.tk.call("rename", widget, self._text_command)
+        self.root.tk.createcommand(widget, self._text_proxy)
+
+        # Прокрутка колесом мыши и клавишами в режиме просмотра
+        self.text_field.bind("<MouseWheel>", lambda event: self.scroll_viewer(-event.delta // 120 * 3))
+        self.text_field.bind("<Button-4>", lambda event: self.scroll_viewer(-3))
+        self.text_field.bind("<Button-5>", lambda event: self.scroll_viewer(3))
+        self.text_field.bind("<Up>", lambda event: self.scroll_viewer(-1))
+        self.text_field.bind("<Down>", lambda event: self.scroll_viewer(1))
+        self.text_field.bind("<Prior>", lambda event: self.scroll_viewer(-self._viewer_height()))
+        self.text_field.bind("<Next>", lambda event: self.scroll_viewer(self._viewer_height()))
+
+        # Отмена и повтор правок по снимкам модели документа
+        self.text_field.bind("<Control-z>", lambda event: self.undo())
+        self.text_field.bind("<Control-y>", lambda event: self.redo())
+        self.text_field.bind("<Control-Z>", lambda event: self.redo())
+
+        # Строка состояния: ход загрузки и кнопка её отмены
+        self.status_label: tk.Label = tk.Label(self.root, text="", font=("Arial", 12), anchor="w")
+        self.status_label.grid(row=2, column=0, columnspan=2, padx=10, sticky="we")
+
+        self.cancel_button: tk.Button = tk.Button(
+            self.root, text="Отмена", width=15, font=("Arial", 12), state=tk.DISABLED, command=self.cancel_loading
+        )
+        self.cancel_button.grid(row=2, column=2, padx=10, pady=5)
+
+        # Переход к строке по номеру
+        self.line_entry: tk.Entry = tk.Entry(self.root, width=10, font=("Arial", 12))
+        self.line_entry.grid(row=3, column=1, padx=10, pady=5)
+        self.line_entry.bind("<Return>", lambda event: self.goto_line_entry())
+
+        goto_button: tk.Button = tk.Button(
+            self.root, text="К строке", width=15, font=("Arial", 12), command=self.goto_line_entry
+        )
+        goto_button.grid(row=3, column=2, padx=10, pady=5)
+
+        # Поиск и замена
+        self.search_entry: tk.Entry = tk.Entry(self.root, width=40, font=("Arial", 12))
+        self.search_entry.grid(row=4, column=0, padx=10, pady=5)
+        self.search_entry.bind("<Return>", lambda event: self.find_next())
+
+        find_button: tk.Button = tk.Button(self.root, text="Найти", width=15, font=("Arial", 12), command=self.find)
+        find_button.grid(row=4, column=1, padx=10, pady=5)
+
+        next_button: tk.Button = tk.Button(
+            self.root, text="Далее", width=15, font=("Arial", 12), command=self.find_next
+        )
+        next_button.grid(row=4, column=2, padx=10, pady=5)
+
+        self.replace_entry: tk.Entry = tk.Entry(self.root, width=40, font=("Arial", 12))
+        self.replace_entry.grid(row=5, column=0, padx=10, pady=5)
+
+        replace_button: tk.Button = tk.Button(
+            self.root, text="Заменить", width=15, font=("Arial", 12), command=self.replace_current
+        )
+        replace_button.grid(row=5, column=1, padx=10, pady=5)
+
+        replace_all_button: tk.Button = tk.Button(
+            self.root, text="Заменить все", width=15, font=("Arial", 12), command=self.replace_all
+        )
+        replace_all_button.grid(row=5, column=2, padx=10, pady=5)
+
+        self.regex_var: tk.BooleanVar = tk.BooleanVar(self.root, value=False)
+        regex_check: tk.Checkbutton = tk.Checkbutton(
+            self.root, text="Регулярное выражение", font=("Arial", 12), variable=self.regex_var
+        )
+        regex_check.grid(row=6, column=0, padx=10, pady=5, sticky="w")
+
+        # Слежение за дописыванием в файл
+        self.follow_var: tk.BooleanVar = tk.BooleanVar(self.root, value=False)
+        follow_check: tk.Checkbutton = tk.Checkbutton(
+            self.root,
+            text="Следить за файлом",
+            font=("Arial", 12),
+            variable=self.follow_var,
+            command=self.toggle_follow,
+        )
+        follow_check.grid(row=6, column=1, columnspan=2, padx=10, pady=5, sticky="w")
+
+        self.text_field.tag_configure(SEARCH_TAG, background="yellow")
+
+    def open_file(self) -> None:
+        """
+        Получает из поля ввода имя файла, читает его в модель документа (см. FileManager.read_document),
+        и, в случае успеха, загружает содержимое в текстовое поле. Модель ссылается на байты файла
+        без копирования, поле получает декодированный текст.
+        Большие файлы читаются в фоновом потоке и вставляются блоками (см. open_file_streaming),
+        а очень большие открываются только для просмотра через mmap (см. open_viewer).
+        """
+
+        filename = self.filename_entry.get()
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            size = 0
+        if size > VIEWER_THRESHOLD:
+            self.open_viewer(filename)
+            return
+        if size > STREAM_OPEN_THRESHOLD:
+            self.open_file_streaming(filename)
+            return
+
+        self.cancel_loading()
+        self.close_viewer()
+        try:
+            document = self.file_manager.read_document(filename)
+        except FileManagerError as e:
+            messagebox.showerror("Ошибка", str(e))
+            return
+        self.text_field.delete(1.0, tk.END)
+        self.text_field.insert(tk.END, document.text())
+        # Вставка повторена в модели как строка; её заменяет документ, ссылающийся на байты файла
+        self.document = document
+        self.reset_tracking(filename)
+
+    def open_file_streaming(self, filename: str) -> None:
+        """
+        Загружает файл без блокировки интерфейса: фоновый поток читает файл блоками, собирает
+        из них модель документа и передаёт текст блоков через ограниченную очередь, а главный
+        поток через root.after вставляет их в текстовое поле и показывает ход загрузки. В конце
+        модель, ссылающаяся на прочитанные байты, заменяет собранную из вставок. Пока идёт
+        загрузка, текстовое поле доступно только для чтения.
+
+        :param filename: Путь к файлу.
+        """
+
+        self.cancel_loading()
+        self.close_viewer()
+        generation = self._generation
+        chunks: "queue.Queue[Tuple[str, Any, int]]" = queue.Queue(LOAD_QUEUE_SIZE)
+        try:
+            total = os.path.getsize(filename)
+        except OSError:
+            total = 0
+
+        self.text_field.config(state=tk.NORMAL)
+        self.text_field.delete(1.0, tk.END)
+        self.text_field.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_label.config(text=f"Загрузка {filename}...")
+        self._executor.submit(self._read_in_background, filename, generation, chunks)
+        self.root.after(LOAD_POLL_MS, self._poll_loading, generation, chunks, filename, total)
+
+    def _read_in_background(self, filename: str, generation: int, chunks: "queue.Queue[Tuple[str, Any, int]]") -> None:
+        """
+        Читает файл блоками по OPEN_CHUNK_SIZE байт в фоновом потоке, передаёт текст каждого блока
+        и собирает из блоков модель документа (см. PieceTableBuilder), которую передаёт в конце.
+        Не обращается к виджетам; при заполненной очереди ждёт, пока главный поток заберёт блоки,
+        и прекращает чтение между блоками, если загрузка отменена.
+        """
+
+        def put(item: Tuple[str, Any, int]) -> bool:
+            while generation == self._generation:
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        builder = PieceTableBuilder()
+        try:
+            for text, done in self.file_manager.read_chunks(filename, builder=builder):
+                if not put(("data", text, done)):
+                    return
+            document = builder.document()
+        except Exception as e:
+            put(("error", e, 0))
+            return
+        put(("done", document, 0))
+
+    def _poll_loading(
+        self, generation: int, chunks: "queue.Queue[Tuple[str, Any, int]]", filename: str, total: int
+    ) -> None:
+        """
+        Вставляет в текстовое поле очередной прочитанный блок и обновляет строку состояния.
+        За один вызов вставляется не больше одного блока, чтобы интерфейс оставался отзывчивым.
+        """
+
+        if generation != self._generation:
+            return
+        try:
+            kind, payload, done = chunks.get_nowait()
+        except queue.Empty:
+            self.root.after(LOAD_POLL_MS, self._poll_loading, generation, chunks, filename, total)
+            return
+
+        if kind == "data":
+            self.text_field.config(state=tk.NORMAL)
+            self.text_field.insert(tk.END, payload)
+            self.text_field.config(state=tk.DISABLED)
+            percent = done * 100 // total if total else 100
+            self.status_label.config(text=f"Загрузка {filename}: {percent}% ({done // 1024} из {total // 1024} КБ)")
+            self.root.after(1, self._poll_loading, generation, chunks, filename, total)
+            return
+
+        self._finish_loading()
+        if kind == "error":
+            if isinstance(payload, FileNotFoundError):
+                messagebox.showerror("Ошибка", f"Файл {filename} не найден!")
+            else:
+                messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(payload)}")
+            self.status_label.config(text="")
+        else:
+            self.document = payload
+            self.status_label.config(text=f"Файл {filename} загружен")
+            self.reset_tracking(filename)
+
+    def _finish_loading(self) -> None:
+        """
+        Возвращает текстовое поле и кнопку отмены в обычное состояние.
+        """
+
+        self.text_field.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def _is_loading(self) -> bool:
+        """
+        Проверяет, идёт ли потоковая загрузка (кнопка отмены активна только во время неё).
+        """
+
+        return str(self.cancel_button.cget("state")) == tk.NORMAL
+
+    def cancel_loading(self) -> None:
+        """
+        Отменяет текущую потоковую загрузку: фоновое чтение прекращается,
+        уже вставленная часть файла остаётся в текстовом поле.
+        """
+
+        self._generation += 1
+        self.stop_follow()
+        if self._is_loading():
+            self._finish_loading()
+            self.reset_tracking(None)
+            self.status_label.config(text="Загрузка отменена")
+
+    def open_viewer(self, filename: str) -> None:
+        """
+        Открывает файл только для просмотра: файл отображается в память, в текстовом поле
+        показываются лишь видимые строки. Индекс строк достраивается по мере прокрутки
+        и понемногу в фоне через root.after, поэтому время открытия не зависит от размера файла.
+
+        :param filename: Путь к файлу.
+        """
+
+        self.cancel_loading()
+        self.close_viewer()
+        self._invalidate_search()
+        try:
+            self.viewer = MappedTextFile(filename)
+        except FileNotFoundError:
+            messagebox.showerror("Ошибка", f"Файл {filename} не найден!")
+            return
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+            return
+
+        self.viewer_top = 0
+        self.reset_tracking(None)
+        self.render_viewer()
+        self.root.after(LOAD_POLL_MS, self._index_viewer, self._generation)
+
+    def close_viewer(self) -> None:
+        """
+        Выходит из режима просмотра и освобождает отображение файла.
+        """
+
+        if self.viewer is None:
+            return
+        self.viewer.close()
+        self.viewer = None
+        self.text_field.config(state=tk.NORMAL)
+        self.text_field.delete(1.0, tk.END)
+
+    def _index_viewer(self, generation: int) -> None:
+        """
+        Шаг фонового индексирования строк открытого для просмотра файла.
+        """
+
+        if generation != self._generation or self.viewer is None:
+            return
+        if not self.viewer.index_step():
+            self.root.after(1, self._index_viewer, generation)
+        self._update_viewer_status()
+        self._update_viewer_scrollbar()
+
+    def _viewer_height(self) -> int:
+        """
+        Количество строк, помещающихся в текстовом поле.
+        """
+
+        return int(self.text_field.cget("height"))
+
+    def render_viewer(self) -> None:
+        """
+        Показывает в текстовом поле окно строк файла, начиная с self.viewer_top.
+        """
+
+        if self.viewer is None:
+            return
+        lines = self.viewer.lines(self.viewer_top, self._viewer_height())
+        self.text_field.config(state=tk.NORMAL)
+        self.text_field.delete(1.0, tk.END)
+        self.text_field.insert(tk.END, "\n".join(lines))
+        self.text_field.config(state=tk.DISABLED)
+        self._highlight_viewer()
+        self._update_viewer_status()
+        self._update_viewer_scrollbar()
+
+    def _update_viewer_status(self) -> None:
+        """
+        Показывает в строке состояния видимые строки и ход индексирования.
+        """
+
+        viewer = self.viewer
+        if viewer is None:
+            return
+        last = min(self.viewer_top + self._viewer_height(), viewer.line_count)
+        if viewer.complete:
+            total = str(viewer.line_count)
+        else:
+            total = f"~{viewer.line_count} (индексировано {viewer.scanned * 100 // viewer.size}%)"
+        self.status_label.config(text=f"Просмотр: строки {self.viewer_top + 1}-{last} из {total}")
+
+    def _update_viewer_scrollbar(self) -> None:
+        """
+        Синхронизирует ползунок с положением окна строк в файле.
+        """
+
+        if self.viewer is None:
+            return
+        total = max(self.viewer.line_count, 1)
+        top = self.viewer_top / total
+        self.scrollbar.set(top, min(1.0, top + self._viewer_height() / total))
+
+    def scroll_viewer(self, delta: int) -> Optional[str]:
+        """
+        Прокручивает окно просмотра на delta строк. Вне режима просмотра ничего не делает,
+        чтобы текстовое поле обработало событие само.
+
+        :param delta: Смещение в строках.
+        :return: "break" в режиме просмотра, чтобы отменить стандартную обработку события.
+        """
+
+        if self.viewer is None:
+            return None
+        self.goto_line(self.viewer_top + delta)
+        return "break"
+
+    def goto_line(self, number: int) -> None:
+        """
+        Показывает строку number (с нуля) первой в окне просмотра или переводит к ней курсор
+        в обычном режиме. Для проиндексированных строк переход не зависит от размера файла.
+
+        :param number: Номер строки.
+        """
+
+        if self.viewer is None:
+            self.text_field.see(f"{number + 1}.0")
+            self.text_field.mark_set(tk.INSERT, f"{number + 1}.0")
+            return
+
+        height = self._viewer_height()
+        self.viewer.ensure_lines(number + height)
+        top = min(max(number, 0), max(self.viewer.indexed_lines - height, 0))
+        if top != self.viewer_top:
+            self.viewer_top = top
+            self.render_viewer()
+
+    def goto_line_entry(self) -> None:
+        """
+        Переходит к строке, номер которой (с единицы) введён в поле перехода.
+        """
+
+        try:
+            number = int(self.line_entry.get())
+        except ValueError:
+            self.status_label.config(text="Некорректный номер строки")
+            return
+        self.goto_line(number - 1)
+
+    def yview(self, *args: str) -> None:
+        """
+        Обработчик полосы прокрутки: в режиме просмотра перемещает окно строк файла,
+        иначе прокручивает текстовое поле.
+        """
+
+        if self.viewer is None:
+            self.text_field.yview(*args)
+            return
+        if args[0] == "moveto":
+            self.goto_line(int(float(args[1]) * self.viewer.line_count))
+        elif args[0] == "scroll":
+            step = 1 if args[2] == "units" else self._viewer_height()
+            self.goto_line(self.viewer_top + int(args[1]) * step)
+
+    def _text_call(self, *args: Any) -> Any:
+        """
+        Вызывает исходную команду Tk текстового поля в обход отслеживания правок.
+        """
+
+        return self.root.tk.call((self._text_command,) + args)
+
+    def _line_of(self, index: str) -> int:
+        """
+        Номер строки (с нуля) для индекса текстового поля; индексы за концом текста
+        приводятся к последней строке, куда Tk и вставляет текст.
+        """
+
+        if self._text_call("compare", index, ">", "end-1c"):
+            index = "end-1c"
+        return int(str(self._text_call("index", index)).split(".")[0]) - 1
+
+    def _offset_of(self, index: Any) -> int:
+        """
+        Позиция в модели документа для индекса текстового поля; индексы за концом текста
+        приводятся к концу документа (последний перевод строки поля в документ не входит).
+        """
+
+        if self._text_call("compare", index, ">", "end-1c"):
+            index = "end-1c"
+        line, column = str(self._text_call("index", index)).split(".")
+        return self.document.offset_of(int(line) - 1, int(column))
+
+    def _text_proxy(self, *args: Any) -> Any:
+        """
+        Обёртка команды Tk текстового поля: перед вставкой, удалением и заменой текста
+        отмечает затронутые строки в self.dirty и сбрасывает результаты поиска,
+        затем выполняет исходную команду и повторяет правку в модели документа.
+        """
+
+        operation = str(args[0]) if args else ""
+        if operation not in ("insert", "delete", "replace") or str(self._text_call("cget", "-state")) != tk.NORMAL:
+            if operation == "edit" and len(args) > 1 and str(args[1]) in ("undo", "redo"):
+                self.dirty.invalid = True
+                self._invalidate_search()
+            return self._text_call(*args)
+
+        # Заменяемый участок документа: позиции начала и конца и новый текст (None - неизвестен)
+        edit: Tuple[int, int, Optional[str]]
+        if operation == "insert":
+            first = self._line_of(args[1])
+            added = sum(str(chars).count("\n") for chars in args[2::2])
+            self.dirty.record(first, 1, 1 + added)
+            position = self._offset_of(args[1])
+            edit = (position, position, "".join(str(chars) for chars in args[2::2]))
+        elif operation == "delete" and len(args) > 3:
+            # Удаление нескольких диапазонов одним вызовом не описывается одним диапазоном строк
+            self.dirty.invalid = True
+            edit = (0, len(self.document), None)
+        else:
+            first = self._line_of(args[1])
+            # Без второго индекса удаляется один символ, возможно, перевод строки
+            last = self._line_of(args[2] if len(args) > 2 else f"{args[1]}+1c")
+            added = sum(str(chars).count("\n") for chars in args[3::2]) if operation == "replace" else 0
+            self.dirty.record(first, last - first + 1, 1 + added)
+            start = self._offset_of(args[1])
+            end = self._offset_of(args[2]) if len(args) > 2 else start + 1
+            replacement = "".join(str(chars) for chars in args[3::2]) if operation == "replace" else ""
+            edit = (start, max(start, min(end, len(self.document))), replacement)
+        if self.viewer is None:
+            self._invalidate_search()
+
+        result = self._text_call(*args)
+        start, end, text = edit
+        self._record_edit(start, end, str(self._text_call("get", "1.0", "end-1c")) if text is None else text)
+        return result
+
+    def _record_edit(self, start: int, end: int, text: str) -> None:
+        """
+        Повторяет правку поля в модели документа. Правки пользователя попадают в историю;
+        загрузка файла, окно просмотра и дописывание в режиме слежения - нет.
+        """
+
+        if start == end and not text:
+            return
+        before = self.document
+        self.document = before.replace(start, end, text)
+        if self.viewer is None and self.follower is None and not self._is_loading():
+            self._undo_stack.append(EditRecord(before, self.document, start, end - start, len(text)))
+            self._redo_stack.clear()
+
+    def undo(self) -> str:
+        """
+        Отменяет последнюю правку: документ возвращается к снимку до неё, а в текстовом поле
+        заменяется только затронутый участок.
+
+        :return: "break", чтобы Tk не обрабатывал сочетание клавиш дальше.
+        """
+
+        if self._undo_stack and self._history_available():
+            record = self._undo_stack.pop()
+            self._restore(record.after, record.before, record.start, record.added, record.removed)
+            self._redo_stack.append(record)
+        return "break"
+
+    def redo(self) -> str:
+        """
+        Повторяет последнюю отменённую правку.
+
+        :return: "break", чтобы Tk не обрабатывал сочетание клавиш дальше.
+        """
+
+        if self._redo_stack and self._history_available():
+            record = self._redo_stack.pop()
+            self._restore(record.before, record.after, record.start, record.removed, record.added)
+            self._undo_stack.append(record)
+        return "break"
+
+    def _history_available(self) -> bool:
+        """
+        Проверяет, можно ли сейчас отменять правки: документ редактируется и не загружается.
+        """
+
+        if self.viewer is not None or self.follower is not None or self._is_loading():
+            return False
+        return str(self._text_call("cget", "-state")) == tk.NORMAL
+
+    def _restore(self, current: PieceTable, target: PieceTable, start: int, length: int, replacement: int) -> None:
+        """
+        Переводит текстовое поле от снимка current к снимку target: length символов с позиции start
+        заменяются на replacement символов из target. Поле меняется в обход модели документа,
+        после чего она заменяется снимком target.
+        """
+
+        first, first_column = current.position_of(start)
+        last, last_column = current.position_of(start + length)
+        text = target.text(start, start + replacement)
+        start_index = f"{first + 1}.{first_column}"
+        self._text_call("delete", start_index, f"{last + 1}.{last_column}")
+        self._text_call("insert", start_index, text)
+        self.document = target
+        self.dirty.record(first, last - first + 1, text.count("\n") + 1)
+        self._invalidate_search()
+        self.text_field.mark_set(tk.INSERT, f"{start_index}+{len(text)}c")
+        self.text_field.see(tk.INSERT)
+
+    def reset_tracking(self, filename: Optional[str], keep_history: bool = False) -> None:
+        """
+        Отмечает, что документ совпадает с содержимым файла filename (None - ни с каким файлом),
+        и сбрасывает отслеживание изменённых строк.
+
+        :param filename: Файл, с которым совпадает документ.
+        :param keep_history: Сохранить историю правок (после сохранения файла); при загрузке она сбрасывается.
+        """
+
+        self.dirty.reset()
+        self.text_field.edit_modified(False)
+        if not keep_history:
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+        if filename != self._synced_file and self._baseline is not None:
+            self._baseline.close()
+            self._baseline = None
+        self._synced_file = filename
+
+    def _open_baseline(self, filename: str) -> Optional[MappedTextFile]:
+        """
+        Возвращает отображение сохранённого файла с актуальным индексом строк.
+        Файлы с переводами строк "\\r\\n" не поддерживают частичное сохранение,
+        так как при загрузке переводы строк приводятся к "\\n".
+        """
+
+        baseline = self._baseline
+        if baseline is not None and baseline.filename != filename:
+            baseline.close()
+            baseline = None
+        if baseline is None:
+            baseline = MappedTextFile(filename)
+            if baseline.contains(b"\r"):
+                baseline.close()
+                return None
+        elif self._baseline_valid_until is not None:
+            baseline.remap(self._baseline_valid_until)
+        self._baseline = baseline
+        self._baseline_valid_until = None
+        return baseline
+
+    def save_incremental(self, filename: str) -> bool:
+        """
+        Сохраняет только изменённые строки, если правки сосредоточены в одном месте:
+        их новый текст (не больше INCREMENTAL_SAVE_LIMIT символов) заменяет соответствующий
+        участок файла в фоновом потоке (см. FileManager.patch_file). Время сохранения зависит
+        от размера правки, а не файла. Возможно, только если файл совпадал с документом
+        на момент начала отслеживания и других сохранений не выполняется.
+
+        :param filename: Путь к файлу.
+        :return: True, если сохранение запущено; False, если нужно полное сохранение.
+        """
+
+        dirty = self.dirty
+        if dirty.invalid or dirty.start is None or self._synced_file != filename or os.linesep != "\n":
+            return False
+        if self.save_queue.busy:
+            return False
+
+        start_index = f"{dirty.start + 1}.0"
+        end_index = f"{dirty.end + 1}.0"
+        if self.text_field.compare(end_index, ">", "end-1c"):
+            end_index = "end-1c"
+        if int(self._text_call("count", "-chars", start_index, end_index)) > INCREMENTAL_SAVE_LIMIT:
+            return False
+
+        try:
+            baseline = self._open_baseline(filename)
+            if baseline is None:
+                return False
+            patch = FilePatch(
+                baseline.line_offset(dirty.start),
+                baseline.line_offset(dirty.base_end),
+                self.text_field.get(start_index, end_index).encode("utf-8"),
+            )
+        except Exception:
+            return False
+
+        # После записи индекс отображения действителен только до начала правки
+        self._baseline_valid_until = patch.start
+        self.reset_tracking(filename, keep_history=True)
+        self.save_queue.submit(filename, patch)
+        self.status_label.config(text=f"Сохранение {filename} ({len(patch.data)} байт изменений)...")
+        self.root.after(LOAD_POLL_MS, self._poll_saving)
+        return True
+
+    def _write_save(self, filename: str, job: Any) -> None:
+        """
+        Выполняет сохранение в рабочем потоке SaveQueue.
+        """
+
+        if isinstance(job, FilePatch):
+            self.file_manager.patch_file(filename, job.start, job.end, job.data)
+        else:
+            self.file_manager.write_document(filename, job)
+
+    def save_file(self) -> None:
+        """
+        Получает из поля ввода имя файла и сохраняет в него текущее содержимое
+        многострочного текстового поля (self.text_field). Сохраняется снимок модели документа
+        (self.document): он не меняется при дальнейших правках, поэтому запись целиком выполняется
+        в фоновом потоке (см. FileManager.write_document), а редактирование не прерывается;
+        итог выводится в строку состояния без модальных окон.
+        Во время потоковой загрузки и слежения за файлом сохранение недоступно, чтобы не записать файл частично.
+        """
+
+        if self._is_loading():
+            self.status_label.config(text="Дождитесь окончания загрузки или отмените её")
+            return
+        if self.follower is not None:
+            self.status_label.config(text="Остановите слежение за файлом")
+            return
+        if self.viewer is not None:
+            self.status_label.config(text="Файл открыт только для просмотра")
+            return
+
+        filename = self.filename_entry.get()
+        if not self.dirty and self._synced_file == filename and not self.text_field.edit_modified():
+            self.status_label.config(text="Нет изменений для сохранения")
+            return
+        if self.save_incremental(filename):
+            return
+
+        # Модель повторяет поле, пока Tk и Python одинаково считают символы (в Tcl 8.6 символы
+        # вне BMP занимают две позиции); при расхождении длин она собирается из поля заново
+        if int(self._text_call("count", "-chars", "1.0", "end-1c") or 0) != len(self.document):
+            self.document = PieceTable(self.text_field.get("1.0", "end-1c"))
+            self._undo_stack.clear()
+            self._redo_stack.clear()
+
+        # Правки, сделанные после этого момента, попадут в следующее сохранение
+        self.reset_tracking(filename, keep_history=True)
+        if self.save_queue.submit(filename, self.document):
+            self.status_label.config(text=f"Сохранение {filename}...")
+            self.root.after(LOAD_POLL_MS, self._poll_saving)
+        else:
+            self.status_label.config(text=f"Сохранение {filename} отложено до окончания текущей записи")
+
+    def _poll_saving(self) -> None:
+        """
+        Показывает в строке состояния итоги фоновых сохранений, пока они не завершатся.
+        """
+
+        # Состояние читается до итогов: если запись уже завершена, её итог уже в очереди
+        busy = self.save_queue.busy
+        for result in self.save_queue.results():
+            if result.error is None:
+                text = f"Файл {result.filename} сохранён за {result.elapsed * 1000:.0f} мс"
+            else:
+                text = f"Не удалось сохранить файл {result.filename}: {result.error}"
+                # Содержимое файла неизвестно, следующее сохранение будет полным
+                if self._synced_file == result.filename:
+                    self.reset_tracking(None, keep_history=True)
+            self.status_label.config(text=text)
+        if busy:
+            self.root.after(LOAD_POLL_MS, self._poll_saving)
+
+    def _invalidate_search(self) -> None:
+        """
+        Отменяет фоновый поиск и забывает результаты: после изменения документа позиции совпадений
+        устаревают. Подсветка остаётся на тексте до следующего поиска.
+        """
+
+        if self.search_results is None and not self._search_cache:
+            return
+        self._search_generation += 1
+        self._search_cache.clear()
+        self.search_results = None
+        self.current_match = None
+        self._search_jump = False
+
+    def _search_source(self) -> Union[TextIndex, PieceTable]:
+        """
+        Документ для фонового поиска. Если документ совпадает с файлом (или открыт для просмотра),
+        поиск идёт по собственному отображению файла в память; иначе - по снимку модели документа,
+        который кодируется уже в фоновом потоке (см. _search_in_background).
+        """
+
+        filename = self.viewer.filename if self.viewer is not None else self._synced_file
+        unchanged = self.viewer is not None or not (self.dirty or self.text_field.edit_modified())
+        if filename is not None and unchanged and not self.save_queue.busy:
+            try:
+                return MappedTextFile(filename)
+            except OSError:
+                pass
+        return self.document
+
+    def find(self) -> None:
+        """
+        Запускает поиск текста из поля поиска и подсвечивает совпадения по мере их нахождения.
+        """
+
+        self.start_search(self.search_entry.get(), self.regex_var.get())
+
+    def start_search(self, pattern: str, regex: bool = False) -> Optional[SearchResults]:
+        """
+        Подсвечивает совпадения с pattern. Документ просматривается в фоновом потоке (см. TextSearcher),
+        найденные совпадения подсвечиваются через root.after по мере поступления. Результаты недавних
+        запросов сохраняются, пока документ не изменился, и повторный поиск обходится без просмотра.
+
+        :param pattern: Искомая подстрока или регулярное выражение.
+        :param regex: Является ли pattern регулярным выражением.
+        :return: Пополняемые результаты поиска или None, если поиск не запущен.
+        """
+
+        self._search_generation += 1
+        generation = self._search_generation
+        self.text_field.tag_remove(SEARCH_TAG, "1.0", tk.END)
+        self.search_results = self.current_match = None
+        self._highlighted = 0
+        self._search_jump = False
+        if not pattern:
+            self.status_label.config(text="")
+            return None
+        if self._is_loading():
+            self.status_label.config(text="Дождитесь окончания загрузки или отмените её")
+            return None
+
+        key = (pattern, regex)
+        results = self._search_cache.get(key)
+        if results is not None and results.complete:
+            self._search_cache.move_to_end(key)
+            self.search_results = results
+            self.root.after(1, self._poll_search, generation, None)
+            return results
+
+        try:
+            TextSearcher.compile_pattern(pattern, regex)
+        except re.error as e:
+            self.status_label.config(text=f"Некорректное регулярное выражение: {e}")
+            return None
+        source = self._search_source()
+        # Размер снимка модели в байтах станет известен после кодирования в фоновом потоке
+        results = self.search_results = SearchResults(
+            pattern, regex, source.size if isinstance(source, TextIndex) else 0
+        )
+        self._search_cache[key] = results
+        self._search_cache.move_to_end(key)
+        while len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+
+        found: "queue.Queue[Tuple[str, Any, int]]" = queue.Queue()
+        self._search_executor.submit(self._search_in_background, source, pattern, regex, generation, found)
+        self.status_label.config(text=f"Поиск «{pattern}»...")
+        self.root.after(LOAD_POLL_MS, self._poll_search, generation, found)
+        return results
+
+    def _search_in_background(
+        self,
+        source: Union[TextIndex, PieceTable],
+        pattern: str,
+        regex: bool,
+        generation: int,
+        found: "queue.Queue[Tuple[str, Any, int]]",
+    ) -> None:
+        """
+        Выполняет поиск в фоновом потоке и передаёт совпадения блоками; не обращается к виджетам
+        и прекращает поиск, если он отменён. Снимок модели документа сначала кодируется в UTF-8,
+        и его размер передаётся главному потоку для хода поиска.
+        """
+
+        if isinstance(source, TextIndex):
+            index = source
+        else:
+            try:
+                index = TextIndex(b"".join(source.utf8_chunks()))
+            except Exception as e:
+                found.put(("error", e, 0))
+                return
+            found.put(("size", None, index.size))
+        try:
+            for matches, scanned in TextSearcher(index, pattern, regex).batches():
+                if generation != self._search_generation:
+                    return
+                found.put(("data", matches, scanned))
+            found.put(("done", None, index.size))
+        except Exception as e:
+            found.put(("error", e, 0))
+        finally:
+            index.close()
+
+    def _poll_search(self, generation: int, found: "Optional[queue.Queue[Tuple[str, Any, int]]]") -> None:
+        """
+        Забирает найденные совпадения и подсвечивает очередную порцию, не больше
+        SEARCH_HIGHLIGHT_BATCH за вызов, чтобы интерфейс оставался отзывчивым.
+        """
+
+        results = self.search_results
+        if generation != self._search_generation or results is None:
+            return
+        while found is not None:
+            try:
+                kind, payload, scanned = found.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "data":
+                results.add(payload, scanned)
+            elif kind == "size":
+                results.size = scanned
+            elif kind == "done":
+                results.add([], scanned)
+                results.complete = True
+            else:
+                self._search_cache.pop((results.pattern, results.regex), None)
+                self.search_results = None
+                self.status_label.config(text=f"Ошибка поиска: {payload}")
+                return
+
+        if self.viewer is not None:
+            self._highlight_viewer()
+            self._highlighted = len(results.matches)
+        elif self._highlighted < len(results.matches):
+            batch = results.matches[self._highlighted : self._highlighted + SEARCH_HIGHLIGHT_BATCH]
+            indices = [self._search_index(position) for match in batch for position in match]
+            self.text_field.tag_add(SEARCH_TAG, *indices)
+            self._highlighted += len(batch)
+        if self._search_jump and (results.complete or results.next_after(self._search_position()) is not None):
+            self._search_jump = False
+            self._jump_next(results)
+
+        count = len(results.matches)
+        if results.complete:
+            self.status_label.config(text=f"Найдено совпадений: {count}" if count else "Совпадений не найдено")
+        else:
+            percent = results.scanned * 100 // results.size if results.size else 100
+            self.status_label.config(text=f"Поиск: {percent}%, найдено совпадений: {count}")
+        if not results.complete:
+            self.root.after(LOAD_POLL_MS, self._poll_search, generation, found)
+        elif self._highlighted < count:
+            self.root.after(1, self._poll_search, generation, None)
+
+    def _search_index(self, position: Tuple[int, int]) -> str:
+        """
+        Индекс текстового поля для позиции (строка, символ) документа; в режиме просмотра
+        учитывается номер первой видимой строки.
+        """
+
+        top = self.viewer_top if self.viewer is not None else 0
+        return f"{position[0] - top + 1}.{position[1]}"
+
+    def _search_position(self) -> Tuple[int, int]:
+        """
+        Позиция (строка, символ), от которой ищется следующее совпадение: курсор текстового поля,
+        а в режиме просмотра - конец выбранного совпадения, если оно видно, иначе начало окна.
+        """
+
+        if self.viewer is None:
+            line, column = str(self.text_field.index(tk.INSERT)).split(".")
+            return int(line) - 1, int(column)
+        cursor = self._viewer_cursor
+        if cursor is not None and self.viewer_top <= cursor[0] < self.viewer_top + self._viewer_height():
+            return cursor
+        return self.viewer_top, 0
+
+    def _highlight_viewer(self) -> None:
+        """
+        Подсвечивает совпадения в видимом окне строк режима просмотра и выделяет выбранное совпадение.
+        """
+
+        self.text_field.tag_remove(SEARCH_TAG, "1.0", tk.END)
+        self.text_field.tag_remove(tk.SEL, "1.0", tk.END)
+        results = self.search_results
+        if results is None:
+            return
+        matches = results.in_lines(self.viewer_top, self.viewer_top + self._viewer_height())
+        if matches:
+            self.text_field.tag_add(SEARCH_TAG, *[self._search_index(position) for m in matches for position in m])
+        if self.current_match in matches:
+            self.text_field.tag_add(tk.SEL, *[self._search_index(position) for position in self.current_match])
+
+    def find_next(self) -> None:
+        """
+        Переходит к следующему совпадению с текстом поля поиска, начиная поиск, если он ещё не выполнялся.
+        Если совпадение ещё не найдено фоновым поиском, переход выполняется, когда оно найдётся.
+        """
+
+        pattern, regex = self.search_entry.get(), self.regex_var.get()
+        results = self.search_results
+        if results is None or (results.pattern, results.regex) != (pattern, regex):
+            results = self.start_search(pattern, regex)
+            if results is None:
+                return
+        self._jump_next(results)
+
+    def _jump_next(self, results: SearchResults) -> None:
+        """
+        Выделяет следующее за текущей позицией совпадение или откладывает переход до его нахождения.
+        """
+
+        match = results.next_after(self._search_position())
+        if match is None:
+            self._search_jump = not results.complete
+            return
+        self.current_match = match
+        if self.viewer is not None:
+            self._viewer_cursor = match.end
+            self.goto_line(match.start[0])
+            self._highlight_viewer()
+            return
+        start, end = self._search_index(match.start), self._search_index(match.end)
+        self.text_field.tag_remove(tk.SEL, "1.0", tk.END)
+        self.text_field.tag_add(tk.SEL, start, end)
+        self.text_field.mark_set(tk.INSERT, end)
+        self.text_field.see(start)
+
+    def _replacement(self, results: SearchResults, matched: str) -> str:
+        """
+        Текст замены для совпадения: для регулярного выражения в поле замены
+        раскрываются ссылки на группы (\\1, \\g<name>).
+        """
+
+        replacement = self.replace_entry.get()
+        if not results.regex:
+            return replacement
+        match = re.compile(results.pattern, re.MULTILINE).fullmatch(matched)
+        return match.expand(replacement) if match is not None else replacement
+
+    def replace_current(self) -> None:
+        """
+        Заменяет выбранное совпадение и переходит к следующему. Правка сбрасывает результаты,
+        поэтому следующее совпадение ищется заново.
+        """
+
+        if self.viewer is not None:
+            self.status_label.config(text="Файл открыт только для просмотра")
+            return
+        results, match = self.search_results, self.current_match
+        if results is None or match is None:
+            self.find_next()
+            return
+        start, end = self._search_index(match.start), self._search_index(match.end)
+        try:
+            replacement = self._replacement(results, self.text_field.get(start, end))
+        except (re.error, IndexError) as e:
+            self.status_label.config(text=f"Некорректная замена: {e}")
+            return
+        self.text_field.replace(start, end, replacement)
+        self.text_field.mark_set(tk.INSERT, f"{start}+{len(replacement)}c")
+        self.find_next()
+
+    def replace_all(self) -> None:
+        """
+        Заменяет все совпадения завершённого поиска, начиная с последнего, чтобы позиции
+        ещё не заменённых совпадений не сдвигались.
+        """
+
+        if self.viewer is not None:
+            self.status_label.config(text="Файл открыт только для просмотра")
+            return
+        results = self.search_results
+        if results is None or not results.complete:
+            if results is None:
+                self.find()
+            self.status_label.config(text="Дождитесь окончания поиска")
+            return
+        matches = results.matches
+        try:
+            for match in reversed(matches):
+                start, end = self._search_index(match.start), self._search_index(match.end)
+                self.text_field.replace(start, end, self._replacement(results, self.text_field.get(start, end)))
+        except (re.error, IndexError) as e:
+            self.status_label.config(text=f"Некорректная замена: {e}")
+            return
+        self.status_label.config(text=f"Заменено совпадений: {len(matches)}")
+
+    def toggle_follow(self) -> None:
+        """
+        Включает или выключает слежение за файлом в соответствии с флажком.
+        """
+
+        if self.follow_var.get():
+            self.start_follow()
+        else:
+            self.stop_follow()
+
+    def start_follow(self) -> None:
+        """
+        Начинает слежение за файлом, имя которого введено в поле ввода: показывает файл
+        (или его последние follow_max_lines строк) и затем раз в follow_interval мс дописывает
+        в текстовое поле только новые данные (см. FileFollower). Пока идёт слежение,
+        текстовое поле доступно только для чтения.
+        """
+
+        filename = self.filename_entry.get()
+        self.cancel_loading()
+        self.close_viewer()
+        try:
+            follower = FileFollower(filename, lines=self.follow_max_lines)
+        except FileNotFoundError:
+            self.follow_var.set(False)
+            messagebox.showerror("Ошибка", f"Файл {filename} не найден!")
+            return
+        except Exception as e:
+            self.follow_var.set(False)
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+            return
+
+        self.follower = follower
+        self.follow_var.set(True)
+        self.text_field.config(state=tk.NORMAL)
+        self.text_field.delete(1.0, tk.END)
+        self.text_field.config(state=tk.DISABLED)
+        self.reset_tracking(None)
+        self.status_label.config(text=f"Слежение за {filename}")
+        self.root.after(1, self._poll_follow, self._generation)
+
+    def stop_follow(self) -> None:
+        """
+        Прекращает слежение за файлом. Показанный текст остаётся в текстовом поле и доступен
+        для правки; так как он может быть лишь частью файла, следующее сохранение будет полным.
+        """
+
+        if self.follower is None:
+            return
+        self.follower.close()
+        self.follower = None
+        self.follow_var.set(False)
+        self.text_field.config(state=tk.NORMAL)
+        self.reset_tracking(None)
+
+    def _poll_follow(self, generation: int) -> None:
+        """
+        Шаг слежения: дописывает в текстовое поле новые данные файла. Если прочитано не всё,
+        следующий шаг выполняется сразу, иначе - через follow_interval мс.
+        """
+
+        follower = self.follower
+        if generation != self._generation or follower is None:
+            return
+        try:
+            update = follower.poll()
+        except Exception as e:
+            self.stop_follow()
+            self.status_label.config(text=f"Слежение остановлено: {e}")
+            return
+
+        if update.reset:
+            self.text_field.config(state=tk.NORMAL)
+            self.text_field.delete(1.0, tk.END)
+            self.text_field.config(state=tk.DISABLED)
+            self.status_label.config(text=f"Файл {follower.filename} усечён, чтение с начала")
+        if update.text:
+            self._append_follow(update.text)
+        self.root.after(1 if update.more else self.follow_interval, self._poll_follow, generation)
+
+    def _append_follow(self, text: str) -> None:
+        """
+        Дописывает текст в конец поля и удаляет строки сверх follow_max_lines.
+        Если поле было прокручено до конца, прокрутка следует за новыми строками.
+        """
+
+        at_end = self.text_field.yview()[1] >= 1.0
+        self.text_field.config(state=tk.NORMAL)
+        self.text_field.insert(tk.END, text)
+        if self.follow_max_lines is not None:
+            line, column = str(self.text_field.index("end-1c")).split(".")
+            # Пустая строка после завершающего перевода строки не считается
+            excess = int(line) - (column == "0") - self.follow_max_lines
+            if excess > 0:
+                self.text_field.delete(1.0, f"{excess + 1}.0")
+        self.text_field.config(state=tk.DISABLED)
+        if at_end:
+            self.text_field.see(tk.END)
+
+
+def iter_batch_files(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Перечисляет файлы для пакетной обработки: файлы берутся как есть, каталоги обходятся рекурсивно.
+
+    :param paths: Пути к файлам и каталогам.
+    :return: Итератор путей к файлам.
+    """
+
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, names in os.walk(path):
+            for name in sorted(names):
+                yield os.path.join(directory, name)
+
+
+def run_batch(
+    file_manager: FileManager,
+    paths: Iterable[str],
+    workers: int = BATCH_WORKERS,
+    encoding: str = "utf-8",
+    target_encoding: Optional[str] = None,
+    newline: Optional[str] = None,
+) -> int:
+    """
+    Пакетно обрабатывает файлы (см. FileManager.process_files) и печатает время обработки
+    каждого файла и общую пропускную способность.
+
+    :return: Количество файлов, которые не удалось обработать.
+    """
+
+    start = time.perf_counter()
+    count = changed = failed = read = 0
+    for result in file_manager.process_files(iter_batch_files(paths), workers, encoding, target_encoding, newline):
+        count += 1
+        read += result.read
+        if result.error is not None:
+            failed += 1
+            print(f"{result.filename}: ошибка за {result.elapsed * 1000:.1f} мс: {result.error}")
+        elif result.changed:
+            changed += 1
+            print(f"{result.filename}: {result.elapsed * 1000:.1f} мс, {result.read} -> {result.written} байт")
+        else:
+            print(f"{result.filename}: {result.elapsed * 1000:.1f} мс, без изменений")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(
+        f"Файлов: {count}, изменено: {changed}, ошибок: {failed}; {read / 2**20:.1f} МБ за {elapsed:.2f} с "
+        f"({read / 2**20 / elapsed:.1f} МБ/с, {count / elapsed:.0f} файлов/с)"
+    )
+    return failed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Основная функция, создаёт главное окно, инициализирует FileManager и FileEditorApp,
+    а затем запускает главный цикл обработки событий Tkinter. Если указаны файлы или каталоги,
+    они обрабатываются пакетно без интерфейса (см. run_batch).
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:]).
+    """
+
+    parser = argparse.ArgumentParser(description="Редактор файлов")
+    parser.add_argument("paths", nargs="*", help="файлы и каталоги для пакетной обработки без интерфейса")
+    parser.add_argument("--encoding", default="utf-8", help="кодировка исходных файлов")
+    parser.add_argument("--to-encoding", help="перекодировать файлы в эту кодировку")
+    parser.add_argument("--newline", choices=sorted(NEWLINES), help="привести переводы строк к одному виду")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="количество потоков обработки")
+    parser.add_argument(
+        "--follow-interval", type=int, default=FOLLOW_POLL_MS, help="период проверки файла при слежении, мс"
+    )
+    parser.add_argument("--follow-lines", type=int, help="сколько последних строк хранить при слежении за файлом")
+    args = parser.parse_args(argv)
+
+    if args.paths:
+        try:
+            codecs.lookup(args.encoding)
+            codecs.lookup(args.to_encoding or args.encoding)
+        except LookupError as e:
+            parser.error(str(e))
+        newline = NEWLINES[args.newline] if args.newline else None
+        # Каждый файл читается один раз, кэш содержимого не нужен
+        failed = run_batch(
+            FileManager(cache_bytes=0), args.paths, args.workers, args.encoding, args.to_encoding, newline
+        )
+        if failed:
+            sys.exit(1)
+        return
+
     root: tk.Tk = tk.Tk()
     root.title("Редактор файлов")
 
@@ -147,7 +2825,7 @@ def main() -> None:
     file_manager: FileManager = FileManager()
 
     # Создаём и запускаем приложение
-    app: FileEditorApp = FileEditorApp(root, file_manager)
+    app: FileEditorApp = FileEditorApp(root, file_manager, args.follow_interval, args.follow_lines)
     root.mainloop()
 
 
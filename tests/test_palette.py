@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src import palette
+from src.palette import Palette, decode_colors, encode_colors, lab_to_rgb
+
+
+class TestPalette(unittest.TestCase):
+    """
+    Класс с тестами для проверки компактного хранилища палитры.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт палитру с набором цветов перед каждым тестом.
+        """
+
+        self.palette = Palette({"красный": "#ff0000", "оранжевый": "#FF7F00", "алый": "#ff0000"})
+
+    def test_parse_and_format_hex(self) -> None:
+        """
+        Проверяет преобразование кодов цветов в целые числа и обратно.
+        """
+
+        self.assertEqual(palette.parse_hex("#ff7d00"), 0xFF7D00)
+        self.assertEqual(palette.parse_hex("f70"), 0xFF7700)
+        self.assertEqual(palette.format_hex(0x007DFF), "#007dff")
+        for code in ("#ff00", "#gg0000", "", "ff_f00", "0xffff", " fffff", "+fffff", "#-f0"):
+            with self.assertRaises(ValueError):
+                palette.parse_hex(code)
+
+    def test_mapping_interface(self) -> None:
+        """
+        Проверяет, что палитра ведёт себя как словарь название -> код.
+        """
+
+        self.assertEqual(len(self.palette), 3)
+        self.assertEqual(list(self.palette), ["красный", "оранжевый", "алый"])
+        self.assertEqual(self.palette["оранжевый"], "#ff7f00")
+        self.assertEqual(self.palette.get("чёрный", "#ffffff"), "#ffffff")
+        self.assertFalse(hasattr(self.palette, "__dict__"))
+
+        # Общая часть палитр абстрактна: без names, codes и поиска экземпляр не создаётся
+        with self.assertRaises(TypeError):
+            palette.BasePalette()  # type: ignore[abstract]
+
+    def test_reverse_lookup(self) -> None:
+        """
+        Проверяет обратный поиск названия по коду, в том числе после замены кода.
+        """
+
+        self.assertEqual(self.palette.name_of("#FF0000"), "красный")
+        self.assertEqual(self.palette.name_of(0xFF7F00), "оранжевый")
+        self.assertIsNone(self.palette.name_of("#000000"))
+        self.assertIsNone(self.palette.name_of("не код"))
+
+        self.palette.add("оранжевый", "#000000")
+        self.assertIsNone(self.palette.name_of("#ff7f00"))
+        self.assertEqual(self.palette.name_of("#000000"), "оранжевый")
+        self.assertEqual(len(self.palette), 3)
+
+        # Код остаётся у другого названия, и обратный индекс переходит к нему
+        self.palette.add("красный", "#000000")
+        self.assertEqual(self.palette.name_of("#ff0000"), "алый")
+        self.assertEqual(self.palette.name_of("#000000"), "красный")
+        self.palette.add("алый", "#000000")
+        self.assertIsNone(self.palette.name_of("#ff0000"))
+
+    def test_indexes_match_dict(self) -> None:
+        """
+        Проверяет индексы по названию и коду на случайных добавлениях и заменах против словаря;
+        повторяющееся название при создании заменяет код, как в словаре.
+        """
+
+        duplicated = Palette([("a", "#000001"), ("b", "#000002"), ("a", "#000003")])
+        self.assertEqual(dict(duplicated), {"a": "#000003", "b": "#000002"})
+
+        rng = random.Random(3)
+        expected = {f"цвет {i}": rng.randrange(8) for i in range(50)}
+        colors = Palette((name, value) for name, value in expected.items())
+        for _ in range(300):
+            name, value = f"цвет {rng.randrange(60)}", rng.randrange(8)
+            colors.add(name, value)
+            expected[name] = value
+        self.assertEqual({name: colors.value_of(name) for name in expected}, expected)
+        for value in range(8):
+            owners = [name for name in colors.names if expected[name] == value]
+            self.assertEqual(colors.name_of(value), owners[0] if owners else None)
+        self.assertIsNone(colors.index_of("нет такого"))
+
+
+class TestNearestColor(unittest.TestCase):
+    """
+    Класс с тестами для поиска ближайшего именованного цвета.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт палитру из цветов радуги и случайных цветов.
+        """
+
+        rng = random.Random(7)
+        self.palette = Palette({"красный": "#ff0000", "синий": "#0000ff", "белый": "#ffffff"})
+        for i in range(500):
+            self.palette.add(f"цвет {i}", rng.randrange(1 << 24))
+        self.queries = [rng.randrange(1 << 24) for _ in range(50)]
+
+    def test_rgb_to_lab(self) -> None:
+        """
+        Проверяет перевод цветов в пространство CIE Lab по опорным значениям.
+        """
+
+        for value, expected in ((0xFFFFFF, (100, 0, 0)), (0xFF0000, (53.24, 80.09, 67.20))):
+            for actual, reference in zip(palette.rgb_to_lab(value), expected):
+                self.assertAlmostEqual(actual, reference, delta=0.05)
+
+    def test_nearest_exact_and_close(self) -> None:
+        """
+        Проверяет поиск точного и близкого цвета и пустую палитру.
+        """
+
+        self.assertEqual(self.palette.nearest("#ff0000"), "красный")
+        self.assertEqual(self.palette.nearest("#fefefe", "lab"), "белый")
+        self.assertIsNone(Palette().nearest("#ff0000"))
+        with self.assertRaises(ValueError):
+            self.palette.nearest("#ff0000", "hsv")
+
+    def test_nearest_matches_brute_force(self) -> None:
+        """
+        Проверяет пакетный поиск и k-d дерево (без NumPy) по полному перебору.
+        """
+
+        for space in ("rgb", "lab"):
+            convert = palette.rgb_to_lab if space == "lab" else lambda v: ((v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF)
+            points = [convert(value) for value in self.palette.codes]
+            expected = []
+            for query in self.queries:
+                target = convert(query)
+                distances = [sum((a - b) ** 2 for a, b in zip(point, target)) for point in points]
+                expected.append(self.palette.names[distances.index(min(distances))])
+
+            self.assertEqual(self.palette.nearest_many(self.queries, space), expected)
+            with patch("src.palette.np", None):
+                index = palette.NearestColorIndex(self.palette.codes, space)
+                self.assertEqual([self.palette.names[index.query(query)] for query in self.queries], expected)
+
+    def test_cache_reset_on_change(self) -> None:
+        """
+        Проверяет, что индекс поиска перестраивается после изменения палитры.
+        """
+
+        self.assertEqual(self.palette.nearest("#0000fe"), "синий")
+        self.palette.add("почти синий", "#0000fe")
+        self.assertEqual(self.palette.nearest("#0000fe"), "почти синий")
+
+
+class TestColorConversion(unittest.TestCase):
+    """
+    Класс с тестами для пакетного перевода цветов между пространствами.
+    """
+
+    def setUp(self) -> None:
+        """
+        Готовит набор случайных и граничных цветов.
+        """
+
+        rng = random.Random(13)
+        self.values = [0x000000, 0xFFFFFF, 0xFF0000, 0x00FF00, 0x0000FF, 0x808080, 0xFF7F00]
+        self.values += [rng.randrange(1 << 24) for _ in range(1000)]
+
+    def test_reference_values(self) -> None:
+        """
+        Проверяет перевод оранжевого цвета в HSV и HSL и обратно.
+        """
+
+        for use_numpy in (True, False):
+            with contextlib.nullcontext() if use_numpy else patch("src.palette.np", None):
+                h, s, v = (float(c) for c in encode_colors([0xFF8000], "hsv")[0])
+                self.assertAlmostEqual(h, 30.118, places=3)
+                self.assertEqual((s, v), (1.0, 1.0))
+                self.assertEqual(list(encode_colors([0xFF8000], "hsl")[0])[1:], [1.0, 0.5])
+                self.assertEqual(list(encode_colors([0xFF8000], "rgb")[0]), [255, 128, 0])
+                self.assertEqual(palette.convert_colors(["#ff8000"], "hex", "hex"), ["#ff8000"])
+                self.assertEqual(list(decode_colors([(390, 1, 1)], "hsv")), [0xFF8000])
+
+    def test_round_trip_and_fallback_parity(self) -> None:
+        """
+        Проверяет обратимость преобразований и совпадение NumPy и чистого Python.
+        """
+
+        for space in palette.CONVERSION_SPACES:
+            vectorized = encode_colors(self.values, space)
+            self.assertEqual(list(decode_colors(vectorized, space)), self.values)
+            with patch("src.palette.np", None):
+                fallback = encode_colors(self.values, space)
+                self.assertEqual(list(decode_colors(fallback, space)), self.values)
+            for first, second in zip(vectorized, fallback):
+                if space in ("int", "hex"):
+                    self.assertEqual(first, second)
+                else:
+                    for a, b in zip(first, second):
+                        self.assertAlmostEqual(float(a), float(b), places=9)
+
+    def test_lab_to_rgb_clips_out_of_gamut(self) -> None:
+        """
+        Проверяет отсечение цветов Lab за пределами гаммы sRGB.
+        """
+
+        self.assertEqual(lab_to_rgb((100, 0, 0)), 0xFFFFFF)
+        self.assertEqual(lab_to_rgb((150, 0, 0)), 0xFFFFFF)
+        self.assertEqual(lab_to_rgb((0, 0, 0)), 0x000000)
+        self.assertEqual(list(decode_colors([(150, 0, 0), (50, 200, 0)], "lab")), [0xFFFFFF, lab_to_rgb((50, 200, 0))])
+        with self.assertRaises(ValueError):
+            encode_colors([0], "cmyk")
+
+    def test_palette_views_cached(self) -> None:
+        """
+        Проверяет кэширование представлений палитры и сброс кэша при изменении.
+        """
+
+        palette = Palette({"красный": "#ff0000"})
+        lab = palette.converted("lab")
+        self.assertIs(palette.converted("lab"), lab)
+        if hasattr(lab, "flags"):
+            self.assertFalse(lab.flags.writeable)
+        palette.add("синий", "#0000ff")
+        self.assertEqual(len(palette.converted("lab")), 2)
+
+
+class TestNameIndex(unittest.TestCase):
+    """
+    Класс с тестами для поиска цветов по нормализованному названию.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт палитру с названиями в разном регистре.
+        """
+
+        self.palette = Palette(
+            {"Жёлтый": "#ffff00", "Зеленый": "#00ff00", "Зелёный лес": "#228b22", "голубой": "#007dff", "синий": "#00f"}
+        )
+
+    def test_normalize_name(self) -> None:
+        """
+        Проверяет приведение регистра, замену "ё" и схлопывание пробелов.
+        """
+
+        self.assertEqual(palette.normalize_name("  Зелёный   ЛЕС "), "зеленый лес")
+
+    def test_resolve(self) -> None:
+        """
+        Проверяет поиск названия без учёта регистра и "е"/"ё".
+        """
+
+        self.assertEqual(self.palette.resolve("желтый"), "Жёлтый")
+        self.assertEqual(self.palette.resolve("ГОЛУБОЙ"), "голубой")
+        self.assertIsNone(self.palette.resolve("красный"))
+
+    def test_complete(self) -> None:
+        """
+        Проверяет автодополнение по префиксу, в том числе для добавленных позже цветов.
+        """
+
+        self.assertEqual(self.palette.complete("зел"), ["Зеленый", "Зелёный лес"])
+        self.assertEqual(self.palette.complete("зел", limit=1), ["Зеленый"])
+        self.assertEqual(self.palette.complete("х"), [])
+        self.palette.add("Зелёная трава", "#7cfc00")
+        self.assertEqual(self.palette.complete("Зеле")[0], "Зелёная трава")
+
+    def test_fuzzy(self) -> None:
+        """
+        Проверяет поиск с опечатками и ограничение расстояния редактирования.
+        """
+
+        self.assertEqual(self.palette.fuzzy("голубйо"), ["голубой"])
+        self.assertEqual(self.palette.fuzzy("синей", max_distance=1), ["синий"])
+        self.assertEqual(self.palette.fuzzy("фиолетовый"), [])
+
+
+class TestPaletteFiles(unittest.TestCase):
+    """
+    Класс с тестами для потоковых загрузчиков и скомпилированного формата палитр.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт временный каталог для файлов палитр.
+        """
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """
+        Удаляет временный каталог.
+        """
+
+        self.tmpdir.cleanup()
+
+    def path(self, name: str) -> str:
+        """
+        Возвращает путь к файлу во временном каталоге.
+        """
+
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_text_loaders(self) -> None:
+        """
+        Проверяет разбор CSS, X11 rgb.txt и CSV с пропуском комментариев и заголовков.
+        """
+
+        css = [":root {", "  --red: #FF0000; --blue: #00f;", "}"]
+        self.assertEqual(list(palette.iter_css_palette(css)), [("red", 0xFF0000), ("blue", 0x0000FF)])
+
+        x11 = ["! $Xorg: rgb.txt $", "255 250 250\t\tsnow", "  0   0 128\t\tnavy blue"]
+        self.assertEqual(list(palette.iter_x11_palette(x11)), [("snow", 0xFFFAFA), ("navy blue", 0x000080)])
+
+        rows = ["name,hex", "красный,#ff0000", "синий,0,0,255", "битый,#zz"]
+        self.assertEqual(list(palette.iter_csv_palette(rows)), [("красный", 0xFF0000), ("синий", 0x0000FF)])
+
+    def test_json_loader_small_chunks(self) -> None:
+        """
+        Проверяет потоковый разбор JSON при блоках чтения меньше одного значения.
+        """
+
+        obj = '{"красный": "#ff0000", "число": 16777215 , "rgb": [0, 128, 0]}'
+        self.assertEqual(
+            list(palette.iter_json_palette(io.StringIO(obj), chunk_size=3)),
+            [("красный", 0xFF0000), ("число", 0xFFFFFF), ("rgb", 0x008000)],
+        )
+
+        arr = '[{"name": "a", "hex": "#010203"}, ["b", "#040506"]]'
+        self.assertEqual(
+            list(palette.iter_json_palette(io.StringIO(arr), chunk_size=4)), [("a", 0x010203), ("b", 0x040506)]
+        )
+
+        with self.assertRaises(ValueError):
+            list(palette.iter_json_palette(io.StringIO('{"a": "#010203" "b"}')))
+
+        # Ошибка в начале большого файла обнаруживается без чтения до конца
+        for broken in ('{"a": #010203, ', '{"a": "\x01", ', '[["a", tru1], '):
+            file = io.StringIO(broken + '"b": "#040506", ' * 10000 + '"c": "#070809"}')
+            with self.subTest(broken=broken), self.assertRaises(ValueError):
+                list(palette.iter_json_palette(file, chunk_size=64))
+            self.assertLess(file.tell(), 1024)
+
+    def test_compiled_palette(self) -> None:
+        """
+        Проверяет компиляцию палитры и чтение её через mmap: поиск в обе стороны,
+        порядок названий и запросы, общие с Palette.
+        """
+
+        with open(self.path("colors.json"), "w", encoding="utf-8") as file:
+            file.write('{"Красный": "#ff0000", "Алый": "#ff0000", "Жёлтый": "#ffff00", "синий": "#0000ff"}')
+
+        source = palette.load_palette(self.path("colors.json"))
+        palette.compile_palette(source, self.path("colors.cpal"))
+
+        with palette.load_palette(self.path("colors.cpal")) as mapped:
+            self.assertIsInstance(mapped, palette.MappedPalette)
+            self.assertEqual(dict(mapped), dict(source))
+            self.assertEqual(mapped["синий"], "#0000ff")
+            self.assertNotIn("зелёный", mapped)
+            self.assertEqual(mapped.name_of("#ff0000"), "Красный")
+            self.assertIsNone(mapped.name_of("#123456"))
+            self.assertEqual(mapped.resolve("желтый"), "Жёлтый")
+            self.assertEqual(mapped.nearest("#fe0101"), "Красный")
+
+    def test_invalid_compiled_palette(self) -> None:
+        """
+        Проверяет открытие пустого и чужого файла как скомпилированной палитры.
+        """
+
+        for content in (b"", b"not a palette at all"):
+            with open(self.path("bad.cpal"), "wb") as file:
+                file.write(content)
+            with self.assertRaises(ValueError):
+                palette.MappedPalette(self.path("bad.cpal"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from src import piece_table
+from src.piece_table import PIECE_SIZE, PieceTable, PieceTableBuilder
+
+
+class TestPieceTable(unittest.TestCase):
+    """
+    Класс с тестами для модели документа на основе таблицы фрагментов.
+    """
+
+    def assertDocument(self, document: PieceTable, expected: str) -> None:
+        """
+        Сравнивает документ со строкой: текст, длину, строки и перевод позиций.
+        """
+
+        self.assertEqual(document.text(), expected)
+        self.assertEqual(len(document), len(expected))
+        self.assertEqual(document.line_count, expected.count("\n") + 1)
+        self.assertEqual(b"".join(document.utf8_chunks()), expected.encode("utf-8"))
+        for offset in {0, len(expected) // 3, len(expected) // 2, len(expected)}:
+            line = expected.count("\n", 0, offset)
+            column = offset - expected.rfind("\n", 0, offset) - 1
+            self.assertEqual(document.position_of(offset), (line, column))
+            self.assertEqual(document.offset_of(line, column), offset)
+
+    def test_random_edits(self) -> None:
+        """
+        Сверяет случайные вставки и удаления со строкой; старые снимки не меняются.
+        """
+
+        rng = random.Random(5)
+        expected = "первая строка\nвторая\n" * 500
+        document = PieceTable.from_bytes(expected.encode("utf-8"))
+        snapshots = [(document, expected)]
+        for step in range(400):
+            if rng.random() < 0.6:
+                position = rng.randint(0, len(expected))
+                text = rng.choice(["x", "\n", "ab\nc", "ё" * rng.randint(1, 2 * PIECE_SIZE)])
+                expected = expected[:position] + text + expected[position:]
+                document = document.insert(position, text)
+            else:
+                start = rng.randint(0, len(expected))
+                end = rng.randint(start, min(len(expected), start + 3000))
+                expected = expected[:start] + expected[end:]
+                document = document.delete(start, end)
+            snapshots.append((document, expected))
+            if step % 50 == 0:
+                self.assertDocument(document, expected)
+                start = rng.randint(0, len(expected))
+                self.assertEqual(document.text(start, start + 100), expected[start : start + 100])
+        for snapshot, text in snapshots:
+            self.assertEqual(snapshot.text(), text)
+
+    def test_from_bytes_references_buffer(self) -> None:
+        """
+        Проверяет, что документ из байтов ссылается на них, не разрезает многобайтовые символы
+        и выдаёт нетронутые участки одним memoryview.
+        """
+
+        data = ("ж" * (PIECE_SIZE + 1) + "\n").encode("utf-8") * 3
+        document = PieceTable.from_bytes(data)
+        self.assertGreater(document.piece_count, 3)
+        self.assertDocument(document, data.decode("utf-8"))
+        chunks = list(document.utf8_chunks())
+        self.assertEqual(len(chunks), 1)
+        self.assertIs(chunks[0].obj, data)
+
+        edited = document.replace(3, 5, "abc")
+        self.assertEqual([type(chunk) for chunk in edited.utf8_chunks()], [memoryview, bytes, memoryview])
+        self.assertDocument(edited, "жжж" + "abc" + data.decode("utf-8")[5:])
+
+        with self.assertRaises(UnicodeDecodeError):
+            PieceTable.from_bytes(b"\xff\xfe")
+
+    def test_invalid_continuation_bytes(self) -> None:
+        """
+        Проверяет, что длинные серии байт продолжения на границе фрагмента и в начале данных
+        дают ошибку декодирования, а не зацикливание или выход за начало буфера.
+        """
+
+        for data in (b"a" * (PIECE_SIZE - 1) + b"\x80" * 5000, b"\x80" * 5000):
+            with self.subTest(size=len(data)), self.assertRaises(UnicodeDecodeError):
+                PieceTable.from_bytes(data)
+
+    def test_builder_from_blocks(self) -> None:
+        """
+        Проверяет построение документа по блокам произвольного размера: символы UTF-8 и "\\r\\n"
+        на границах блоков, ссылки на сами блоки и ошибку для незавершённого символа.
+        """
+
+        rng = random.Random(7)
+        for data in (("ж€😀a\n" * 3000).encode("utf-8"), "строка\r\nещё\rконец\n".encode("utf-8") * 500):
+            builder = PieceTableBuilder()
+            texts = []
+            pos = 0
+            while pos < len(data):
+                size = rng.choice([1, 2, 3, 5, PIECE_SIZE + 1, 3 * PIECE_SIZE])
+                texts.append(builder.feed(data[pos : pos + size]))
+                pos += size
+            texts.append(builder.feed(b"", final=True))
+            expected = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            self.assertEqual("".join(texts), expected)
+            self.assertDocument(builder.document(), expected)
+
+        block = ("ж" * PIECE_SIZE).encode("utf-8")
+        builder = PieceTableBuilder()
+        builder.feed(block)
+        self.assertIs(next(iter(builder.document().utf8_chunks())).obj, block)
+
+        builder = PieceTableBuilder()
+        builder.feed("ж".encode("utf-8")[:1])
+        with self.assertRaises(UnicodeDecodeError):
+            builder.document()
+
+    def test_newline_normalization(self) -> None:
+        """
+        Проверяет приведение "\\r\\n" и "\\r" к "\\n", как в текстовом поле.
+        """
+
+        self.assertDocument(PieceTable.from_bytes(b"a\r\nb\rc"), "a\nb\nc")
+        self.assertDocument(PieceTable(), "")
+        self.assertDocument(PieceTable.from_bytes(b""), "")
+
+    def test_typing_coalesces_pieces(self) -> None:
+        """
+        Проверяет, что посимвольный ввод не порождает фрагмент на каждый символ.
+        """
+
+        document = PieceTable("начало\nконец")
+        for i in range(piece_table.COALESCE_LIMIT * 4):
+            document = document.insert(7 + i, "z")
+        self.assertLessEqual(document.piece_count, 8)
+        self.assertEqual(document.text(), "начало\n" + "z" * piece_table.COALESCE_LIMIT * 4 + "конец")
+
+    def test_clamping(self) -> None:
+        """
+        Проверяет ограничение позиций границами документа и пустые правки.
+        """
+
+        document = PieceTable("abc\ndef")
+        self.assertIs(document.insert(1, ""), document)
+        self.assertIs(document.delete(2, 2), document)
+        self.assertEqual(document.insert(100, "!").text(), "abc\ndef!")
+        self.assertEqual(document.delete(-5, 2).text(), "c\ndef")
+        self.assertEqual(document.line_start(5), len(document))
+        self.assertEqual(document.position_of(100), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import random
+import unittest
+from unittest.mock import patch
+
+from src import quantize
+from src.palette import NearestColorIndex
+from src.quantize import ImageHeader, PaletteQuantizer, read_image_header
+
+
+class TestImageHeader(unittest.TestCase):
+    """
+    Класс с тестами для разбора заголовков PPM и PAM.
+    """
+
+    def test_ppm_with_comment(self) -> None:
+        """
+        Проверяет разбор P6 с комментарием и положение начала данных.
+        """
+
+        stream = io.BytesIO(b"P6\n# comment\n3 2\n255\n" + bytes(18))
+        self.assertEqual(read_image_header(stream), ImageHeader(3, 2, 3))
+        self.assertEqual(len(stream.read()), 18)
+
+    def test_pam(self) -> None:
+        """
+        Проверяет разбор P7 с альфа-каналом.
+        """
+
+        stream = io.BytesIO(b"P7\nWIDTH 4\nHEIGHT 1\nDEPTH 4\nMAXVAL 255\nTUPLTYPE RGB_ALPHA\nENDHDR\n" + bytes(16))
+        self.assertEqual(read_image_header(stream), ImageHeader(4, 1, 4))
+
+    def test_unsupported(self) -> None:
+        """
+        Проверяет отказ для текстовых PPM и 16-битных каналов.
+        """
+
+        for data in (b"P3\n1 1\n255\n", b"P6\n1 1\n65535\n", b"P7\nWIDTH 1\nENDHDR\n"):
+            with self.assertRaises(ValueError):
+                read_image_header(io.BytesIO(data))
+
+
+class TestQuantize(unittest.TestCase):
+    """
+    Класс с тестами для постеризации изображений под палитру.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт палитру цветов радуги и случайное изображение 16x8.
+        """
+
+        rng = random.Random(3)
+        self.codes = [0xFF0000, 0xFF7D00, 0xFFFF00, 0x00FF00, 0x007DFF, 0x0000FF, 0x7D00FF]
+        self.width, self.height = 16, 8
+        self.pixels = bytes(rng.randrange(256) for _ in range(self.width * self.height * 3))
+        index = NearestColorIndex(self.codes)
+        self.expected = bytes(
+            index.query(int.from_bytes(self.pixels[i : i + 3], "big")) for i in range(0, len(self.pixels), 3)
+        )
+
+    def test_buffer_matches_nearest_search(self) -> None:
+        """
+        Проверяет номера цветов для буфера в памяти с NumPy и без него.
+        """
+
+        self.assertEqual(quantize.quantize_buffer(self.pixels, self.width, self.codes, tile_rows=3), self.expected)
+        with patch("src.quantize.np", None):
+            self.assertEqual(quantize.quantize_buffer(memoryview(self.pixels), self.width, self.codes), self.expected)
+
+    def test_alpha_and_posterized_output(self) -> None:
+        """
+        Проверяет игнорирование альфа-канала и вывод цветов палитры.
+        """
+
+        quantizer = PaletteQuantizer(self.codes)
+        self.assertEqual(quantizer.quantize(b"\xfe\x01\x01\x00\x01\x01\xfe\xff", channels=4), b"\x00\x05")
+        self.assertEqual(quantizer.quantize(b"\xfe\x01\x01", output="ppm"), b"\xff\x00\x00")
+        with patch("src.quantize.np", None):
+            self.assertEqual(PaletteQuantizer(self.codes).quantize(b"\xfe\x01\x01", output="ppm"), b"\xff\x00\x00")
+
+    def test_wide_indices(self) -> None:
+        """
+        Проверяет двухбайтовые номера (big-endian) для палитр больше 256 цветов.
+        """
+
+        codes = list(range(300))
+        pixels = (299).to_bytes(3, "big") + (5).to_bytes(3, "big")
+        self.assertEqual(PaletteQuantizer(codes).quantize(pixels), b"\x01\x2b\x00\x05")
+        with patch("src.quantize.np", None):
+            self.assertEqual(PaletteQuantizer(codes).quantize(pixels), b"\x01\x2b\x00\x05")
+
+    def test_tiles_are_views(self) -> None:
+        """
+        Проверяет, что полосы буфера не копируют данные.
+        """
+
+        data = bytearray(self.pixels)
+        tiles = list(quantize.iter_buffer_tiles(data, self.width * 3, 3))
+        self.assertEqual([len(tile) for tile in tiles], [144, 144, 96])
+        data[0] = 42
+        self.assertEqual(tiles[0][0], 42)
+        with self.assertRaises(ValueError):
+            list(quantize.iter_buffer_tiles(data[:-1], self.width * 3))
+
+    def test_image_stream(self) -> None:
+        """
+        Проверяет потоковую обработку PPM с выводом PGM и обрыв данных.
+        """
+
+        source = io.BytesIO(b"P6 16 8 255\n" + self.pixels)
+        target = io.BytesIO()
+        self.assertEqual(quantize.quantize_image(source, target, self.codes, tile_rows=3), ImageHeader(16, 8, 3))
+        self.assertEqual(target.getvalue(), b"P5\n16 8\n6\n" + self.expected)
+
+        with self.assertRaises(ValueError):
+            quantize.quantize_image(io.BytesIO(b"P6 16 8 255\n" + self.pixels[:-1]), io.BytesIO(), self.codes)
+
+
+if __name__ == "__main__":
+    unittest.main()
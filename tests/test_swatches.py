@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from src.swatches import text_color, visible_rows, wheel_rows
+
+
+class TestSwatchLayout(unittest.TestCase):
+    """
+    Класс с тестами для расчёта видимой области сетки образцов.
+    """
+
+    def test_visible_rows(self) -> None:
+        """
+        Проверяет расчёт первой видимой строки, сдвига и количества строк.
+        """
+
+        self.assertEqual(visible_rows(0, 100, 30, 1000), (0, 0, 4))
+        self.assertEqual(visible_rows(45, 100, 30, 1000), (1, 15, 4))
+        self.assertEqual(visible_rows(2970, 100, 30, 100), (99, 0, 1))
+        self.assertEqual(visible_rows(0, 100, 30, 0), (0, 0, 0))
+
+    def test_wheel_rows(self) -> None:
+        """
+        Проверяет прокрутку колесом: щелчки Windows (кратные 120) и малые значения macOS.
+        """
+
+        self.assertEqual(wheel_rows(120), -1)
+        self.assertEqual(wheel_rows(-360), 3)
+        self.assertEqual(wheel_rows(1), -1)
+        self.assertEqual(wheel_rows(-3), 1)
+        self.assertEqual(wheel_rows(0), 0)
+
+    def test_text_color(self) -> None:
+        """
+        Проверяет выбор контрастного цвета подписи.
+        """
+
+        self.assertEqual(text_color(0xFFFF00), "#000000")
+        self.assertEqual(text_color(0x0000FF), "#ffffff")
+
+
+if __name__ == "__main__":
+    unittest.main()
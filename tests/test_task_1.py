@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import io
+import json
+import math
+import os
+import tempfile
+import threading
 import unittest
+from array import array
+from unittest.mock import MagicMock, patch
 
-from src.task_1 import Calculator
+from src import task_1
+from src.task_1 import CalculationHistory, Calculator, is_heavy_input
 
 
 class TestCalculator(unittest.TestCase):
@@ -77,6 +87,469 @@ class TestCalculator(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.calculator.calculate("a", "b", "*")
 
+    def test_calculate_many_single_operation(self) -> None:
+        """
+        Тест пакетного вычисления с одной операцией для всех элементов
+        на буферах array.array.
+        """
+
+        batch = self.calculator.calculate_many(array("d", [1, 2, 3]), array("d", [4, 5, 6]), "*")
+        self.assertEqual(list(batch.results), [4, 10, 18])
+        self.assertEqual([bool(e) for e in batch.errors], [False, False, False])
+
+    def test_calculate_many_error_mask(self) -> None:
+        """
+        Тест пакетного вычисления с разными операциями.
+        Деление на ноль и неизвестная операция попадают в маску ошибок,
+        а в буфере результатов остаётся NaN.
+        """
+
+        batch = self.calculator.calculate_many([6, 6, 5, 5], [3, 0, 3, 3], ["/", "/", "%", "-"])
+        self.assertEqual([bool(e) for e in batch.errors], [False, True, True, False])
+        self.assertEqual(batch.results[0], 2)
+        self.assertTrue(math.isnan(batch.results[1]))
+        self.assertTrue(math.isnan(batch.results[2]))
+        self.assertEqual(batch.results[3], 2)
+
+    def test_calculate_many_python_fallback(self) -> None:
+        """
+        Тест резервной реализации без NumPy: результат совпадает с векторной.
+        """
+
+        batch = self.calculator._calculate_many_python([6, 6, 5], [3, 0, 3], ["/", "/", "+"])
+        self.assertEqual(batch.errors.tolist(), [0, 1, 0])
+        self.assertEqual(batch.results[2], 8)
+
+    def test_calculate_many_length_mismatch(self) -> None:
+        """
+        Тест пакетного вычисления с массивами разной длины.
+        """
+
+        with self.assertRaises(ValueError):
+            self.calculator.calculate_many([1, 2], [1], "+")
+
+
+class TestOperatorRegistry(unittest.TestCase):
+    """
+    Класс для тестирования реестра операций калькулятора.
+    """
+
+    def setUp(self) -> None:
+        """
+        Инициализирует калькулятор с расширенным набором операций.
+        """
+
+        self.calculator = Calculator(task_1.OperatorRegistry.extended())
+
+    def test_extended_operations(self) -> None:
+        """
+        Тест дополнительных операций "**", "%", "//" в скалярном и пакетном режимах.
+        """
+
+        self.assertEqual(self.calculator.calculate(2, 10, "**"), 1024)
+        self.assertEqual(self.calculator.calculate(7, 3, "%"), 1)
+        self.assertEqual(self.calculator.calculate(7, 2, "//"), 3)
+        self.assertEqual(self.calculator.calculate(7, 0, "%"), "ошибка")
+        self.assertEqual(self.calculator.calculate(-8, 0.5, "**"), "ошибка")
+
+        batch = self.calculator.calculate_many([2, 7, 7, -8], [10, 0, 2, 0.5], ["**", "%", "//", "**"])
+        self.assertEqual([bool(e) for e in batch.errors], [False, True, False, True])
+        self.assertEqual(batch.results[0], 1024)
+        self.assertEqual(batch.results[2], 3)
+
+    def test_scalar_and_bulk_agree(self) -> None:
+        """
+        Тест согласованности скалярного, векторного и резервного пакетного вычисления:
+        переполнение и NaN из конечных операндов - ошибка, бесконечность и NaN в операндах
+        распространяются без ошибки.
+        """
+
+        inf, nan = float("inf"), float("nan")
+        pairs = [(2, 10), (1e308, 10), (10, 1e5), (-8, 0.5), (7, 0), (inf, inf), (inf, 2), (nan, 1), (-1e308, 1e308)]
+        for symbol in self.calculator.registry.symbols():
+            firsts, seconds = [p[0] for p in pairs], [p[1] for p in pairs]
+            bulk = self.calculator.calculate_many(firsts, seconds, symbol)
+            fallback = self.calculator._calculate_many_python(firsts, seconds, symbol)
+            for i, (first, second) in enumerate(pairs):
+                scalar = self.calculator.calculate(first, second, symbol)
+                with self.subTest(op=symbol, first=first, second=second):
+                    self.assertEqual(bool(bulk.errors[i]), scalar == "ошибка")
+                    self.assertEqual(bool(fallback.errors[i]), scalar == "ошибка")
+                    if scalar != "ошибка":
+                        self.assertEqual(math.isnan(bulk.results[i]), math.isnan(scalar))
+                        if not math.isnan(scalar):
+                            self.assertEqual(bulk.results[i], scalar)
+
+    def test_register_function(self) -> None:
+        """
+        Тест регистрации доменной функции без пакетной реализации
+        и повторной регистрации уже существующей операции.
+        """
+
+        self.calculator.registry.register_function("hypot", math.hypot)
+        self.assertEqual(self.calculator.calculate(3, 4, "hypot"), 5)
+        self.assertEqual(list(self.calculator.calculate_many([3, 5], [4, 12], "hypot").results), [5, 13])
+
+        with self.assertRaises(ValueError):
+            self.calculator.registry.register_function("+", math.hypot)
+
+    def test_measure_dispatch(self) -> None:
+        """
+        Тест измерения стоимости поиска операции в реестре.
+        """
+
+        self.assertIn("//", self.calculator.registry)
+        self.assertEqual(len(self.calculator.registry), 7)
+        self.assertGreater(self.calculator.registry.measure_dispatch(1000), 0)
+
+
+class TestCalculationHistory(unittest.TestCase):
+    """
+    Класс для тестирования журнала вычислений в отображённом в память файле.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт временный каталог для файла журнала.
+        """
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "history.bin")
+
+    def tearDown(self) -> None:
+        """
+        Удаляет временный каталог.
+        """
+
+        self.tmpdir.cleanup()
+
+    def test_calculator_writes_history(self) -> None:
+        """
+        Тест записи каждого вызова calculate() в журнал и повторного открытия файла.
+        """
+
+        with CalculationHistory(self.path, capacity=8) as history:
+            calculator = Calculator(history=history)
+            calculator.calculate(5, 3, "+")
+            calculator.calculate(6, 0, "/")
+            self.assertEqual(len(history), 2)
+            self.assertEqual(history[0][:3], (5, 3, 8))
+            self.assertEqual(history[0].operation, "+")
+            self.assertTrue(history[1].error)
+            self.assertTrue(math.isnan(history[1].result))
+
+        with CalculationHistory(self.path) as history:
+            self.assertEqual(history.capacity, 8)
+            self.assertEqual([record.operation for record in history.records()], ["+", "/"])
+
+    def test_overflow_recorded_as_error(self) -> None:
+        """
+        Тест записи в журнал вычисления с целыми операндами вне диапазона float.
+        """
+
+        with CalculationHistory(self.path, capacity=8) as history:
+            calculator = Calculator(history=history)
+            self.assertEqual(calculator.calculate(10**400, 1, "+"), "ошибка")
+            self.assertEqual(calculator.calculate(-(10**400), 10**400, "+"), 0)
+            self.assertEqual(history[0][:2], (math.inf, 1))
+            self.assertTrue(history[0].error)
+            self.assertEqual(history[1][:3], (-math.inf, math.inf, 0))
+            self.assertFalse(history[1].error)
+
+    def test_ring_buffer(self) -> None:
+        """
+        Тест кольцевого буфера: старые записи вытесняются новыми,
+        а диапазон через конец буфера возвращается двумя окнами memoryview.
+        """
+
+        with CalculationHistory(self.path, capacity=4) as history:
+            for i in range(10):
+                history.append(i, 1, "-", i - 1)
+            self.assertEqual(len(history), 4)
+            self.assertEqual(history.total, 10)
+            self.assertEqual([record.first for record in history[0:4]], [6, 7, 8, 9])
+            self.assertEqual(history[-1].result, 8)
+
+            segments = history.raw()
+            self.assertEqual(len(segments), 2)
+            self.assertEqual(sum(segment.nbytes for segment in segments), 4 * 40)
+            for segment in segments:
+                segment.release()
+
+    def test_invalid_file(self) -> None:
+        """
+        Тест открытия файла, не являющегося журналом.
+        """
+
+        with open(self.path, "wb") as file:
+            file.write(b"not a history file" * 10)
+        with self.assertRaises(ValueError):
+            CalculationHistory(self.path)
+
+
+class TestExpressionEngine(unittest.TestCase):
+    """
+    Класс для тестирования движка арифметических выражений и его LRU-кэша.
+    """
+
+    def setUp(self) -> None:
+        """
+        Инициализирует движок выражений с кэшем на два выражения.
+        """
+
+        self.engine = task_1.ExpressionEngine(max_size=2)
+
+    def test_evaluate_expression(self) -> None:
+        """
+        Тест вычисления выражений с переменными, скобками и унарным минусом.
+        """
+
+        self.assertEqual(self.engine.evaluate("(a+b)*c/d", {"a": 1, "b": 2, "c": 3, "d": 4}), 2.25)
+        self.assertEqual(self.engine.evaluate("a*-b+c", {"a": 2, "b": 3, "c": 1}), -5)
+        self.assertEqual(self.engine.evaluate("2-3-4"), -5)
+        self.assertEqual(self.engine.compile("x / y")(x=6, y=3), 2)
+
+    def test_division_by_zero(self) -> None:
+        """
+        Тест деления на ноль внутри выражения.
+        Ожидается, что результатом будет строка 'ошибка'.
+        """
+
+        self.assertEqual(self.engine.evaluate("a/(b-b)", {"a": 1, "b": 2}), "ошибка")
+
+    def test_overflow(self) -> None:
+        """
+        Тест переполнения внутри выражения: как и у Calculator.calculate, результатом
+        будет строка 'ошибка', в том числе для выражения из одних констант.
+        """
+
+        self.assertEqual(self.engine.evaluate("x*x", {"x": 1e200}), "ошибка")
+        self.assertEqual(self.engine.evaluate("1e200*1e200+1"), "ошибка")
+        self.assertEqual(self.engine.evaluate("1/0"), "ошибка")
+        self.assertEqual(self.engine.evaluate("x*2", {"x": math.inf}), math.inf)
+
+    def test_invalid_expression(self) -> None:
+        """
+        Тест некорректных выражений и отсутствующих переменных.
+        """
+
+        for text in ("1+", "(1", "1)", "1 2", "a $ b", ""):
+            with self.assertRaises(ValueError):
+                self.engine.compile(text)
+
+        with self.assertRaises(KeyError):
+            self.engine.evaluate("a+b", {"a": 1})
+
+    def test_cache_counters(self) -> None:
+        """
+        Тест счётчиков попаданий и промахов и вытеснения старых выражений из кэша.
+        """
+
+        first = self.engine.compile("a+b")
+        self.assertIs(self.engine.compile("a+b"), first)
+        self.engine.compile("a-b")
+        self.engine.compile("a*b")
+        self.assertIsNot(self.engine.compile("a+b"), first)
+        self.assertEqual(self.engine.cache_info(), {"hits": 1, "misses": 4, "size": 2, "max_size": 2})
+
+
+class TestLiveInput(unittest.TestCase):
+    """
+    Класс для тестирования разбора полей ввода в живом режиме.
+    """
+
+    def test_parse_operand(self) -> None:
+        """
+        Тест разбора чисел и выражений без переменных.
+        """
+
+        engine = task_1.ExpressionEngine()
+        self.assertEqual(task_1.parse_operand("2.5", engine), 2.5)
+        self.assertEqual(task_1.parse_operand("(1+2)*3", engine), 9)
+        for text in ("", "a+1", "1/0", "1+"):
+            with self.assertRaises(ValueError):
+                task_1.parse_operand(text, engine)
+
+    def test_is_heavy_input(self) -> None:
+        """
+        Тест выбора фонового вычисления для выражений и очень длинных чисел.
+        """
+
+        self.assertFalse(is_heavy_input("12.5"))
+        self.assertFalse(is_heavy_input(""))
+        self.assertTrue(is_heavy_input("(1+2)*3"))
+        self.assertTrue(is_heavy_input("9" * 100))
+
+    def test_close_stops_background_work(self) -> None:
+        """
+        Тест закрытия окна: запланированные вызовы root.after отменяются, ожидающие фоновые
+        вычисления снимаются, а окно уничтожается без ожидания текущего вычисления.
+        """
+
+        root = MagicMock()
+        with patch.object(task_1.CalculatorApp, "create_widgets"):
+            app = task_1.CalculatorApp(root, Calculator())
+        root.protocol.assert_called_once_with("WM_DELETE_WINDOW", app.close)
+
+        started, release = threading.Event(), threading.Event()
+        app._executor.submit(lambda: started.set() or release.wait())
+        pending = app._executor.submit(str, 1)
+        started.wait()
+        app._debounce_id, app._poll_id = "after#1", "after#2"
+        try:
+            app.close()
+        finally:
+            release.set()
+        self.assertEqual([c.args for c in root.after_cancel.call_args_list], [("after#1",), ("after#2",)])
+        self.assertTrue(pending.cancelled())
+        root.destroy.assert_called_once_with()
+
+
+class TestBatchMode(unittest.TestCase):
+    """
+    Класс для тестирования пакетного режима калькулятора без графического интерфейса.
+    """
+
+    def test_parse_record(self) -> None:
+        """
+        Тест разбора записей "a op b".
+        """
+
+        self.assertEqual(task_1.parse_record("1.5 * -2"), (1.5, "*", -2.0))
+        self.assertIsNone(task_1.parse_record("1.5*2"))
+        self.assertIsNone(task_1.parse_record("a + 2"))
+
+    def test_run_batch(self) -> None:
+        """
+        Тест пакетной обработки потока: некорректные записи, в том числе пустые строки,
+        и ошибки вычисления выводятся как 'ошибка', так что строки вывода соответствуют строкам ввода.
+        """
+
+        source = io.StringIO("1 + 2\n6 / 0\n\nfoo\n3 % 4\n2.5 * 4\n")
+        target = io.StringIO()
+        count, elapsed = task_1.run_batch(source, target, chunk_size=2)
+        self.assertEqual(count, 6)
+        self.assertGreaterEqual(elapsed, 0)
+        self.assertEqual(target.getvalue().splitlines(), ["3.0", "ошибка", "ошибка", "ошибка", "ошибка", "10.0"])
+
+    def test_process_pool_keeps_order(self) -> None:
+        """
+        Тест параллельной обработки: порядок результатов совпадает с порядком записей.
+        """
+
+        lines = [f"{i} - 1" for i in range(200)]
+        results = list(task_1.evaluate_stream(lines, workers=2, chunk_size=16))
+        self.assertEqual(results, [str(float(i - 1)) for i in range(200)])
+
+
+class TestCalculationServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Класс для тестирования асинхронного сервера калькулятора.
+    """
+
+    async def asyncSetUp(self) -> None:
+        """
+        Запускает сервер на свободном порту перед каждым тестом.
+        """
+
+        self.server = task_1.CalculationServer(Calculator(), max_batch_size=64, batch_window=0.01)
+        await self.server.start()
+
+    async def asyncTearDown(self) -> None:
+        """
+        Останавливает сервер после каждого теста.
+        """
+
+        await self.server.close()
+
+    async def request_many(self, requests: list) -> list:
+        """
+        Отправляет запросы по одному соединению и читает ответы.
+        """
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write("".join(json.dumps(request) + "\n" for request in requests).encode())
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        return responses
+
+    async def test_responses(self) -> None:
+        """
+        Тест ответов сервера: порядок ответов совпадает с порядком запросов,
+        ошибки вычисления и некорректные запросы возвращаются в поле error.
+        """
+
+        responses = await self.request_many(
+            [
+                {"id": 1, "a": 6, "b": 3, "op": "/"},
+                {"id": 2, "a": 6, "b": 0, "op": "/"},
+                {"id": 3, "a": "x"},
+                [1, 2, "+"],
+                {"id": 4, "a": 1e308, "b": 10, "op": "*"},
+                {"id": float("nan"), "a": 1, "b": 2, "op": "+"},
+            ]
+        )
+        self.assertEqual(responses[0], {"id": 1, "result": 2.0})
+        self.assertEqual(responses[1], {"id": 2, "error": "ошибка"})
+        self.assertEqual(responses[2], {"id": 3, "error": "некорректный запрос"})
+        self.assertEqual(responses[3], {"error": "некорректный запрос"})
+        # Переполнение не превращается в Infinity, недопустимый в JSON
+        self.assertEqual(responses[4], {"id": 4, "error": "ошибка"})
+        self.assertEqual(responses[5], {"error": "некорректный ответ"})
+
+        # Целое вне диапазона float отклоняется, а соединение продолжает обслуживаться
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(b'{"id": 7, "a": 1' + b"0" * 400 + b', "b": 1, "op": "+"}\n{"id": 8, "a": 1, "b": 1, "op": "+"}\n')
+        await writer.drain()
+        self.assertEqual(json.loads(await reader.readline()), {"id": 7, "error": "некорректный запрос"})
+        self.assertEqual(json.loads(await reader.readline()), {"id": 8, "result": 2.0})
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_batch_failure(self) -> None:
+        """
+        Тест сбоя вычисления пакета: клиенты получают ошибки, а сервер продолжает работу.
+        """
+
+        with patch.object(self.server.calculator, "calculate_many", side_effect=RuntimeError):
+            responses = await self.request_many([{"id": i, "a": 1, "b": i, "op": "+"} for i in range(3)])
+        self.assertEqual(responses, [{"id": i, "error": "ошибка"} for i in range(3)])
+
+        responses = await self.request_many([{"id": 5, "a": 2, "b": 3, "op": "*"}])
+        self.assertEqual(responses, [{"id": 5, "result": 6.0}])
+
+    async def test_line_too_long(self) -> None:
+        """
+        Тест слишком длинной строки запроса: клиент получает ошибку, и соединение закрывается.
+        """
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(b'{"id": 1, "a": 1, "b": 2, "op": "+"}\n' + b" " * (1 << 17) + b"\n")
+        await writer.drain()
+        self.assertEqual(json.loads(await reader.readline()), {"id": 1, "result": 3.0})
+        self.assertEqual(json.loads(await reader.readline()), {"error": "слишком длинный запрос"})
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_request_coalescing(self) -> None:
+        """
+        Тест объединения запросов нескольких клиентов в пакеты.
+        """
+
+        clients = [
+            self.request_many([{"id": i, "a": client, "b": i, "op": "+"} for i in range(20)]) for client in range(5)
+        ]
+        results = await asyncio.gather(*clients)
+        for client, responses in enumerate(results):
+            self.assertEqual([response["result"] for response in responses], [float(client + i) for i in range(20)])
+
+        stats = self.server.stats()
+        self.assertEqual(stats["requests"], 100)
+        self.assertLess(stats["batches"], 100)
+
 
 if __name__ == "__main__":
     unittest.main()
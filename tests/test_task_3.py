@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import tkinter as tk
 import unittest
 
-from src.task_3 import ColorManager
+from src.task_3 import SWATCH_GRID_THRESHOLD, ColorApp, ColorManager
 
 
 class TestColorManager(unittest.TestCase):
@@ -45,6 +46,120 @@ class TestColorManager(unittest.TestCase):
 
         self.assertEqual(self.color_manager.get_color_code("неизвестный"), "#ffffff")
 
+    def test_original_values_kept(self) -> None:
+        """
+        Проверяет, что коды возвращаются в исходном виде, а названия цветов Tk допускаются.
+        """
+
+        manager = ColorManager({"красный": "#F00", "белый": "white"})
+        self.assertEqual(manager.get_color_code("Красный"), "#F00")
+        self.assertEqual(manager.get_color_code("белый"), "white")
+        self.assertEqual(manager.find_nearest_color("#fe0101"), "красный")
+
+    def test_get_color_name(self) -> None:
+        """
+        Проверяет обратный поиск названия цвета по его коду.
+        """
+
+        self.assertEqual(self.color_manager.get_color_name("#ffff00"), "желтый")
+        self.assertIsNone(self.color_manager.get_color_name("#123456"))
+
+    def test_find_nearest_color(self) -> None:
+        """
+        Проверяет поиск ближайшего цвета палитры в пространствах RGB и Lab.
+        """
+
+        self.assertEqual(self.color_manager.find_nearest_color("#fe0101"), "красный")
+        self.assertEqual(self.color_manager.find_nearest_color("#fe0101", "lab"), "красный")
+        self.assertEqual(self.color_manager.find_nearest_colors(["#0000fe", "#fe0101"])[1], "красный")
+
+    def test_name_normalization_and_suggestions(self) -> None:
+        """
+        Проверяет поиск кода без учёта регистра и "е"/"ё", автодополнение и поиск с опечатками.
+        """
+
+        self.assertEqual(self.color_manager.get_color_code("Жёлтый"), "#ffff00")
+        self.assertEqual(self.color_manager.complete_color_name("ЖЕЛ"), ["желтый"])
+        self.assertEqual(self.color_manager.find_similar_colors("желты"), ["желтый"])
+
+    def test_convert_colors(self) -> None:
+        """
+        Проверяет перевод палитры и произвольных цветов между пространствами.
+        """
+
+        hsv = self.color_manager.convert_palette("hsv")
+        self.assertIs(self.color_manager.convert_palette("hsv"), hsv)
+        self.assertEqual([round(float(c), 3) for c in hsv[0]], [0.0, 1.0, 1.0])
+        self.assertEqual(list(self.color_manager.convert_colors(["#ff0000", "#0000ff"], "int")), [0xFF0000, 0x0000FF])
+        self.assertEqual(self.color_manager.convert_colors([(240, 1, 0.5)], "hex", "hsl"), ["#0000ff"])
+
+
+class TestColorAppPaletteSwap(unittest.TestCase):
+    """
+    Класс тестов для смены палитры в ColorApp с переиспользованием виджетов.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт приложение с тремя цветами; без дисплея тесты пропускаются.
+        """
+
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("Нет графического дисплея")
+        self.app = ColorApp(self.root, ColorManager({"r": "#ff0000", "g": "#00ff00", "b": "#0000ff"}))
+
+    def tearDown(self) -> None:
+        """
+        Закрывает окно приложения после каждого теста.
+        """
+
+        self.root.destroy()
+
+    def test_buttons_reused(self) -> None:
+        """
+        Проверяет, что кнопки переиспользуются, а лишние удаляются или создаются.
+        """
+
+        first = list(self.app.buttons)
+        self.app.swap_palette({"a": "#111111", "b": "#222222"})
+        self.assertEqual(self.app.buttons, first[:2])
+        self.assertFalse(first[2].winfo_exists())
+        self.assertEqual([button.cget("bg") for button in self.app.buttons], ["#111111", "#222222"])
+
+        self.app.swap_palette({"x": "#000001", "y": "#000002", "z": "#000003", "w": "#000004"})
+        self.assertEqual(self.app.buttons[:2], first[:2])
+        self.assertEqual(len(self.app.buttons), 4)
+
+    def test_swap_resets_selection(self) -> None:
+        """
+        Проверяет, что после смены палитры метка и текстовое поле не показывают цвет старой палитры.
+        """
+
+        self.app.update_color("g")
+        self.app.swap_palette({"желтый": "#ffee00", "a": "#111111"})
+        self.assertEqual(self.app.label.cget("text"), "желтый")
+        self.assertEqual(self.app.color_code_var.get(), "#ffee00")
+        self.app.swap_palette({"a": "#111111"})
+        self.assertEqual(self.app.color_code_var.get(), "#ffffff")
+
+    def test_swatch_grid_switch(self) -> None:
+        """
+        Проверяет переход к сетке образцов для большой палитры и обратно.
+        """
+
+        large = {f"c{i}": f"#{i:06x}" for i in range(SWATCH_GRID_THRESHOLD + 1)}
+        self.app.swap_palette(large)
+        self.assertEqual(self.app.buttons, [])
+        self.assertIsNotNone(self.app.swatch_grid)
+        grid = self.app.swatch_grid
+        self.app.swap_palette(dict(large, extra="#ffffff"))
+        self.assertIs(self.app.swatch_grid, grid)
+        self.app.swap_palette({"r": "#ff0000"})
+        self.assertIsNone(self.app.swatch_grid)
+        self.assertEqual(len(self.app.buttons), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
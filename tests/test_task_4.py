@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import mock_open, patch
 
-from src.task_4 import FileManager
+from src import task_4
+from src.task_4 import FileFollower, FileManager, MappedTextFile, SearchMatch
 
 
 class TestFileManager(unittest.TestCase):
@@ -53,6 +62,591 @@ class TestFileManager(unittest.TestCase):
         self.assertIsNone(content)
         mock_messagebox.assert_called_once_with("Ошибка", "Не удалось открыть файл: Permission denied")
 
+    def test_read_chunks(self) -> None:
+        """
+        Тест на потоковое чтение блоками:
+        - многобайтовые символы и "\\r\\n" могут оказаться на границе блоков;
+        - склеенные блоки совпадают с чтением файла в текстовом режиме;
+        - счётчик прочитанных байт доходит до размера файла.
+        """
+
+        data = "Привет, мир!\r\nВторая строка\rтретья\n".encode("utf-8") * 50
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.txt")
+            with open(path, "wb") as file:
+                file.write(data)
+            chunks = list(self.file_manager.read_chunks(path, chunk_size=7))
+            with open(path, "r", encoding="utf-8") as file:
+                expected = file.read()
+
+        self.assertEqual("".join(text for text, _ in chunks), expected)
+        self.assertEqual(chunks[-1][1], len(data))
+
+        # С построителем блоки собираются в документ с тем же текстом
+        builder = task_4.PieceTableBuilder()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "big.txt")
+            with open(path, "wb") as file:
+                file.write(data)
+            chunks = list(self.file_manager.read_chunks(path, chunk_size=7, builder=builder))
+        self.assertEqual("".join(text for text, _ in chunks), expected)
+        self.assertEqual(builder.document().text(), expected)
+        with self.assertRaises(FileNotFoundError):
+            list(self.file_manager.read_chunks(os.path.join(tmp, "missing.txt")))
+
+    def test_write_atomic(self) -> None:
+        """
+        Тест на атомарную запись:
+        - содержимое заменяется, права существующего файла сохраняются;
+        - при сбое переименования старое содержимое остаётся, временный файл удаляется.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.txt")
+            self.file_manager.write_atomic(path, "первая версия")
+            os.chmod(path, 0o640)
+            self.file_manager.write_atomic(path, "вторая версия")
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertEqual(file.read(), "вторая версия")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+            # Новый файл получает права по текущей маске процесса, а сама маска не меняется
+            umask = os.umask(0o027)
+            try:
+                self.file_manager.write_atomic(os.path.join(tmp, "new.txt"), "новый файл")
+                self.assertEqual(os.umask(0o027), 0o027)
+            finally:
+                os.umask(umask)
+            self.assertEqual(os.stat(os.path.join(tmp, "new.txt")).st_mode & 0o777, 0o640)
+            os.unlink(os.path.join(tmp, "new.txt"))
+
+            with patch("os.replace", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    self.file_manager.write_atomic(path, "третья версия")
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertEqual(file.read(), "вторая версия")
+            self.assertEqual(os.listdir(tmp), ["data.txt"])
+
+    def test_patch_file(self) -> None:
+        """
+        Тест на частичную запись: правка той же длины, удлинение и укорочение со сдвигом хвоста,
+        а также отказ для участка за пределами файла.
+        """
+
+        data = bytes(range(256)) * 5000
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.bin")
+            with open(path, "wb") as file:
+                file.write(data)
+            for start, end, patch in ((10, 13, b"abc"), (100, 101, b"x" * 300000), (5, 200000, b"yz"), (0, 0, b"")):
+                self.file_manager.patch_file(path, start, end, patch)
+                data = data[:start] + patch + data[end:]
+                with open(path, "rb") as file:
+                    self.assertEqual(file.read(), data)
+            with self.assertRaises(ValueError):
+                self.file_manager.patch_file(path, 10, len(data) + 1, b"")
+
+    def test_write_atomic_chunks(self) -> None:
+        """
+        Тест на потоковую запись фрагментами:
+        - фрагменты из генератора кодируются по одному и дают то же содержимое;
+        - отменённая запись не меняет целевой файл и не оставляет временных файлов.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.txt")
+            self.file_manager.write_atomic(path, (f"строка {i}\n" for i in range(1000)))
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertEqual(file.read(), "".join(f"строка {i}\n" for i in range(1000)))
+
+            writer = task_4.AtomicWriter(path)
+            writer.write("не будет сохранено")
+            self.assertGreater(writer.written, 0)
+            writer.abort()
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertTrue(file.read().startswith("строка 0"))
+            self.assertEqual(os.listdir(tmp), ["data.txt"])
+
+    def test_content_cache(self) -> None:
+        """
+        Тест на кэш содержимого:
+        - повторное открытие не читает файл, изменённый файл читается заново;
+        - при превышении размера вытесняется давно открытый файл;
+        - в компактном режиме возвращается то же содержимое.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, f"{i}.txt") for i in range(3)]
+            for i, path in enumerate(paths):
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(f"файл {i}\r\n" * 100)
+            expected = [f"файл {i}\n" * 100 for i in range(3)]
+
+            for encoded in (False, True):
+                manager = FileManager(encoded_cache=encoded)
+                self.assertEqual(manager.open_file(paths[0]), expected[0])
+                with patch("builtins.open", side_effect=AssertionError("файл прочитан повторно")):
+                    self.assertEqual(manager.open_file(paths[0]), expected[0])
+                self.assertEqual(manager.cache.stats()[:3], (1, 1, 0))
+
+            with open(paths[0], "a", encoding="utf-8") as file:
+                file.write("ещё")
+            self.assertEqual(manager.open_file(paths[0]), expected[0] + "ещё")
+            self.assertEqual(manager.cache.stats().misses, 2)
+
+            # Помещаются только две записи
+            manager = FileManager(cache_bytes=2 * sys.getsizeof(expected[0]) + 100)
+            for path in paths + paths[2:]:
+                manager.open_file(path)
+            self.assertEqual(manager.cache.stats(), (1, 3, 1, 2, manager.cache.stats().size))
+            manager.open_file(paths[0])
+            self.assertEqual(manager.cache.stats().misses, 4)
+            self.assertIsNone(FileManager(cache_bytes=0).cache)
+
+
+class TestMappedTextFile(unittest.TestCase):
+    """
+    Класс тестов для просмотра больших файлов через mmap с индексом строк.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт временный каталог для тестовых файлов.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_file(self, data: bytes) -> str:
+        """
+        Записывает data во временный файл и возвращает путь к нему.
+        """
+        path = os.path.join(self.tmp.name, f"file{len(os.listdir(self.tmp.name))}.txt")
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_lines_and_jumps(self) -> None:
+        """
+        Тест на чтение окна строк и переход к строкам между контрольными точками индекса,
+        в том числе без NumPy и при индексировании маленькими шагами.
+        """
+
+        lines = [f"строка {i}" + "x" * (i % 7) for i in range(5 * task_4.LINE_INDEX_STRIDE + 3)]
+        path = self.make_file(("\r\n".join(lines) + "\r\n").encode("utf-8"))
+        for use_numpy in (True, False):
+            with contextlib.nullcontext() if use_numpy else patch("src.task_4.np", None):
+                with MappedTextFile(path) as viewer:
+                    self.assertEqual(viewer.lines(0, 2), lines[:2])
+                    while not viewer.index_step(37):
+                        pass
+                    self.assertEqual(viewer.line_count, len(lines))
+                    for number in (
+                        task_4.LINE_INDEX_STRIDE - 1,
+                        task_4.LINE_INDEX_STRIDE,
+                        3 * task_4.LINE_INDEX_STRIDE + 5,
+                    ):
+                        self.assertEqual(viewer.lines(number, 1), [lines[number]])
+                    self.assertEqual(viewer.lines(len(lines) - 2, 10), lines[-2:])
+                    self.assertEqual(viewer.lines(len(lines), 1), [])
+
+    def test_edge_cases(self) -> None:
+        """
+        Тест на пустой файл, файл без завершающего перевода строки и некорректный UTF-8.
+        """
+
+        with MappedTextFile(self.make_file(b"")) as viewer:
+            self.assertTrue(viewer.complete)
+            self.assertEqual(viewer.line_count, 0)
+            self.assertEqual(viewer.lines(0, 5), [])
+
+        with MappedTextFile(self.make_file(b"a\n\nb\xff")) as viewer:
+            self.assertEqual(viewer.lines(0, 5), ["a", "", "b\ufffd"])
+            self.assertEqual(viewer.line_count, 3)
+
+
+class TestSaveQueue(unittest.TestCase):
+    """
+    Класс тестов для очереди фоновых сохранений.
+    """
+
+    def test_pending_saves_collapse(self) -> None:
+        """
+        Тест на схлопывание: пока идёт первая запись, из трёх новых запросов выполняется только последний.
+        """
+
+        release = threading.Event()
+        written = []
+
+        def write(filename: str, content: str) -> None:
+            release.wait(5)
+            if content == "ошибка":
+                raise OSError("disk full")
+            written.append((filename, content))
+
+        discarded = []
+        saves = task_4.SaveQueue(write, discard=discarded.append)
+        self.assertTrue(saves.submit("a.txt", "1"))
+        self.assertFalse(saves.submit("a.txt", "2"))
+        self.assertFalse(saves.submit("a.txt", "3"))
+        self.assertFalse(saves.submit("b.txt", "4"))
+        self.assertTrue(saves.busy)
+        release.set()
+        saves.wait()
+
+        self.assertFalse(saves.busy)
+        self.assertEqual(written, [("a.txt", "1"), ("b.txt", "4")])
+        self.assertEqual(discarded, ["2", "3"])
+        self.assertEqual([result.filename for result in saves.results()], ["a.txt", "b.txt"])
+
+        saves.submit("c.txt", "ошибка")
+        saves.wait()
+        (result,) = saves.results()
+        self.assertIsInstance(result.error, OSError)
+
+
+class TestIncrementalSave(unittest.TestCase):
+    """
+    Класс тестов для отслеживания изменённых строк и частичного сохранения.
+    """
+
+    def test_dirty_lines(self) -> None:
+        """
+        Тест на объединение правок в один диапазон строк.
+        """
+
+        dirty = task_4.DirtyLines()
+        self.assertFalse(dirty)
+        dirty.record(10, 1, 3)
+        self.assertEqual((dirty.start, dirty.end, dirty.base_end), (10, 13, 11))
+        dirty.record(5, 2, 1)
+        self.assertEqual((dirty.start, dirty.end, dirty.base_end), (5, 12, 11))
+        dirty.reset()
+        self.assertFalse(dirty)
+        dirty.invalid = True
+        self.assertTrue(dirty)
+
+    def test_random_edits_roundtrip(self) -> None:
+        """
+        Тест на частичное сохранение после серий случайных правок: участок файла, вычисленный
+        по диапазону изменённых строк и индексу строк, заменяется новым текстом, и файл
+        совпадает с документом. Индекс после записи обновляется через remap.
+        """
+
+        rng = random.Random(5)
+        manager = FileManager()
+        lines = [f"строка {i}" for i in range(3 * task_4.LINE_INDEX_STRIDE)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(lines))
+
+            with MappedTextFile(path) as baseline:
+                for _ in range(30):
+                    dirty = task_4.DirtyLines()
+                    for _ in range(rng.randint(1, 4)):
+                        first = rng.randrange(len(lines))
+                        removed = rng.randint(1, min(3, len(lines) - first))
+                        added = [f"правка {rng.random():.3f}" for _ in range(rng.randint(1, 4))]
+                        lines[first : first + removed] = added
+                        dirty.record(first, removed, len(added))
+
+                    text = "\n".join(lines[dirty.start : dirty.end])
+                    if dirty.end < len(lines):
+                        text += "\n"
+                    start, end = baseline.line_offset(dirty.start), baseline.line_offset(dirty.base_end)
+                    manager.patch_file(path, start, end, text.encode("utf-8"))
+                    baseline.remap(start)
+
+                    with open(path, "r", encoding="utf-8") as file:
+                        self.assertEqual(file.read(), "\n".join(lines))
+
+
+class TestSearch(unittest.TestCase):
+    """
+    Класс тестов для фонового поиска по байтам документа.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт документ из случайных строк с кириллицей, пустыми и длинными строками.
+        """
+
+        rng = random.Random(21)
+        words = ["ab", "аб", "abab", "жаба", "x", "", "ба ab"]
+        self.lines = [" ".join(rng.choice(words) for _ in range(rng.randrange(12))) for _ in range(300)]
+        self.text = "\n".join(self.lines)
+
+    def expected(self, spans) -> list:
+        """
+        Переводит диапазоны символов self.text в совпадения (строка, символ).
+        """
+
+        def position(offset: int) -> tuple:
+            line = self.text.count("\n", 0, offset)
+            return line, offset - self.text.rfind("\n", 0, offset) - 1
+
+        return [SearchMatch(position(start), position(end)) for start, end in spans]
+
+    def search(self, index: task_4.TextIndex, pattern: str, regex: bool = False, chunk_bytes: int = 50) -> list:
+        """
+        Собирает все совпадения поиска маленькими блоками, чтобы совпадения попадали на их границы.
+        """
+
+        matches: list = []
+        scanned = 0
+        searcher = task_4.TextSearcher(index, pattern, regex)
+        for batch, scanned in searcher.batches(chunk_bytes):
+            matches.extend(batch)
+        searcher.close()
+        self.assertEqual(scanned, index.size)
+        return matches
+
+    def test_position_of(self) -> None:
+        """
+        Тест на перевод смещений в байтах в позиции по порядку и вразброс.
+        """
+
+        data = self.text.encode("utf-8")
+        offsets = [len(self.text[:i].encode("utf-8")) for i in range(len(self.text) + 1)]
+        expected = self.expected((i, i) for i in range(len(self.text) + 1))
+        index = task_4.TextIndex(data)
+        self.assertEqual([index.position_of(offset) for offset in offsets], [match.start for match in expected])
+        order = list(range(len(offsets)))
+        random.Random(1).shuffle(order)
+        for i in order[:500]:
+            self.assertEqual(index.position_of(offsets[i]), expected[i].start)
+
+    def test_literal_search(self) -> None:
+        """
+        Тест на поиск подстроки на границах блоков, в том числе с переводом строки в образце.
+        """
+
+        index = task_4.TextIndex(self.text.encode("utf-8"))
+        for pattern in ("ab", "аб", "ба ab", "b\nа"):
+            spans = []
+            start = self.text.find(pattern)
+            while start >= 0:
+                spans.append((start, start + len(pattern)))
+                start = self.text.find(pattern, start + len(pattern))
+            self.assertEqual(self.search(index, pattern), self.expected(spans), pattern)
+        self.assertEqual(self.search(task_4.TextIndex(b""), "ab"), [])
+        with self.assertRaises(ValueError):
+            task_4.TextSearcher(index, "")
+
+    def test_regex_search(self) -> None:
+        """
+        Тест на поиск регулярного выражения в файле с переводами строк "\\r\\n".
+        """
+
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "data.txt")
+        with open(path, "wb") as file:
+            file.write(self.text.replace("\n", "\r\n").encode("utf-8"))
+        for pattern in (r"\w*аб\w*", r"^ab", r"ab$", r"x?"):
+            spans = [match.span() for match in re.finditer(pattern, self.text, re.MULTILINE) if match.group()]
+            self.assertEqual(self.search(MappedTextFile(path), pattern, regex=True), self.expected(spans), pattern)
+        with self.assertRaises(re.error):
+            task_4.TextSearcher(task_4.TextIndex(b""), "(", regex=True)
+
+    def test_results(self) -> None:
+        """
+        Тест на переход к следующему совпадению и выборку совпадений окна строк.
+        """
+
+        results = task_4.SearchResults("ab", False)
+        results.add([SearchMatch((0, 1), (0, 3)), SearchMatch((2, 0), (2, 2)), SearchMatch((5, 4), (6, 0))], 10)
+        self.assertEqual(results.next_after((0, 3)), SearchMatch((2, 0), (2, 2)))
+        self.assertIsNone(results.next_after((5, 5)))
+        results.complete = True
+        self.assertEqual(results.next_after((5, 5)), SearchMatch((0, 1), (0, 3)))
+        self.assertEqual(results.in_lines(1, 6), results.matches[1:])
+        self.assertEqual(results.in_lines(3, 5), [])
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Класс тестов для работы с файлами без интерфейса и пакетной обработки.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт временный каталог и FileManager без кэша.
+        """
+
+        self.tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.file_manager = FileManager(cache_bytes=0)
+
+    def test_typed_errors(self) -> None:
+        """
+        Тест на типизированные ошибки чтения и записи без окон сообщений.
+        """
+
+        path = os.path.join(self.tmp, "data.txt")
+        with open(path, "wb") as file:
+            file.write(b"\xff\xfe")
+        with patch("tkinter.messagebox.showerror") as mock_messagebox:
+            with self.assertRaises(task_4.FileMissingError) as error:
+                self.file_manager.read_text(os.path.join(self.tmp, "missing.txt"))
+            self.assertIsInstance(error.exception.__cause__, FileNotFoundError)
+            with self.assertRaises(task_4.FileEncodingError):
+                self.file_manager.read_text(path)
+            with self.assertRaises(task_4.FileReadError):
+                self.file_manager.read_text(self.tmp)
+            with self.assertRaises(task_4.FileEncodingError):
+                self.file_manager.write_text(path, "ж", encoding="ascii")
+            with self.assertRaises(task_4.FileWriteError) as error:
+                self.file_manager.write_text(os.path.join(self.tmp, "missing", "data.txt"), "")
+            self.assertEqual(error.exception.filename, os.path.join(self.tmp, "missing", "data.txt"))
+            mock_messagebox.assert_not_called()
+        self.assertEqual(self.file_manager.read_text(path, "latin-1"), "\xff\xfe")
+
+    def test_transform_file(self) -> None:
+        """
+        Тест на перекодирование и приведение переводов строк, в том числе без перезаписи
+        не изменившегося файла.
+        """
+
+        path = os.path.join(self.tmp, "data.txt")
+        with open(path, "wb") as file:
+            file.write("а\r\nб\rв\n".encode("cp1251"))
+        self.assertEqual(self.file_manager.transform_file(path, "cp1251"), (7, 0, False))
+        self.assertEqual(self.file_manager.transform_file(path, "cp1251", "utf-8", "\r\n"), (7, 12, True))
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), "а\r\nб\r\nв\r\n".encode("utf-8"))
+        self.assertEqual(self.file_manager.transform_file(path, newline="\r\n")[2], False)
+
+    def test_process_files(self) -> None:
+        """
+        Тест на обработку множества файлов в пуле потоков и вывод CLI с ошибкой для отсутствующего файла.
+        """
+
+        paths = []
+        for i in range(50):
+            paths.append(os.path.join(self.tmp, f"{i}.txt"))
+            with open(paths[-1], "w", encoding="utf-8", newline="") as file:
+                file.write(f"строка {i}\r\n" * i)
+        missing = os.path.join(self.tmp, "missing.txt")
+        results = list(self.file_manager.process_files(paths + [missing], workers=4, newline="\n"))
+        self.assertEqual(sorted(result.filename for result in results), sorted(paths + [missing]))
+        self.assertEqual(sum(result.changed for result in results), 49)
+        self.assertEqual([type(result.error) for result in results if result.error], [task_4.FileMissingError])
+        with open(paths[3], "rb") as file:
+            self.assertEqual(file.read(), "строка 3\n".encode("utf-8") * 3)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), self.assertRaises(SystemExit):
+            task_4.main([self.tmp, missing, "--newline", "crlf", "--workers", "2"])
+        self.assertIn("Файлов: 51, изменено: 49, ошибок: 1", output.getvalue())
+
+    def test_document_round_trip(self) -> None:
+        """
+        Тест на чтение файла в модель документа и сохранение правок из неё.
+        """
+
+        path = os.path.join(self.tmp, "data.txt")
+        with open(path, "wb") as file:
+            file.write("строка\n".encode("utf-8") * 1000)
+        document = self.file_manager.read_document(path)
+        self.assertEqual(document.line_count, 1001)
+        edited = document.insert(document.line_start(500), "новая\n").delete(0, 7)
+
+        self.assertEqual(self.file_manager.write_document(path, edited), 13000 - 13 + 11)
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), ("строка\n" * 499 + "новая\n" + "строка\n" * 500).encode("utf-8"))
+        # Старый снимок не зависит от перезаписанного файла
+        self.file_manager.write_document(path, document, encoding="cp1251", newline="\r\n")
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), "строка\r\n".encode("cp1251") * 1000)
+
+        with self.assertRaises(task_4.FileEncodingError):
+            self.file_manager.write_document(path, task_4.PieceTable("ж"), encoding="ascii")
+        with self.assertRaises(task_4.FileMissingError):
+            self.file_manager.read_document(os.path.join(self.tmp, "missing.txt"))
+        with open(path, "wb") as file:
+            file.write(b"\xff")
+        with self.assertRaises(task_4.FileEncodingError):
+            self.file_manager.read_document(path)
+        with open(path, "wb") as file:
+            file.write(b"\x80" * 5000)
+        with self.assertRaises(task_4.FileEncodingError):
+            self.file_manager.read_document(path)
+
+
+class TestFileFollower(unittest.TestCase):
+    """
+    Класс тестов для слежения за дописыванием в файл.
+    """
+
+    def setUp(self) -> None:
+        """
+        Создаёт временный файл журнала.
+        """
+
+        self.path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), "app.log")
+        self.append("строка 1\nстрока 2\n".encode("utf-8"))
+
+    def append(self, data: bytes, path: str = "") -> None:
+        """
+        Дописывает байты в файл журнала.
+        """
+
+        with open(path or self.path, "ab") as file:
+            file.write(data)
+
+    def test_appended_data(self) -> None:
+        """
+        Тест на чтение только дописанных данных, в том числе символов и "\\r\\n",
+        разрезанных между дописываниями, и чтение порциями.
+        """
+
+        with FileFollower(self.path) as follower:
+            self.assertEqual(follower.poll(), ("строка 1\nстрока 2\n", False, False))
+            self.assertEqual(follower.poll(), ("", False, False))
+            data = "ж\r\nё".encode("utf-8")
+            self.append(data[:1])
+            self.assertEqual(follower.poll().text, "")
+            self.append(data[1:3])
+            self.assertEqual(follower.poll().text, "ж")
+            self.append(data[3:])
+            self.assertEqual(follower.poll().text, "\nё")
+            self.append(b"x" * 10)
+            self.assertEqual(follower.poll(limit=4), ("xxxx", False, True))
+            self.assertEqual(follower.poll(), ("x" * 6, False, False))
+
+    def test_last_lines(self) -> None:
+        """
+        Тест на начало слежения с последних строк файла.
+        """
+
+        self.append(b"".join(b"%d\n" % i for i in range(100000)))
+        with FileFollower(self.path, lines=3) as follower:
+            self.assertEqual(follower.poll().text, "99997\n99998\n99999\n")
+        self.append(b"tail")
+        with FileFollower(self.path, lines=2) as follower:
+            self.assertEqual(follower.poll().text, "99999\ntail")
+        with FileFollower(self.path, lines=0) as follower:
+            self.assertEqual(follower.poll().text, "")
+        with FileFollower(self.path, lines=10**6) as follower:
+            self.assertTrue(follower.poll(limit=10**7).text.startswith("строка 1"))
+
+    def test_truncation_and_rotation(self) -> None:
+        """
+        Тест на перечитывание усечённого файла и переход к новому файлу после ротации
+        с дочитыванием старого.
+        """
+
+        with FileFollower(self.path) as follower:
+            follower.poll()
+            with open(self.path, "wb") as file:
+                file.write(b"new\n")
+            self.assertEqual(follower.poll(), ("new\n", True, False))
+
+            self.append(b"old tail\n")
+            os.rename(self.path, self.path + ".1")
+            self.assertEqual(follower.poll(), ("old tail\n", False, False))
+            self.append(b"fresh\n")
+            self.assertEqual(follower.poll(), ("", False, True))
+            self.assertEqual(follower.poll(), ("fresh\n", False, False))
+
 
 if __name__ == "__main__":
     unittest.main()